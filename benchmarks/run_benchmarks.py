@@ -0,0 +1,355 @@
+"""Benchmark the risk-of-bias assessment pipeline and report the results as JSON.
+
+Every benchmark runs offline. Model requests are answered by
+:class:`~risk_of_bias.backends.FakeBackend`, so the timings measure the
+overhead of this package rather than the model provider.
+
+Usage
+-----
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --quick --only summary
+
+The JSON document records the package version, Python version and platform
+along with ``min``, ``median``, ``mean`` and ``max`` timings in seconds for each
+benchmark, so results can be compared between releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from risk_of_bias.backends import FakeBackend  # noqa: E402
+from risk_of_bias.compare import compare_frameworks  # noqa: E402
+from risk_of_bias.frameworks import get_rob2_framework  # noqa: E402
+from risk_of_bias.judgement_table import compile_judgement_table  # noqa: E402
+from risk_of_bias.run_framework import arun_frameworks, run_framework  # noqa: E402
+from risk_of_bias.summary import (  # noqa: E402
+    export_summary,
+    load_frameworks_from_directory,
+    summarise_frameworks,
+)
+from risk_of_bias.types import Framework  # noqa: E402
+from risk_of_bias.visualisation import plot_assessor_agreement  # noqa: E402
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def measure(
+    function: Callable[[], Any],
+    repeat: int,
+    setup: Callable[[], Any] | None = None,
+) -> dict[str, float | int]:
+    """Time ``repeat`` calls of ``function`` and summarise the durations.
+
+    ``setup`` is called before each call of ``function`` and is not timed.
+    """
+
+    durations = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - started)
+
+    return {
+        "repeat": repeat,
+        "min": min(durations),
+        "median": statistics.median(durations),
+        "mean": statistics.fmean(durations),
+        "max": max(durations),
+    }
+
+
+def write_manuscript(directory: Path, name: str, size_bytes: int) -> Path:
+    """Write a placeholder PDF of ``size_bytes`` bytes."""
+
+    path = directory / name
+    path.write_bytes(b"%PDF-1.4\n" + os.urandom(size_bytes))
+    return path
+
+
+def completed_framework(manuscript: Path, seed: int = 0) -> Framework:
+    """Assess ``manuscript`` with a fake backend."""
+
+    return run_framework(
+        manuscript=manuscript,
+        framework=get_rob2_framework(),
+        backend=FakeBackend(seed=seed),
+    )
+
+
+def corpus(template: Framework, size: int) -> list[Framework]:
+    """Copy ``template`` into ``size`` frameworks with distinct manuscripts."""
+
+    frameworks = []
+    for i in range(size):
+        framework = template.model_copy(deep=True)
+        framework.manuscript = f"manuscript_{i:05d}.pdf"
+        frameworks.append(framework)
+    # Copies share the template's memoised judgements
+    clear_judgements(frameworks)
+    return frameworks
+
+
+def clear_judgements(frameworks: list[Framework]) -> None:
+    """Forget the memoised judgements, so they are computed on next access."""
+
+    for framework in frameworks:
+        for model in (framework, *framework.domains):
+            private = model.__pydantic_private__
+            assert private is not None
+            private["_judgement_cache"] = None
+
+
+def bench_run_framework(workdir: Path, scale: float, repeat: int) -> dict[str, Any]:
+    manuscripts = [
+        write_manuscript(workdir, f"paper_{i}.pdf", 1_000_000)
+        for i in range(max(1, int(20 * scale)))
+    ]
+
+    def sequential() -> None:
+        for manuscript in manuscripts:
+            run_framework(
+                manuscript=manuscript,
+                framework=get_rob2_framework(),
+                backend=FakeBackend(),
+            )
+
+    def uploaded() -> None:
+        for manuscript in manuscripts:
+            run_framework(
+                manuscript=manuscript,
+                framework=get_rob2_framework(),
+                backend=FakeBackend(),
+                upload_files=True,
+            )
+
+    def concurrent() -> None:
+        asyncio.run(arun_frameworks(manuscripts, backend=FakeBackend()))
+
+    results = {}
+    for name, function in (
+        ("run_framework", sequential),
+        ("run_framework_upload_files", uploaded),
+        ("arun_frameworks", concurrent),
+    ):
+        timing = measure(function, repeat)
+        timing["manuscripts"] = len(manuscripts)
+        timing["per_manuscript_median"] = timing["median"] / len(manuscripts)
+        results[name] = timing
+    return results
+
+
+def bench_save_load(
+    workdir: Path, template: Framework, scale: float, repeat: int
+) -> dict[str, Any]:
+    frameworks = corpus(template, max(1, int(1_000 * scale)))
+    directory = workdir / "corpus"
+    directory.mkdir()
+
+    def save() -> None:
+        for framework in frameworks:
+            framework.save(directory / f"{framework.manuscript}.json")
+
+    def load() -> None:
+        load_frameworks_from_directory(directory)
+
+    results = {"save": measure(save, repeat), "load": measure(load, repeat)}
+    for timing in results.values():
+        timing["frameworks"] = len(frameworks)
+    return results
+
+
+def bench_summary(
+    workdir: Path, template: Framework, scale: float, repeat: int
+) -> dict[str, Any]:
+    frameworks = corpus(template, max(1, int(10_000 * scale)))
+    summary = summarise_frameworks(frameworks)
+
+    results = {
+        "summarise_frameworks": measure(
+            lambda: summarise_frameworks(frameworks),
+            repeat,
+            setup=lambda: clear_judgements(frameworks),
+        ),
+        # The judgements are memoised by the run before
+        "summarise_frameworks_memoised": measure(
+            lambda: summarise_frameworks(frameworks), repeat
+        ),
+        "export_summary": measure(
+            lambda: export_summary(summary, workdir / "summary.csv"), repeat
+        ),
+    }
+    for timing in results.values():
+        timing["frameworks"] = len(frameworks)
+    return results
+
+
+def bench_judgements(template: Framework, scale: float, repeat: int) -> dict[str, Any]:
+    size = max(1, int(100_000 * scale))
+    domains = [domain.model_copy(deep=True) for domain in template.domains[:5]]
+    tables = [compile_judgement_table(domain) for domain in domains]
+    codes = [table.encode([domain] * size) for table, domain in zip(tables, domains)]
+
+    def function() -> None:
+        for domain in domains:
+            judgement_function = domain.judgement_function
+            assert judgement_function is not None
+            for _ in range(size):
+                judgement_function(domain)
+
+    def memoised() -> None:
+        for domain in domains:
+            for _ in range(size):
+                domain.judgement
+
+    def table() -> None:
+        for judgement_table, domain_codes in zip(tables, codes):
+            judgement_table.evaluate(domain_codes)
+
+    results = {
+        "judgement_function": measure(function, repeat),
+        "judgement_memoised": measure(memoised, repeat),
+        "judgement_table": measure(table, repeat),
+    }
+    for timing in results.values():
+        timing["assessments"] = size
+    return results
+
+
+def bench_compare(workdir: Path, repeat: int) -> dict[str, Any]:
+    manuscript = write_manuscript(workdir, "compare.pdf", 1_000)
+    first = completed_framework(manuscript, seed=1)
+    second = completed_framework(manuscript, seed=2)
+    first.assessor, second.assessor = "Reviewer 1", "Reviewer 2"
+    comparison = compare_frameworks(first, second)
+
+    def plot() -> None:
+        plt.close(plot_assessor_agreement(comparison))
+
+    return {
+        "compare_frameworks": measure(
+            lambda: compare_frameworks(first, second), repeat
+        ),
+        "plot_assessor_agreement": measure(plot, repeat),
+    }
+
+
+def bench_cli_cold_start(repeat: int) -> dict[str, Any]:
+    command = [sys.executable, "-c", "from risk_of_bias.cli import app; app()"]
+
+    def start() -> None:
+        subprocess.run(
+            [*command, "--help"],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    return {"cli_help": measure(start, repeat)}
+
+
+BENCHMARKS = (
+    "run_framework",
+    "save_load",
+    "summary",
+    "judgements",
+    "compare",
+    "cli",
+)
+
+
+def run(only: list[str], scale: float, repeat: int) -> dict[str, Any]:
+    """Run the selected benchmarks and return the JSON report."""
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = Path(directory)
+        template = completed_framework(write_manuscript(workdir, "t.pdf", 1_000))
+
+        if "run_framework" in only:
+            results.update(bench_run_framework(workdir, scale, repeat))
+        if "save_load" in only:
+            results.update(bench_save_load(workdir, template, scale, repeat))
+        if "summary" in only:
+            results.update(bench_summary(workdir, template, scale, repeat))
+        if "judgements" in only:
+            results.update(bench_judgements(template, scale, repeat))
+        if "compare" in only:
+            results.update(bench_compare(workdir, repeat))
+        if "cli" in only:
+            results.update(bench_cli_cold_start(repeat))
+
+    with open(ROOT / "pyproject.toml", "rb") as f:
+        version = tomllib.load(f)["project"]["version"]
+
+    return {
+        "package_version": version,
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "scale": scale,
+        "benchmarks": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output", type=Path, help="Write the JSON report here instead of stdout"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=BENCHMARKS,
+        default=list(BENCHMARKS),
+        help="Run only the named benchmarks",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Number of timed runs per benchmark"
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Multiply the corpus sizes, e.g. 0.1 for a quick run",
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Shorthand for --scale 0.05 --repeat 1",
+    )
+    args = parser.parse_args()
+
+    if args.quick:
+        args.scale, args.repeat = 0.05, 1
+
+    report = json.dumps(run(args.only, args.scale, args.repeat), indent=2)
+    if args.output is None:
+        print(report)
+    else:
+        args.output.write_text(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
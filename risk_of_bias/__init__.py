@@ -5,15 +5,20 @@ from .summary import (
     export_summary,
     load_frameworks_from_directory,
     print_summary,
+    summarise_framework,
     summarise_frameworks,
 )
+from .usage import print_usage, summarise_usage
 from .visualisation import plot_assessor_agreement
 
 __all__ = [
     "load_frameworks_from_directory",
     "print_summary",
     "export_summary",
+    "summarise_framework",
     "summarise_frameworks",
     "compare_frameworks",
     "plot_assessor_agreement",
+    "summarise_usage",
+    "print_usage",
 ]
@@ -0,0 +1,344 @@
+"""Interchangeable model backends used to answer domain requests."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Optional, Protocol
+
+from openai import AsyncOpenAI, OpenAI
+from openai.types.responses import ResponseUsage
+from openai.types.responses.parsed_response import (
+    ParsedResponse,
+    ParsedResponseOutputMessage,
+    ParsedResponseOutputText,
+)
+from openai.types.responses.response_usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+from pydantic import BaseModel
+
+from risk_of_bias.oai._utils import aupload_pdf, upload_pdf
+
+
+class LLMBackend(Protocol):
+    """
+    The operations :func:`~risk_of_bias.run_framework.run_framework` needs from
+    a model provider.
+
+    Each ``parse`` call receives the keyword arguments of
+    ``OpenAI().responses.parse``: ``model``, ``input``, ``text_format`` and
+    optionally ``temperature``. It returns an object with the interface of
+    ``openai.types.responses.ParsedResponse``, in particular ``output_text``,
+    ``output_parsed``, ``id``, ``model`` and ``usage``. Synchronous and
+    asynchronous variants of every operation are required so one backend can
+    be used by both :func:`run_framework` and :func:`arun_framework`.
+    """
+
+    def parse(self, **kwargs: Any) -> Any:
+        """Answer a structured request and return the parsed response."""
+        ...
+
+    async def aparse(self, **kwargs: Any) -> Any:
+        """Asynchronously answer a structured request."""
+        ...
+
+    def stream(self, on_text: Callable[[str], None], **kwargs: Any) -> Any:
+        """Answer a request, passing each fragment of output text to ``on_text``
+        as it arrives, and return the final parsed response."""
+        ...
+
+    async def astream(self, on_text: Callable[[str], None], **kwargs: Any) -> Any:
+        """Asynchronously stream a request, see :meth:`stream`."""
+        ...
+
+    def upload(self, path: Path) -> str:
+        """Upload a PDF and return its file id."""
+        ...
+
+    async def aupload(self, path: Path) -> str:
+        """Asynchronously upload a PDF and return its file id."""
+        ...
+
+    def delete(self, file_id: str) -> None:
+        """Delete a previously uploaded file."""
+        ...
+
+    async def adelete(self, file_id: str) -> None:
+        """Asynchronously delete a previously uploaded file."""
+        ...
+
+
+class OpenAIBackend:
+    """
+    The default backend, answering requests with the OpenAI Responses API.
+
+    Parameters
+    ----------
+    client : OpenAI, optional
+        Client used by the synchronous operations. Created on first use when
+        not provided.
+    async_client : AsyncOpenAI, optional
+        Client used by the asynchronous operations. Created on first use when
+        not provided. Share one backend between concurrent assessments to reuse
+        its connection pool.
+    api_key : str, optional
+        API key used when creating clients. If ``None``, ``OPENAI_API_KEY`` from
+        the environment is used.
+    """
+
+    def __init__(
+        self,
+        client: Optional[OpenAI] = None,
+        async_client: Optional[AsyncOpenAI] = None,
+        api_key: Optional[str] = None,
+    ) -> None:
+        self._client = client
+        self._async_client = async_client
+        self._api_key = api_key
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI(api_key=self._api_key)
+        return self._client
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(api_key=self._api_key)
+        return self._async_client
+
+    def parse(self, **kwargs: Any) -> Any:
+        return self.client.responses.parse(**kwargs)
+
+    async def aparse(self, **kwargs: Any) -> Any:
+        return await self.async_client.responses.parse(**kwargs)
+
+    def stream(self, on_text: Callable[[str], None], **kwargs: Any) -> Any:
+        with self.client.responses.stream(**kwargs) as response_stream:
+            for event in response_stream:
+                if event.type == "response.output_text.delta":
+                    on_text(event.delta)
+            return response_stream.get_final_response()
+
+    async def astream(self, on_text: Callable[[str], None], **kwargs: Any) -> Any:
+        async with self.async_client.responses.stream(**kwargs) as response_stream:
+            async for event in response_stream:
+                if event.type == "response.output_text.delta":
+                    on_text(event.delta)
+            return await response_stream.get_final_response()
+
+    def upload(self, path: Path) -> str:
+        return upload_pdf(self.client, path)
+
+    async def aupload(self, path: Path) -> str:
+        return await aupload_pdf(self.async_client, path)
+
+    def delete(self, file_id: str) -> None:
+        self.client.files.delete(file_id)
+
+    async def adelete(self, file_id: str) -> None:
+        await self.async_client.files.delete(file_id)
+
+
+class FakeBackend:
+    """
+    A deterministic in-process backend that never contacts a model provider.
+
+    Every request is answered with a schema-valid instance of the domain
+    response class created by
+    :func:`~risk_of_bias.types._response_types.create_domain_response_class`.
+    Constrained answers are chosen from the allowed answers by hashing the
+    question field, the request input and ``seed``, so the same request always
+    receives the same answer while different questions receive a realistic
+    mix of answers. Responses report token usage estimated from the size of
+    the request, and can be delayed by ``latency`` seconds to model network
+    and inference time. This makes it possible to benchmark and load-test the
+    assessment pipeline offline, without any API spend.
+
+    Parameters
+    ----------
+    latency : float, default=0.0
+        Seconds each request takes to complete.
+    seed : int, default=0
+        Changes the answers chosen for constrained questions.
+    stream_chunk_size : int, default=32
+        Number of characters in each streamed fragment of output text.
+
+    Attributes
+    ----------
+    requests : list[dict]
+        The keyword arguments of every request, in the order received. The
+        ``input`` list is copied, so it holds the messages as they were sent.
+    uploaded_files : dict[str, Path]
+        The files currently uploaded, by file id.
+
+    Examples
+    --------
+    >>> backend = FakeBackend(latency=0.5)
+    >>> framework = run_framework(Path("manuscript.pdf"), backend=backend)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        seed: int = 0,
+        stream_chunk_size: int = 32,
+    ) -> None:
+        self.latency = latency
+        self.seed = seed
+        self.stream_chunk_size = stream_chunk_size
+        self.requests: list[dict[str, Any]] = []
+        self.uploaded_files: dict[str, Path] = {}
+        self._uploads = 0
+
+    def parse(self, **kwargs: Any) -> ParsedResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._respond(kwargs)
+
+    async def aparse(self, **kwargs: Any) -> ParsedResponse:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._respond(kwargs)
+
+    def stream(self, on_text: Callable[[str], None], **kwargs: Any) -> ParsedResponse:
+        response = self.parse(**kwargs)
+        for fragment in self._fragments(response.output_text):
+            on_text(fragment)
+        return response
+
+    async def astream(
+        self, on_text: Callable[[str], None], **kwargs: Any
+    ) -> ParsedResponse:
+        response = await self.aparse(**kwargs)
+        for fragment in self._fragments(response.output_text):
+            on_text(fragment)
+        return response
+
+    def upload(self, path: Path) -> str:
+        self._uploads += 1
+        file_id = f"file-fake-{self._uploads}"
+        self.uploaded_files[file_id] = path
+        return file_id
+
+    async def aupload(self, path: Path) -> str:
+        return self.upload(path)
+
+    def delete(self, file_id: str) -> None:
+        self.uploaded_files.pop(file_id, None)
+
+    async def adelete(self, file_id: str) -> None:
+        self.delete(file_id)
+
+    def _fragments(self, text: str) -> list[str]:
+        size = self.stream_chunk_size
+        fragments = []
+        for start in range(0, len(text), size):
+            end = start + size
+            fragments.append(text[start:end])
+        return fragments
+
+    def _respond(self, kwargs: dict[str, Any]) -> ParsedResponse:
+        # Record the conversation as sent, not as the caller later extends it
+        request = dict(kwargs)
+        if isinstance(request.get("input"), list):
+            request["input"] = list(request["input"])
+        self.requests.append(request)
+        request_number = len(self.requests)
+
+        text_format = kwargs["text_format"]
+        request_digest, request_chars = _summarise_input(request.get("input"))
+        parsed = _fake_answer(text_format, f"{self.seed}:{request_digest}")
+        output_text = parsed.model_dump_json()
+
+        content: ParsedResponseOutputText[BaseModel]
+        content = ParsedResponseOutputText.model_construct(
+            type="output_text", text=output_text, parsed=parsed, annotations=[]
+        )
+        message: ParsedResponseOutputMessage[BaseModel]
+        message = ParsedResponseOutputMessage.model_construct(
+            id=f"msg_fake_{request_number}",
+            type="message",
+            role="assistant",
+            status="completed",
+            content=[content],
+        )
+        input_tokens = request_chars // 4
+        output_tokens = len(output_text) // 4
+        usage = ResponseUsage.model_construct(
+            input_tokens=input_tokens,
+            input_tokens_details=InputTokensDetails.model_construct(cached_tokens=0),
+            output_tokens=output_tokens,
+            output_tokens_details=OutputTokensDetails.model_construct(
+                reasoning_tokens=0
+            ),
+            total_tokens=input_tokens + output_tokens,
+        )
+        return ParsedResponse.model_construct(
+            id=f"resp_fake_{request_number}",
+            model=kwargs.get("model", "fake"),
+            object="response",
+            output=[message],
+            usage=usage,
+        )
+
+
+def _summarise_input(chat_input: Any) -> tuple[str, int]:
+    """Return a digest of a request's messages and their size in characters.
+
+    Only the role and text of each message and the name of each attached file
+    are hashed, so file payloads are neither hashed nor copied on every call.
+    They still count towards the size used to estimate the input tokens.
+    """
+
+    digest = hashlib.sha256()
+    chars = 0
+    messages = chat_input if isinstance(chat_input, list) else [chat_input]
+    for message in messages:
+        if not isinstance(message, dict):
+            text = str(message)
+            digest.update(text.encode("utf-8"))
+            chars += len(text)
+            continue
+        content = message.get("content")
+        parts = content if isinstance(content, list) else [{"text": content}]
+        digest.update(str(message.get("role")).encode("utf-8"))
+        for part in parts:
+            text = str(
+                part.get("text") or part.get("file_id") or part.get("filename") or ""
+            )
+            digest.update(text.encode("utf-8") + b"\0")
+            chars += len(text) + len(part.get("file_data") or "")
+    return digest.hexdigest(), chars
+
+
+def _fake_answer(text_format: type[BaseModel], salt: str) -> BaseModel:
+    """Build a deterministic, schema-valid instance of a domain response class."""
+
+    fields = {}
+    for name, field in text_format.model_fields.items():
+        question_class = field.annotation
+        assert isinstance(question_class, type) and issubclass(
+            question_class, BaseModel
+        )
+        response_type = question_class.model_fields["response"].annotation
+
+        if isinstance(response_type, type) and issubclass(response_type, Enum):
+            options = list(response_type)
+            digest = hashlib.sha256(f"{salt}:{name}".encode("utf-8")).digest()
+            response: Any = options[digest[0] % len(options)]
+        else:
+            response = f"Generated answer for {name}."
+
+        fields[name] = question_class(
+            reasoning=f"Generated reasoning for {name}.",
+            evidence=f"Generated evidence for {name}.",
+            response=response,
+        )
+    return text_format(**fields)
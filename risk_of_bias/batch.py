@@ -0,0 +1,467 @@
+"""Run risk-of-bias assessments for many manuscripts with the OpenAI Batch API."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Optional, Sequence
+
+from openai import OpenAI
+from pydantic import BaseModel, ValidationError
+
+from risk_of_bias.cache import ResponseCache
+from risk_of_bias.config import settings
+from risk_of_bias.conversation import (
+    assessment_documents,
+    document_digests,
+    domain_cache_key,
+    domain_parse_kwargs,
+    prepare_chat_input,
+    store_cached_response,
+    store_domain_response,
+)
+from risk_of_bias.frameworks import get_rob2_framework
+from risk_of_bias.oai._utils import upload_pdf
+from risk_of_bias.types._framework_types import Framework
+
+_TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def run_frameworks_batch(
+    manuscripts: Sequence[Path],
+    framework_factory: Callable[[], Framework] = get_rob2_framework,
+    model: str = settings.fast_ai_model,
+    guidance_document: Optional[Path] = None,
+    verbose: bool = False,
+    temperature: float = settings.temperature,
+    api_key: Optional[str] = None,
+    client: Any = None,
+    cache: Optional[ResponseCache] = None,
+    poll_interval: float = settings.batch_poll_interval,
+    on_failure: Optional[Callable[[Path, str], None]] = None,
+) -> list[Framework]:
+    """
+    Assess many manuscripts using the OpenAI Batch API.
+
+    Batch jobs are billed at a discount and are not subject to the interactive
+    rate limits, which makes them well suited to large systematic reviews where
+    results are not needed immediately.
+
+    Each domain's questions are asked with the conversation built up from the
+    previous domains' answers, so a manuscript's domains cannot all be submitted
+    at once. Instead the assessment proceeds in staged rounds: round ``n``
+    submits a single batch job containing domain ``n`` for every manuscript,
+    waits for it to complete, and records the answers before the next round is
+    compiled. The number of batch jobs therefore equals the number of domains,
+    independent of the number of manuscripts.
+
+    The manuscripts and guidance document are uploaded once with the Files API
+    and referenced by file id from every request, keeping the batch input files
+    small. All uploaded files are deleted when the assessment finishes.
+
+    Parameters
+    ----------
+    manuscripts : Sequence[Path]
+        Paths to the manuscript PDF files to analyze.
+    framework_factory : Callable[[], Framework], default=get_rob2_framework
+        Called once per manuscript to create the framework to populate.
+    model : str, default=settings.fast_ai_model
+        The OpenAI model identifier to use for assessment.
+    guidance_document : Optional[Path], default=None
+        Optional guidance document applied to every manuscript. It is uploaded
+        only once for the whole batch.
+    verbose : bool, default=False
+        Whether to print progress information, including each batch round.
+    temperature : float, default=settings.temperature
+        Sampling temperature passed to the OpenAI model. If a negative value is
+        provided, the temperature parameter is omitted.
+    api_key : Optional[str], default=None
+        API key to use for OpenAI calls. Ignored when ``client`` is provided.
+    client : Any, default=None
+        Client implementing the ``files`` and ``batches`` resources of
+        ``openai.OpenAI``. Pass a :class:`LocalBatchClient` to run offline.
+    cache : Optional[ResponseCache], default=None
+        Optional cache of model responses. Domains with a cached response are
+        not included in the batch job.
+    poll_interval : float, default=settings.batch_poll_interval
+        Seconds to wait between checks of a submitted batch job's status.
+    on_failure : Optional[Callable[[Path, str], None]], default=None
+        Called with a manuscript and the reason when its assessment fails,
+        because a request in a batch failed or returned an invalid answer, or
+        a whole batch job did not complete.
+
+    Returns
+    -------
+    list[Framework]
+        The frameworks, in the same order as ``manuscripts``. Answers restored
+        from a batch job do not include ``raw_data``. When a manuscript's
+        assessment fails its remaining domains are skipped and their questions
+        are left unanswered, while the other manuscripts continue.
+    """
+
+    if client is None:
+        client = OpenAI(api_key=api_key)
+
+    frameworks = [framework_factory() for _ in manuscripts]
+    active = set(range(len(manuscripts)))
+
+    def fail(i: int, reason: str) -> None:
+        active.discard(i)
+        if verbose:
+            print(f"  {manuscripts[i].name}: {reason}, skipping its remaining domains")
+        if on_failure is not None:
+            on_failure(manuscripts[i], reason)
+
+    file_ids: dict[Path, str] = {}
+    try:
+        # The guidance document is shared, so each PDF is uploaded only once.
+        documents = dict.fromkeys(
+            document
+            for manuscript in manuscripts
+            for document in assessment_documents(manuscript, guidance_document)
+        )
+        for document in documents:
+            file_ids[document] = upload_pdf(client, document)
+
+        conversations = [
+            prepare_chat_input(
+                framework, manuscript, model, guidance_document, file_ids
+            )
+            for framework, manuscript in zip(frameworks, manuscripts)
+        ]
+        digests = [
+            document_digests(cache, manuscript, guidance_document)
+            for manuscript in manuscripts
+        ]
+
+        rounds = max((len(framework.domains) for framework in frameworks), default=0)
+        for position in range(rounds):
+            requests: dict[str, tuple[int, dict[str, Any]]] = {}
+            for i in sorted(active):
+                if position >= len(frameworks[i].domains):
+                    continue
+                domain = frameworks[i].domains[position]
+                parse_kwargs = domain_parse_kwargs(
+                    domain, conversations[i], model, temperature
+                )
+                if store_cached_response(
+                    cache, digests[i], domain, conversations[i], parse_kwargs, verbose
+                ):
+                    continue
+                requests[f"{i}-{position}"] = (i, parse_kwargs)
+
+            if not requests:
+                continue
+
+            if verbose:
+                print(
+                    f"Submitting batch round {position + 1} of {rounds} "
+                    f"with {len(requests)} requests"
+                )
+            try:
+                outputs = _run_batch(
+                    client,
+                    {
+                        custom_id: _batch_request_body(parse_kwargs)
+                        for custom_id, (_, parse_kwargs) in requests.items()
+                    },
+                    poll_interval,
+                )
+            except RuntimeError as e:
+                for i, _ in requests.values():
+                    fail(i, str(e))
+                continue
+
+            for custom_id, (i, parse_kwargs) in requests.items():
+                domain = frameworks[i].domains[position]
+                output_text = outputs.get(custom_id)
+                if output_text is None:
+                    fail(i, f"No response for domain {domain.index}")
+                    continue
+
+                try:
+                    parsed_response = parse_kwargs["text_format"].model_validate_json(
+                        output_text
+                    )
+                except ValidationError as e:
+                    fail(i, f"Invalid response for domain {domain.index}: {e}")
+                    continue
+                # Cache before the answer joins the conversation the key covers
+                if cache is not None:
+                    cache.set(
+                        domain_cache_key(digests[i], domain, parse_kwargs),
+                        output_text,
+                    )
+                store_domain_response(
+                    domain,
+                    conversations[i],
+                    None,
+                    verbose,
+                    output_text,
+                    parsed_response,
+                )
+    finally:
+        for file_id in file_ids.values():
+            client.files.delete(file_id)
+
+    return frameworks
+
+
+def _batch_request_body(parse_kwargs: dict[str, Any]) -> dict[str, Any]:
+    """Convert ``responses.parse`` arguments into a Responses API request body."""
+
+    body = {
+        "model": parse_kwargs["model"],
+        "input": parse_kwargs["input"],
+        "text": {"format": _text_format_param(parse_kwargs["text_format"])},
+    }
+    if "temperature" in parse_kwargs:
+        body["temperature"] = parse_kwargs["temperature"]
+    return body
+
+
+def _text_format_param(response_class: type[BaseModel]) -> dict[str, Any]:
+    """Return the Responses API ``text.format`` requesting ``response_class``.
+
+    ``responses.parse`` builds this strict JSON schema internally but the SDK
+    does not expose it publicly, so this is the only place relying on the
+    SDK's private parsing helpers.
+    """
+
+    from openai.lib._parsing._responses import type_to_text_format_param
+
+    return dict(type_to_text_format_param(response_class))
+
+
+def _run_batch(
+    client: Any,
+    bodies: dict[str, dict[str, Any]],
+    poll_interval: float,
+) -> dict[str, str]:
+    """Submit one batch job, wait for it and return the output text by custom id."""
+
+    lines = "\n".join(
+        json.dumps(
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": body,
+            }
+        )
+        for custom_id, body in bodies.items()
+    )
+    input_file = client.files.create(
+        file=("batch.jsonl", lines.encode("utf-8")), purpose="batch"
+    )
+    try:
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/responses",
+            completion_window=settings.batch_completion_window,
+        )
+        while batch.status not in _TERMINAL_BATCH_STATUSES:
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+    finally:
+        client.files.delete(input_file.id)
+
+    if batch.status != "completed":
+        raise RuntimeError(f"Batch {batch.id} finished with status {batch.status}")
+
+    outputs: dict[str, str] = {}
+    if batch.output_file_id:
+        content = client.files.content(batch.output_file_id).text
+        client.files.delete(batch.output_file_id)
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            output_text = _output_text(response["body"])
+            if output_text:
+                outputs[record["custom_id"]] = output_text
+    if getattr(batch, "error_file_id", None):
+        client.files.delete(batch.error_file_id)
+    return outputs
+
+
+def _output_text(body: dict[str, Any]) -> str:
+    """Concatenate the ``output_text`` items of a Responses API response body."""
+
+    return "".join(
+        content.get("text") or ""
+        for output in body.get("output", [])
+        if output.get("type") == "message"
+        for content in output.get("content", [])
+        if content.get("type") == "output_text"
+    )
+
+
+def example_output_text(body: dict[str, Any]) -> str:
+    """Return a schema-valid JSON answer for a Responses API request body.
+
+    This is the default responder of :class:`LocalBatchClient`. Every string
+    field is filled with placeholder text and every enumerated answer takes its
+    first allowed value.
+    """
+
+    schema = body["text"]["format"]["schema"]
+    return json.dumps(_example_from_schema(schema, schema.get("$defs", {})))
+
+
+def _example_from_schema(schema: dict[str, Any], defs: dict[str, Any]) -> Any:
+    if "$ref" in schema:
+        return _example_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        return _example_from_schema(schema["anyOf"][0], defs)
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            name: _example_from_schema(property_schema, defs)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return []
+    if schema_type in ("integer", "number"):
+        return 0
+    if schema_type == "boolean":
+        return False
+    return "Placeholder answer generated by the local batch endpoint."
+
+
+class LocalBatchClient:
+    """
+    An in-process stand-in for the OpenAI Files and Batch APIs.
+
+    The client implements the subset of ``openai.OpenAI`` used by
+    :func:`run_frameworks_batch`, so batch mode can be exercised offline, in
+    tests or when developing new frameworks, without any API spend. Requests
+    are answered by ``responder`` when the batch is created, and each batch
+    only reports ``completed`` after ``polls_until_complete`` status checks,
+    mimicking the asynchronous behaviour of the real endpoint.
+
+    Parameters
+    ----------
+    responder : Callable[[dict], str], default=example_output_text
+        Called with each request body and returns the model output text.
+    polls_until_complete : int, default=1
+        Number of ``batches.retrieve`` calls before a batch is completed.
+
+    Attributes
+    ----------
+    stored_files : dict[str, bytes]
+        The contents of files currently stored, by file id.
+    submitted : list[list[dict]]
+        The request lines of every submitted batch, in submission order.
+
+    Examples
+    --------
+    >>> frameworks = run_frameworks_batch(
+    ...     manuscripts, client=LocalBatchClient(), poll_interval=0
+    ... )
+    """
+
+    def __init__(
+        self,
+        responder: Callable[[dict[str, Any]], str] = example_output_text,
+        polls_until_complete: int = 1,
+    ) -> None:
+        self.responder = responder
+        self.polls_until_complete = polls_until_complete
+        self.stored_files: dict[str, bytes] = {}
+        self.submitted: list[list[dict[str, Any]]] = []
+        self.files = SimpleNamespace(
+            create=self._create_file,
+            content=self._file_content,
+            delete=self._delete_file,
+        )
+        self.batches = SimpleNamespace(
+            create=self._create_batch, retrieve=self._retrieve_batch
+        )
+        self._ids = itertools.count(1)
+        self._batches: dict[str, dict[str, Any]] = {}
+
+    def _create_file(self, file: Any, purpose: str) -> SimpleNamespace:
+        if isinstance(file, tuple):
+            data = file[1]
+        else:
+            data = file.read()
+        file_id = f"file-local-{next(self._ids)}"
+        self.stored_files[file_id] = data
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def _file_content(self, file_id: str) -> SimpleNamespace:
+        return SimpleNamespace(text=self.stored_files[file_id].decode("utf-8"))
+
+    def _delete_file(self, file_id: str) -> SimpleNamespace:
+        self.stored_files.pop(file_id, None)
+        return SimpleNamespace(id=file_id, deleted=True)
+
+    def _create_batch(
+        self, input_file_id: str, endpoint: str, completion_window: str
+    ) -> SimpleNamespace:
+        requests = [
+            json.loads(line)
+            for line in self.stored_files[input_file_id].decode("utf-8").splitlines()
+        ]
+        self.submitted.append(requests)
+
+        output_lines = []
+        for request in requests:
+            output_text = self.responder(request["body"])
+            body = {
+                "object": "response",
+                "status": "completed",
+                "output": [
+                    {
+                        "type": "message",
+                        "role": "assistant",
+                        "content": [{"type": "output_text", "text": output_text}],
+                    }
+                ],
+            }
+            output_lines.append(
+                json.dumps(
+                    {
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 200, "body": body},
+                        "error": None,
+                    }
+                )
+            )
+        output_file = self._create_file(
+            ("output.jsonl", "\n".join(output_lines).encode("utf-8")), "batch_output"
+        )
+
+        batch_id = f"batch-local-{next(self._ids)}"
+        self._batches[batch_id] = {
+            "output_file_id": output_file.id,
+            "remaining_polls": self.polls_until_complete,
+        }
+        return self._batch_status(batch_id)
+
+    def _retrieve_batch(self, batch_id: str) -> SimpleNamespace:
+        self._batches[batch_id]["remaining_polls"] -= 1
+        return self._batch_status(batch_id)
+
+    def _batch_status(self, batch_id: str) -> SimpleNamespace:
+        state = self._batches[batch_id]
+        if state["remaining_polls"] > 0:
+            return SimpleNamespace(
+                id=batch_id, status="in_progress", output_file_id=None
+            )
+        return SimpleNamespace(
+            id=batch_id,
+            status="completed",
+            output_file_id=state["output_file_id"],
+            error_file_id=None,
+        )
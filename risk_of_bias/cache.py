@@ -0,0 +1,214 @@
+"""Content-addressed on-disk cache of AI responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from risk_of_bias.config import settings
+
+
+def sha256_file(path: Path) -> str:
+    """Return the hex encoded SHA-256 digest of the file at ``path``.
+
+    Parameters
+    ----------
+    path : Path
+        File to hash. It is read in chunks so large PDFs are never loaded into
+        memory in full.
+
+    Returns
+    -------
+    str
+        The hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def make_cache_key(**parts: Any) -> str:
+    """Combine the inputs that determine a response into a single cache key.
+
+    Parameters
+    ----------
+    **parts : Any
+        JSON serialisable values, for example document digests, the response
+        schema, the model name, the temperature and the prompt text.
+
+    Returns
+    -------
+    str
+        A hex encoded SHA-256 digest of the canonical JSON encoding of
+        ``parts``. Changing any part produces a different key.
+    """
+    canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    A SQLite backed cache of AI responses keyed by the content of each request.
+
+    Each entry stores the raw text returned by the model for one domain of one
+    manuscript. Keys are built with :func:`make_cache_key` from the hashes of
+    the manuscript and guidance document bytes, the domain response schema, the
+    model, the temperature and the prompt. Re-running an assessment after a
+    change to a single domain therefore only pays for the domains whose inputs
+    actually changed, regardless of the file names involved.
+
+    The cache is bounded. Entries older than ``max_age_days`` are discarded,
+    and when the cache holds more than ``max_entries`` entries or more than
+    ``max_bytes`` bytes of responses the least recently used entries are
+    evicted first.
+
+    Parameters
+    ----------
+    path : Path | str
+        Location of the SQLite database. Parent directories are created if
+        required.
+    max_entries : int | None, default=settings.cache_max_entries
+        Maximum number of cached responses. ``None`` disables the limit.
+    max_bytes : int | None, default=settings.cache_max_bytes
+        Maximum total size of the cached responses in bytes. ``None`` disables
+        the limit.
+    max_age_days : float | None, default=settings.cache_max_age_days
+        Maximum age of a cached response, measured from when it was stored.
+        ``None`` disables the limit.
+
+    Examples
+    --------
+    >>> cache = ResponseCache(Path("~/.cache/risk_of_bias.sqlite").expanduser())
+    >>> framework = run_framework(Path("manuscript.pdf"), cache=cache)
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_entries: Optional[int] = settings.cache_max_entries,
+        max_bytes: Optional[int] = settings.cache_max_bytes,
+        max_age_days: Optional[float] = settings.cache_max_age_days,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "accessed_at REAL NOT NULL)"
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at "
+                "ON responses (accessed_at)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key``, or ``None`` on a miss.
+
+        A hit marks the entry as recently used. Expired entries are treated as
+        misses and removed.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self._is_expired(created_at, now):
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+
+            self._connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key`` and evict entries beyond the limits."""
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self._evict(now)
+
+    def evict(self) -> None:
+        """Remove expired entries and least recently used entries over the limits."""
+        with self._lock, self._connection:
+            self._evict(time.time())
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute(
+                "SELECT COUNT(*) FROM responses"
+            ).fetchone()
+        return count
+
+    def __contains__(self, key: object) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        if self.max_age_days is None:
+            return False
+        return now - created_at > self.max_age_days * 24 * 60 * 60
+
+    def _evict(self, now: float) -> None:
+        if self.max_age_days is not None:
+            self._connection.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (now - self.max_age_days * 24 * 60 * 60,),
+            )
+
+        if self.max_entries is not None:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY accessed_at DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+        if self.max_bytes is not None:
+            total = 0
+            stale: list[tuple[str]] = []
+            for key, size in self._connection.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at DESC"
+            ):
+                total += size
+                if total > self.max_bytes:
+                    stale.append((key,))
+            self._connection.executemany("DELETE FROM responses WHERE key = ?", stale)
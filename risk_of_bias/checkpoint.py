@@ -0,0 +1,99 @@
+"""Domain-level checkpoints for resuming interrupted assessments."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+
+class DomainCheckpoint:
+    """
+    Persist the answer to each domain as soon as it arrives.
+
+    An assessment makes one model request per domain, and previously the
+    results were only written once every domain had been answered. If the
+    process crashed or was stopped part way through, all of the completed
+    domains had to be paid for again. A checkpoint records the model's output
+    for each completed domain in a small JSON file. The output text is both the
+    assistant turn needed to rebuild the conversation and the JSON from which
+    the domain's parsed responses are restored, so a later run can replay the
+    completed domains without any requests and continue from the first
+    incomplete domain.
+
+    The checkpoint is tied to a ``fingerprint`` of everything that determines
+    the answers, such as the manuscript contents, model and temperature. A
+    checkpoint written with a different fingerprint is ignored, and is
+    replaced as soon as a new domain completes.
+
+    Parameters
+    ----------
+    path : Path
+        Location of the checkpoint JSON file.
+    fingerprint : str
+        Identifies the assessment the checkpoint belongs to.
+    """
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self._lock = threading.Lock()
+        self._outputs: dict[str, str] = {}
+        self._usage: dict[str, dict[str, Any]] = {}
+
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text())
+            except (OSError, ValueError):
+                data = {}
+            if data.get("fingerprint") == fingerprint:
+                self._outputs = dict(data.get("domains", {}))
+                self._usage = dict(data.get("usage", {}))
+
+    def get(self, domain_index: int) -> Optional[str]:
+        """Return the recorded output text for a domain, if it has completed."""
+        return self._outputs.get(str(domain_index))
+
+    def get_usage(self, domain_index: int) -> Optional[dict[str, Any]]:
+        """Return the recorded usage of the request that answered a domain."""
+        return self._usage.get(str(domain_index))
+
+    def record(
+        self,
+        domain_index: int,
+        output_text: str,
+        usage: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Record a completed domain and write the checkpoint to disk.
+
+        ``usage`` optionally records the tokens, latency and cost of the request
+        so they are not lost when the assessment is resumed. The file is
+        replaced atomically so an interruption while writing never leaves a
+        corrupt checkpoint behind.
+        """
+        with self._lock:
+            self._outputs[str(domain_index)] = output_text
+            if usage is not None:
+                self._usage[str(domain_index)] = usage
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.path.with_name(self.path.name + ".tmp")
+            temporary_path.write_text(
+                json.dumps(
+                    {
+                        "fingerprint": self.fingerprint,
+                        "domains": self._outputs,
+                        "usage": self._usage,
+                    },
+                    indent=2,
+                )
+            )
+            os.replace(temporary_path, self.path)
+
+    def remove(self) -> None:
+        """Delete the checkpoint file, typically once the results are saved."""
+        self.path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._outputs)
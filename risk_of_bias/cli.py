@@ -1,14 +1,26 @@
+import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, List, Optional
 
 import typer
 
+from risk_of_bias.batch import run_frameworks_batch
+from risk_of_bias.cache import ResponseCache
 from risk_of_bias.compare import compare_frameworks
 from risk_of_bias.config import settings
+from risk_of_bias.export import is_stale
 from risk_of_bias.frameworks.rob2 import get_rob2_framework
 from risk_of_bias.human import run_human_framework
+from risk_of_bias.manifest import AssessmentManifest, assessment_key
+from risk_of_bias.rate_limit import RateLimiter
 from risk_of_bias.run_framework import run_framework
-from risk_of_bias.summary import export_summary, print_summary, summarise_frameworks
+from risk_of_bias.summary import (
+    SummaryWriter,
+    export_summary,
+    print_summary,
+    summarise_frameworks,
+)
 from risk_of_bias.types._framework_types import Framework
 from risk_of_bias.visualisation import plot_assessor_agreement
 
@@ -39,6 +51,50 @@ def analyse(
         False,
         help="Force reprocessing even if JSON file exists (ignore cached results)",
     ),
+    response_cache: Optional[str] = typer.Option(
+        None,
+        help="SQLite file caching AI responses per domain, keyed by the content"
+        " of the manuscript, guidance document, prompt, model and temperature",
+    ),
+    batch: bool = typer.Option(
+        False,
+        help="Submit the assessments as OpenAI Batch API jobs, one job per domain."
+        " Batch jobs are discounted but may take up to 24 hours to complete",
+    ),
+    skip_logic: bool = typer.Option(
+        False,
+        help="Only ask conditional signalling questions once the answers they"
+        " depend on are known, answering the rest Not Applicable",
+    ),
+    jobs: int = typer.Option(
+        1,
+        min=1,
+        help="Number of manuscripts in a directory to assess concurrently",
+    ),
+    rpm: Optional[int] = typer.Option(
+        settings.requests_per_minute,
+        min=1,
+        help="Maximum requests per minute to the model, shared by all jobs."
+        " Defaults to the REQUESTS_PER_MINUTE environment variable",
+    ),
+    tpm: Optional[int] = typer.Option(
+        settings.tokens_per_minute,
+        min=1,
+        help="Maximum tokens per minute sent to and received from the model,"
+        " shared by all jobs. Defaults to the TOKENS_PER_MINUTE environment"
+        " variable",
+    ),
+    manifest: Optional[str] = typer.Option(
+        None,
+        help="Manifest recording completed assessments by the content of the"
+        f" manuscript and their parameters. Defaults to {settings.manifest_filename}"
+        " in the manuscript directory",
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        help="Report which assessments and exports would be rebuilt without"
+        " running them",
+    ),
 ) -> Optional[Framework]:
     """
     Run risk of bias assessment on a manuscript or directory of manuscripts.
@@ -59,11 +115,56 @@ def analyse(
     enables efficient batch processing, data sharing, and reproducible research
     workflows.
 
+    With --response-cache, individual domain responses are cached by content, so
+    re-running a corpus after changing a prompt, model or guidance document only
+    pays for the domains whose inputs changed, even when --force is used.
+
+    Progress is checkpointed after each domain to a .checkpoint.json file next to
+    the manuscript. If an assessment is interrupted, running the same command
+    again resumes from the first incomplete domain. The checkpoint is removed
+    once the JSON results are saved.
+
+    Completed assessments are recorded in a manifest keyed by the SHA-256 of the
+    manuscript, the model, the temperature, the guidance document and the
+    framework questions. A manuscript that was already assessed under another
+    path or file name reuses the earlier result, and a saved assessment is not
+    reused once any of these parameters change. Pass the same --manifest to
+    share results between directories.
+
     If a directory is provided, all PDF files within that directory will be processed,
     and a summary CSV file will be generated containing the risk of bias assessments
-    for each manuscript that is compatible with tools such as robvis.
+    for each manuscript that is compatible with tools such as robvis. With
+    --jobs N, up to N manuscripts are assessed at the same time and a progress bar
+    replaces the per-question output. Identical manuscripts are only assessed
+    once. Summary rows are appended as assessments complete and sorted into
+    filename order at the end. Use --rpm and
+    --tpm to keep the combined requests within your account's rate limits.
+
+    With --batch, all manuscripts that need assessing are submitted together using
+    the OpenAI Batch API, which is billed at a lower price and is not subject to
+    the interactive rate limits.
+
+    With --skip-logic, conditional signalling questions such as RoB2 question 2.3
+    are only sent to the model when the answers to the questions they depend on
+    make them applicable, and are otherwise answered "Not Applicable". This
+    reduces output tokens but needs extra requests for some domains. Batch jobs
+    always ask every question.
+
+    Like make, the Markdown and HTML exports and the summary CSV are only
+    regenerated when they are missing or older than the assessments they are
+    built from. With --dry-run, the assessments and exports that would be
+    rebuilt are listed and nothing is run or written.
     """
     manuscript_path = Path(manuscript)
+    if batch:
+        # Batch jobs always ask every question
+        skip_logic = False
+    corpus_root = (
+        manuscript_path if manuscript_path.is_dir() else manuscript_path.parent
+    )
+    assessments = AssessmentManifest(
+        Path(manifest) if manifest else corpus_root / settings.manifest_filename
+    )
 
     # If input is a directory, process all PDFs in it
     if manuscript_path.is_dir():
@@ -83,26 +184,100 @@ def analyse(
             typer.echo(f"No PDF files found in directory: {manuscript_path}")
             return None
 
-        for pdf_path in pdf_files:
-            if verbose:
-                typer.echo(f"Analysing {pdf_path.name}")
-            framework = analyse(
-                manuscript=str(pdf_path),
+        summary_path = manuscript_path / "risk_of_bias_summary.csv"
+        if dry_run:
+            _report_rebuilds(
+                pdf_files,
+                summary_path,
+                model=model,
+                temperature=temperature,
+                guidance_document=guidance_document,
+                force=force,
+                manifest=assessments,
+                skip_logic=skip_logic,
+            )
+            return None
+
+        if batch:
+            failed = _run_batch_assessments(
+                pdf_files,
                 model=model,
                 temperature=temperature,
                 guidance_document=guidance_document,
                 verbose=verbose,
                 force=force,
+                response_cache=response_cache,
+                manifest=assessments,
+            )
+            # Failed assessments are not saved, so the next run retries them
+            pdf_files = [pdf_path for pdf_path in pdf_files if pdf_path not in failed]
+
+        # Shared by all jobs, so concurrent assessments use one SQLite
+        # connection and stay within one set of rate limits.
+        cache = ResponseCache(response_cache) if response_cache else None
+        rate_limiter = RateLimiter(rpm, tpm) if rpm or tpm else None
+
+        def assess(pdf_path: Path, reuse: Optional[Path] = None) -> Framework:
+            return _analyse_manuscript(
+                pdf_path,
+                model=model,
+                temperature=temperature,
+                guidance_document=guidance_document,
+                verbose=verbose and jobs == 1,
+                force=force and not batch,
+                cache=cache,
+                skip_logic=skip_logic,
+                rate_limiter=rate_limiter,
+                manifest=assessments,
+                reuse=reuse,
             )
-            if framework is not None:
+
+        # Rows are appended as each manuscript completes, so the CSV stays
+        # current during long runs without re-summarising earlier results. An
+        # up to date CSV is left alone unless an assessment changes.
+        summary_current = not force and _summary_is_current(summary_path, pdf_files)
+        writer = None if summary_current else SummaryWriter(summary_path)
+        if jobs == 1:
+            for pdf_path in pdf_files:
+                if verbose:
+                    typer.echo(f"Analysing {pdf_path.name}")
+                framework = assess(pdf_path)
                 results.append(framework)
+                if writer is not None:
+                    writer.add(framework)
+        else:
+            guidance_document_path = (
+                Path(guidance_document) if guidance_document else None
+            )
+            keys = {
+                pdf_path: assessment_key(
+                    pdf_path,
+                    get_rob2_framework(),
+                    model,
+                    temperature,
+                    guidance_document_path,
+                    skip_logic,
+                )
+                for pdf_path in pdf_files
+            }
+            results = _assess_concurrently(
+                pdf_files,
+                assess,
+                jobs,
+                keys,
+                on_complete=writer.add if writer is not None else None,
+            )
+            if writer is not None:
+                # Rows were appended in completion order
+                writer.reorder([pdf_path.name for pdf_path in pdf_files])
 
+        if writer is not None:
+            frameworks_summary = writer.summary
+        else:
             frameworks_summary = summarise_frameworks(results)
-            print_summary(frameworks_summary)
-            export_summary(
-                frameworks_summary,
-                path=manuscript_path / "risk_of_bias_summary.csv",
-            )
+            if is_stale(summary_path, *map(_json_path, pdf_files)):
+                export_summary(frameworks_summary, summary_path)
+        print_summary(frameworks_summary)
 
         if verbose:
             typer.echo(f"Processed {len(results)} PDF files from directory")
@@ -111,22 +286,104 @@ def analyse(
         return results[-1] if results else None
 
     # Single file processing (existing logic)
+    if dry_run:
+        _report_rebuilds(
+            [manuscript_path],
+            None,
+            model=model,
+            temperature=temperature,
+            guidance_document=guidance_document,
+            force=force,
+            manifest=assessments,
+            skip_logic=skip_logic,
+        )
+        return None
+
+    if batch:
+        if _run_batch_assessments(
+            [manuscript_path],
+            model=model,
+            temperature=temperature,
+            guidance_document=guidance_document,
+            verbose=verbose,
+            force=force,
+            response_cache=response_cache,
+            manifest=assessments,
+        ):
+            return None
+        force = False
+
+    return _analyse_manuscript(
+        manuscript_path,
+        model=model,
+        temperature=temperature,
+        guidance_document=guidance_document,
+        verbose=verbose,
+        force=force,
+        cache=ResponseCache(response_cache) if response_cache else None,
+        skip_logic=skip_logic,
+        rate_limiter=RateLimiter(rpm, tpm) if rpm or tpm else None,
+        manifest=assessments,
+    )
+
+
+def _analyse_manuscript(
+    manuscript_path: Path,
+    model: str,
+    temperature: float,
+    guidance_document: Optional[str],
+    verbose: bool,
+    force: bool,
+    cache: Optional[ResponseCache],
+    skip_logic: bool,
+    rate_limiter: Optional[RateLimiter] = None,
+    manifest: Optional[AssessmentManifest] = None,
+    reuse: Optional[Path] = None,
+) -> Framework:
+    """Assess one manuscript, or load its saved assessment, and export it.
+
+    ``reuse`` is a saved assessment of an identical manuscript to load instead
+    of looking one up.
+    """
+
     guidance_document_path = Path(guidance_document) if guidance_document else None
 
     output_json_path = manuscript_path.with_suffix(manuscript_path.suffix + ".json")
-    output_md_path = manuscript_path.with_suffix(manuscript_path.suffix + ".md")
-    output_html_path = manuscript_path.with_suffix(manuscript_path.suffix + ".html")
+    checkpoint_path = manuscript_path.with_suffix(
+        manuscript_path.suffix + ".checkpoint.json"
+    )
 
-    # Check if JSON file already exists and load it if not forcing reprocessing
-    if output_json_path.exists() and not force:
+    key = None
+    saved_json_path = None
+    if manifest is not None:
+        key = assessment_key(
+            manuscript_path,
+            get_rob2_framework(),
+            model,
+            temperature,
+            guidance_document_path,
+            skip_logic,
+        )
+    if reuse is not None:
+        saved_json_path = reuse
+    elif not force:
+        saved_json_path = _find_saved_assessment(manuscript_path, manifest, key)
+
+    completed_framework = None
+    # Load the saved assessment if one exists and we are not forcing reprocessing
+    if saved_json_path is not None:
         if verbose:
-            typer.echo(f"Found existing JSON file: {output_json_path}")
+            typer.echo(f"Found existing JSON file: {saved_json_path}")
             typer.echo("Loading saved assessment instead of reprocessing...")
 
         try:
-            completed_framework = Framework.load(output_json_path)
+            completed_framework = Framework.load(saved_json_path)
+            if saved_json_path != output_json_path:
+                # The same manuscript was assessed under another path
+                completed_framework.manuscript = manuscript_path.name
+                completed_framework.save(output_json_path)
             # Ensure manuscript filename is set (for backward compatibility)
-            if not completed_framework.manuscript:
+            elif not completed_framework.manuscript:
                 completed_framework.manuscript = manuscript_path.name
                 # Save the updated framework with manuscript filename
                 completed_framework.save(output_json_path)
@@ -141,16 +398,9 @@ def analyse(
             if verbose:
                 typer.echo(f"Error loading existing JSON file: {e}")
                 typer.echo("Proceeding with fresh assessment...")
-            completed_framework = run_framework(
-                manuscript=manuscript_path,
-                framework=get_rob2_framework(),
-                model=model,
-                guidance_document=guidance_document_path,
-                verbose=verbose,
-                temperature=temperature,
-            )
+            completed_framework = None
 
-    else:
+    if completed_framework is None:
         completed_framework = run_framework(
             manuscript=manuscript_path,
             framework=get_rob2_framework(),
@@ -158,18 +408,282 @@ def analyse(
             guidance_document=guidance_document_path,
             verbose=verbose,
             temperature=temperature,
+            cache=cache,
+            rate_limiter=rate_limiter,
+            checkpoint=checkpoint_path,
+            skip_logic=skip_logic,
         )
 
         completed_framework.save(output_json_path)
+        checkpoint_path.unlink(missing_ok=True)
         if verbose:
             typer.echo(f"Assessment saved to: {output_json_path}")
 
-    completed_framework.export_to_markdown(output_md_path)
-    completed_framework.export_to_html(output_html_path)
+    if manifest is not None and key is not None:
+        manifest.record(
+            key,
+            output_json_path,
+            model=model,
+            temperature=temperature,
+            skip_logic=skip_logic,
+        )
+
+    _export_stale(completed_framework, output_json_path, force)
 
     return completed_framework
 
 
+def _assess_concurrently(
+    pdf_files: List[Path],
+    assess: Callable[..., Framework],
+    jobs: int,
+    keys: dict[Path, str],
+    on_complete: Optional[Callable[[Framework], None]] = None,
+) -> List[Framework]:
+    """Assess manuscripts on ``jobs`` threads, returning results in input order.
+
+    Manuscripts with the same assessment key are identical, so only the first
+    is assessed and the others reuse its saved assessment once it completes.
+    ``on_complete`` is called on the calling thread with each framework as soon
+    as it is available.
+    """
+
+    duplicates: dict[Path, List[Path]] = {}
+    first: dict[str, Path] = {}
+    for pdf_path in pdf_files:
+        original = first.setdefault(keys[pdf_path], pdf_path)
+        if original != pdf_path:
+            duplicates.setdefault(original, []).append(pdf_path)
+
+    results: dict[Path, Framework] = {}
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(assess, pdf_path): pdf_path for pdf_path in first.values()
+        }
+        with typer.progressbar(
+            as_completed(futures),
+            length=len(pdf_files),
+            label="Assessing manuscripts",
+        ) as progress:
+            for future in progress:
+                pdf_path = futures[future]
+                completed = [(pdf_path, future.result())]
+                for duplicate in duplicates.get(pdf_path, []):
+                    completed.append(
+                        (duplicate, assess(duplicate, reuse=_json_path(pdf_path)))
+                    )
+                    progress.update(1)
+                for completed_path, framework in completed:
+                    results[completed_path] = framework
+                    if on_complete is not None:
+                        on_complete(framework)
+
+    return [results[pdf_path] for pdf_path in pdf_files]
+
+
+def _json_path(manuscript_path: Path) -> Path:
+    return manuscript_path.with_suffix(manuscript_path.suffix + ".json")
+
+
+def _export_paths(manuscript_path: Path) -> List[Path]:
+    return [
+        manuscript_path.with_suffix(manuscript_path.suffix + suffix)
+        for suffix in (".md", ".html")
+    ]
+
+
+def _export_stale(framework: Framework, json_path: Path, force: bool) -> None:
+    """Regenerate the Markdown and HTML exports older than the saved JSON."""
+
+    manuscript_path = json_path.with_suffix("")
+    md_path, html_path = _export_paths(manuscript_path)
+    if force or is_stale(md_path, json_path):
+        framework.export_to_markdown(md_path)
+    if force or is_stale(html_path, json_path):
+        framework.export_to_html(html_path)
+
+
+def _summary_is_current(summary_path: Path, pdf_files: List[Path]) -> bool:
+    """Return whether the summary CSV lists these manuscripts and is up to date."""
+
+    if is_stale(summary_path, *map(_json_path, pdf_files)):
+        return False
+    try:
+        with summary_path.open(newline="") as csv_file:
+            studies = [row[0] for row in list(csv.reader(csv_file))[1:] if row]
+    except (OSError, csv.Error):
+        return False
+    return studies == [pdf_path.name for pdf_path in pdf_files]
+
+
+def _report_rebuilds(
+    pdf_files: List[Path],
+    summary_path: Optional[Path],
+    model: str,
+    temperature: float,
+    guidance_document: Optional[str],
+    force: bool,
+    manifest: AssessmentManifest,
+    skip_logic: bool = False,
+) -> None:
+    """Print the assessments and exports a run would rebuild."""
+
+    guidance_document_path = Path(guidance_document) if guidance_document else None
+    rebuilt: List[Path] = []
+    for pdf_path in pdf_files:
+        json_path = _json_path(pdf_path)
+        saved = None
+        if not force:
+            key = assessment_key(
+                pdf_path,
+                get_rob2_framework(),
+                model,
+                temperature,
+                guidance_document_path,
+                skip_logic,
+            )
+            saved = _find_saved_assessment(pdf_path, manifest, key)
+
+        if saved is None:
+            typer.echo(f"Would assess {pdf_path}")
+            rebuilt.append(json_path)
+        elif saved != json_path:
+            typer.echo(f"Would reuse {saved} for {pdf_path}")
+            rebuilt.append(json_path)
+
+        for export_path in _export_paths(pdf_path):
+            if json_path in rebuilt or is_stale(export_path, json_path):
+                typer.echo(f"Would export {export_path}")
+                rebuilt.append(export_path)
+
+    if summary_path is not None and (
+        force
+        or any(path.suffix == ".json" for path in rebuilt)
+        or not _summary_is_current(summary_path, pdf_files)
+    ):
+        typer.echo(f"Would write {summary_path}")
+        rebuilt.append(summary_path)
+
+    if not rebuilt:
+        typer.echo("Everything is up to date")
+
+
+def _find_saved_assessment(
+    manuscript_path: Path,
+    manifest: Optional[AssessmentManifest],
+    key: Optional[str],
+) -> Optional[Path]:
+    """Return the saved assessment to reuse for a manuscript, if there is one.
+
+    The manuscript's own JSON file is preferred when the manifest records it
+    with the same parameters. Otherwise the manifest is consulted, so an
+    assessment of the same manuscript saved under another path is found. A
+    JSON file next to the manuscript is only reused when the manifest does not
+    record it with other parameters.
+    """
+
+    output_json_path = manuscript_path.with_suffix(manuscript_path.suffix + ".json")
+    if manifest is not None and key is not None:
+        if manifest.key_for(output_json_path) == key and output_json_path.exists():
+            return output_json_path
+        recorded = manifest.get(key)
+        if recorded is not None:
+            return recorded
+        recorded_key = manifest.key_for(output_json_path)
+        if recorded_key is not None and recorded_key != key:
+            return None
+    return output_json_path if output_json_path.exists() else None
+
+
+def _run_batch_assessments(
+    pdf_files: List[Path],
+    model: str,
+    temperature: float,
+    guidance_document: Optional[str],
+    verbose: bool,
+    force: bool,
+    response_cache: Optional[str],
+    manifest: Optional[AssessmentManifest] = None,
+) -> dict[Path, str]:
+    """Assess manuscripts without a saved assessment in batch and save the results.
+
+    Only complete assessments are saved and recorded in the manifest. The
+    manuscripts whose assessment failed are reported and returned with the
+    reason.
+    """
+
+    guidance_document_path = Path(guidance_document) if guidance_document else None
+    # Batch jobs ask every question, so they are recorded without skip logic
+    keys = {
+        pdf_path: (
+            assessment_key(
+                pdf_path,
+                get_rob2_framework(),
+                model,
+                temperature,
+                guidance_document_path,
+            )
+            if manifest is not None
+            else None
+        )
+        for pdf_path in pdf_files
+    }
+    pending = [
+        pdf_path
+        for pdf_path in pdf_files
+        if force or _find_saved_assessment(pdf_path, manifest, keys[pdf_path]) is None
+    ]
+    if not pending:
+        return {}
+
+    if verbose:
+        typer.echo(f"Submitting {len(pending)} manuscripts to the Batch API")
+
+    failed: dict[Path, str] = {}
+    frameworks = run_frameworks_batch(
+        pending,
+        model=model,
+        guidance_document=guidance_document_path,
+        verbose=verbose,
+        temperature=temperature,
+        cache=ResponseCache(response_cache) if response_cache else None,
+        on_failure=failed.__setitem__,
+    )
+    for pdf_path, framework in zip(pending, frameworks):
+        if pdf_path not in failed and not _is_complete(framework):
+            failed[pdf_path] = "Some questions were not answered"
+        if pdf_path in failed:
+            typer.echo(
+                f"Batch assessment of {pdf_path} failed: {failed[pdf_path]}",
+                err=True,
+            )
+            continue
+        output_json_path = pdf_path.with_suffix(pdf_path.suffix + ".json")
+        framework.save(output_json_path)
+        key = keys[pdf_path]
+        if manifest is not None and key is not None:
+            manifest.record(
+                key,
+                output_json_path,
+                model=model,
+                temperature=temperature,
+                skip_logic=False,
+            )
+        if verbose:
+            typer.echo(f"Assessment saved to: {output_json_path}")
+    return failed
+
+
+def _is_complete(framework: Framework) -> bool:
+    """Return whether every question of the framework has been answered."""
+
+    return all(
+        question.response is not None
+        for domain in framework.domains
+        for question in domain.questions
+    )
+
+
 @app.command()
 def human(
     manuscript: str = typer.Argument(
@@ -182,8 +696,6 @@ def human(
     manuscript_path = Path(manuscript)
 
     output_json_path = manuscript_path.with_suffix(manuscript_path.suffix + ".json")
-    output_md_path = manuscript_path.with_suffix(manuscript_path.suffix + ".md")
-    output_html_path = manuscript_path.with_suffix(manuscript_path.suffix + ".html")
 
     if output_json_path.exists() and not force:
         typer.echo(f"Found existing JSON file: {output_json_path}")
@@ -193,8 +705,7 @@ def human(
         framework.save(output_json_path)
         typer.echo(f"Assessment saved to: {output_json_path}")
 
-    framework.export_to_markdown(output_md_path)
-    framework.export_to_html(output_html_path)
+    _export_stale(framework, output_json_path, force)
 
     return framework
 
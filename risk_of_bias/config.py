@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -11,5 +13,34 @@ class Settings(BaseSettings):
     # OpenAI API settings
     temperature: float = 0.2
 
+    # concurrency settings
+    max_concurrent_assessments: int = 8
+
+    # rate limit settings, None disables a limit
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    rate_limit_pdf_bytes_per_token: int = 20
+    rate_limit_output_tokens_per_question: int = 400
+
+    # batch API settings
+    batch_poll_interval: float = 30.0
+    batch_completion_window: str = "24h"
+
+    # response cache settings
+    cache_max_entries: Optional[int] = 50_000
+    cache_max_bytes: Optional[int] = 1024 * 1024 * 1024
+    cache_max_age_days: Optional[float] = 180
+
+    # web service settings
+    web_max_concurrent_jobs: int = 4
+    web_max_upload_bytes: int = 10 * 1024 * 1024
+    web_retention_days: Optional[float] = 7
+    web_max_disk_bytes: Optional[int] = 5 * 1024 * 1024 * 1024
+    web_cleanup_interval_seconds: float = 600
+    web_file_cache_entries: int = 256
+
+    # assessment manifest settings
+    manifest_filename: str = "risk_of_bias_manifest.jsonl"
+
 
 settings = Settings()
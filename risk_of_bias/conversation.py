@@ -0,0 +1,336 @@
+"""Conversations and request arguments shared by the assessment runners.
+
+These building blocks are used by :mod:`risk_of_bias.run_framework` for
+interactive requests and by :mod:`risk_of_bias.batch` for Batch API jobs, so
+both send identical requests and record the answers in the same way.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from risk_of_bias.cache import ResponseCache, make_cache_key, sha256_file
+from risk_of_bias.oai._utils import create_openai_message, pdf_to_base64
+from risk_of_bias.prompts import SYSTEM_MESSAGE
+from risk_of_bias.types._domain_types import Domain
+from risk_of_bias.types._framework_types import Framework
+from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._response_types import (
+    ReasonedResponseWithEvidenceAndRawData,
+    create_domain_response_class,
+)
+
+QuestionCallback = Callable[[Domain, Question], None]
+
+
+def assessment_documents(
+    manuscript: Path, guidance_document: Optional[Path]
+) -> list[Path]:
+    """Return the PDFs sent to the model, checking the guidance document exists."""
+
+    documents = [manuscript]
+    if guidance_document is not None:
+        if not guidance_document.exists() or not guidance_document.is_file():
+            raise ValueError(
+                f"Guidance document {guidance_document} must exist and be a file."
+            )
+        documents.insert(0, guidance_document)
+    return documents
+
+
+def _pdf_message(
+    text: str,
+    document: Path,
+    filename: str,
+    file_ids: Optional[dict[Path, str]],
+) -> dict[str, Any]:
+    """Attach a PDF to a user message, by uploaded file id when available."""
+
+    if file_ids and document in file_ids:
+        return create_openai_message("user", text=text, file_id=file_ids[document])
+
+    file_as_base64_string = pdf_to_base64(document)
+    return create_openai_message(
+        "user",
+        text=text,
+        file_data=f"data:application/pdf;base64,{file_as_base64_string}",
+        filename=filename,
+    )
+
+
+def prepare_chat_input(
+    framework: Framework,
+    manuscript: Path,
+    model: str,
+    guidance_document: Optional[Path],
+    file_ids: Optional[dict[Path, str]] = None,
+) -> list[Any]:
+    """Build the conversation prefix shared by every domain request.
+
+    PDFs listed in ``file_ids`` are referenced by their uploaded file id, all
+    other PDFs are embedded as base64 data.
+    """
+
+    # Send system message to set context for the AI model
+    chat_input: list[Any] = [create_openai_message("system", text=SYSTEM_MESSAGE)]
+
+    # Set the manuscript filename and model name on the framework
+    framework.manuscript = manuscript.name
+    framework.assessor = model
+
+    # Send the framework guidance to the AI model
+    if guidance_document is not None:
+        assessment_documents(manuscript, guidance_document)
+
+        chat_input.append(
+            _pdf_message(
+                "This document provides guidance on how to answer the "
+                "risk of bias questions.",
+                guidance_document,
+                "guidance_document.pdf",
+                file_ids,
+            )
+        )
+
+        chat_input.append(
+            create_openai_message(
+                "assistant",
+                text="Thank you for sharing the guidance document, "
+                "please share the manuscript for me to review.",
+                content_type="output",
+            )
+        )
+
+    # Send the manuscript to the AI model
+    chat_input.append(
+        _pdf_message(
+            "This is the paper we will be analyzing for risk of bias.",
+            manuscript,
+            manuscript.name.split("/")[-1],
+            file_ids,
+        )
+    )
+
+    return chat_input
+
+
+def domain_parse_kwargs(
+    domain: Domain,
+    chat_input: list[Any],
+    model: str,
+    temperature: float,
+) -> dict[str, Any]:
+    """Append the domain's questions to ``chat_input`` and build the request."""
+
+    # Create a single response class for all questions in the domain
+    domain_response_class = create_domain_response_class(domain)
+
+    questions_text = "\n".join(q.question for q in domain.questions)
+
+    chat_input.append(create_openai_message("user", text=questions_text))
+
+    parse_kwargs: dict[str, Any] = {
+        "model": model,
+        "input": chat_input,
+        "text_format": domain_response_class,
+    }
+    if temperature >= 0:
+        parse_kwargs["temperature"] = temperature
+
+    return parse_kwargs
+
+
+def document_digests(
+    cache: Optional[ResponseCache],
+    manuscript: Path,
+    guidance_document: Optional[Path],
+) -> dict[str, Optional[str]]:
+    """Hash the PDFs sent to the model, only when a response cache is in use."""
+
+    if cache is None:
+        return {}
+    return {
+        "manuscript": sha256_file(manuscript),
+        "guidance_document": (
+            sha256_file(guidance_document) if guidance_document else None
+        ),
+    }
+
+
+def domain_cache_key(
+    digests: dict[str, Optional[str]],
+    domain: Domain,
+    parse_kwargs: dict[str, Any],
+) -> str:
+    """Build the response cache key for one domain request.
+
+    Besides the documents and the domain's questions, the key covers the turns
+    the domain sees after the shared documents: the questions and answers of
+    the domains it depends on and of earlier skip logic phases. An answer is
+    therefore not replayed once anything it was given has changed.
+    """
+
+    return make_cache_key(
+        **digests,
+        schema=parse_kwargs["text_format"].model_json_schema(),
+        model=parse_kwargs["model"],
+        temperature=parse_kwargs.get("temperature"),
+        prompt=[SYSTEM_MESSAGE] + [q.question for q in domain.questions],
+        turns=_conversation_turns(parse_kwargs["input"]),
+    )
+
+
+def _conversation_turns(chat_input: list[Any]) -> list[list[Any]]:
+    """Return the role and text of each message after the last attached PDF.
+
+    The PDFs are identified by their digests instead, as their payload or
+    uploaded file id differs between requests for the same document.
+    """
+
+    turns: list[list[Any]] = []
+    for message in chat_input:
+        content = message.get("content")
+        if isinstance(content, list):
+            if any(part.get("type", "").endswith("_file") for part in content):
+                turns = []
+                continue
+            content = [part.get("text") for part in content]
+        turns.append([message.get("role"), content])
+    return turns
+
+
+def store_cached_response(
+    cache: Optional[ResponseCache],
+    digests: dict[str, Optional[str]],
+    domain: Domain,
+    chat_input: list[Any],
+    parse_kwargs: dict[str, Any],
+    verbose: bool,
+    on_question: Optional[QuestionCallback] = None,
+) -> bool:
+    """Store a cached answer for the domain, returning ``False`` on a miss."""
+
+    if cache is None:
+        return False
+
+    output_text = cache.get(domain_cache_key(digests, domain, parse_kwargs))
+    if output_text is None:
+        return False
+
+    if verbose:
+        print("  Using cached response")
+    replay_domain_response(
+        domain, chat_input, parse_kwargs, output_text, verbose, on_question
+    )
+    return True
+
+
+def replay_domain_response(
+    domain: Domain,
+    chat_input: list[Any],
+    parse_kwargs: dict[str, Any],
+    output_text: str,
+    verbose: bool,
+    on_question: Optional[QuestionCallback] = None,
+) -> None:
+    """Store a previously recorded model output as the domain's answer."""
+
+    parsed_response = parse_kwargs["text_format"].model_validate_json(output_text)
+    store_domain_response(
+        domain,
+        chat_input,
+        None,
+        verbose,
+        output_text,
+        parsed_response,
+        on_question=on_question,
+    )
+
+
+def response_field_name(question: Question) -> str:
+    """Return the response class field holding the answer to ``question``."""
+
+    return f"question_{int(question.index * 10)}"  # 1.1 -> 11, 1.2 -> 12
+
+
+def set_question_response(
+    domain: Domain,
+    question: Question,
+    parsed: Any,
+    raw_response: Any,
+    verbose: bool,
+    on_question: Optional[QuestionCallback],
+    announced: set[float],
+) -> None:
+    """Store one parsed answer, announcing each question only the first time."""
+
+    question.response = ReasonedResponseWithEvidenceAndRawData(
+        response=parsed.response,
+        reasoning=parsed.reasoning,
+        # Convert string to list, keeping answers without evidence empty as
+        # when a question is answered Not Applicable without being asked
+        evidence=[parsed.evidence] if parsed.evidence else [],
+        raw_data=raw_response,
+    )
+
+    if question.index in announced:
+        return
+    announced.add(question.index)
+
+    if verbose:
+        print(
+            f"  Question {question.index}: {question.question} "
+            f"({question.allowed_answers})"
+        )
+        print(f"    Response: {parsed.response}")
+        print(f"      Reasoning: {parsed.reasoning}")
+        print(f"        Evidence: {parsed.evidence}")
+        print("\n\n")
+
+    if on_question is not None:
+        on_question(domain, question)
+
+
+def store_domain_response(
+    domain: Domain,
+    chat_input: list[Any],
+    raw_response: Any,
+    verbose: bool,
+    output_text: Optional[str] = None,
+    parsed_response: Any = None,
+    on_question: Optional[QuestionCallback] = None,
+    announced: Optional[set[float]] = None,
+) -> None:
+    """Record the model's answer in the conversation and on the domain.
+
+    The answer is taken from ``raw_response`` when one is available, otherwise
+    from ``output_text`` and ``parsed_response``, as restored from a cache.
+    Questions listed in ``announced`` were already reported while streaming
+    and are updated without being reported again.
+    """
+
+    if raw_response is not None:
+        output_text = raw_response.output_text
+        parsed_response = raw_response.output_parsed
+
+    chat_input.append(
+        create_openai_message("assistant", text=output_text, content_type="output")
+    )
+
+    if announced is None:
+        announced = set()
+
+    # Process each question response from the domain response
+    if parsed_response:
+        for question in domain.questions:
+            field_name = response_field_name(question)
+
+            if hasattr(parsed_response, field_name):
+                set_question_response(
+                    domain,
+                    question,
+                    getattr(parsed_response, field_name),
+                    raw_response,
+                    verbose,
+                    on_question,
+                    announced,
+                )
@@ -3,6 +3,39 @@ from pathlib import Path
 from risk_of_bias.types._framework_types import Framework
 
 
+def is_stale(target: Path, *sources: Path) -> bool:
+    """Return whether ``target`` needs rebuilding from ``sources``.
+
+    Like ``make``, a target is stale when it does not exist or when any of the
+    files it is built from was modified after it. Missing sources are ignored,
+    as they cannot have changed since the target was written.
+
+    Parameters
+    ----------
+    target : Path
+        The generated file, for example a Markdown export.
+    *sources : Path
+        The files the target is generated from, for example the saved
+        assessment JSON.
+
+    Returns
+    -------
+    bool
+        ``True`` if the target should be regenerated.
+    """
+    try:
+        built = target.stat().st_mtime_ns
+    except FileNotFoundError:
+        return True
+    for source in sources:
+        try:
+            if source.stat().st_mtime_ns > built:
+                return True
+        except FileNotFoundError:
+            continue
+    return False
+
+
 def export_framework_as_markdown(framework: Framework, path: Path) -> None:
     """Export a completed framework as a Markdown document.
 
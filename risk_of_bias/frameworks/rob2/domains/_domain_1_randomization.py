@@ -154,5 +154,6 @@ domain_1_randomization = Domain(
     questions=[q1_1, q1_2, q1_3, q_o],
     name="Bias arising from the randomization process.",
     index=1,
+    depends_on=[],
     judgement_function=_compute_judgement,
 )
@@ -1,5 +1,5 @@
 from risk_of_bias.types._domain_types import Domain
-from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._question_types import Precondition, Question
 
 q2_1 = Question(
     question=(
@@ -51,6 +51,10 @@ q2_3 = Question(
     ],
     index=2.3,
     is_required=True,
+    precondition=Precondition(
+        questions=[2.1, 2.2],
+        answers=["Yes", "Probably Yes", "No Information"],
+    ),
 )
 
 q2_4 = Question(
@@ -68,6 +72,10 @@ q2_4 = Question(
     ],
     index=2.4,
     is_required=True,
+    precondition=Precondition(
+        questions=[2.3],
+        answers=["Yes", "Probably Yes"],
+    ),
 )
 
 q2_5 = Question(
@@ -85,6 +93,10 @@ q2_5 = Question(
     ],
     index=2.5,
     is_required=True,
+    precondition=Precondition(
+        questions=[2.4],
+        answers=["Yes", "Probably Yes", "No Information"],
+    ),
 )
 
 q2_6 = Question(
@@ -121,6 +133,10 @@ q2_7 = Question(
     ],
     index=2.7,
     is_required=True,
+    precondition=Precondition(
+        questions=[2.6],
+        answers=["No", "Probably No", "No Information"],
+    ),
 )
 
 q2_o = Question(
@@ -212,5 +228,6 @@ domain_2_deviations = Domain(
     questions=[q2_1, q2_2, q2_3, q2_4, q2_5, q2_6, q2_7, q2_o],
     name="Deviations from intended interventions",
     index=2,
+    depends_on=[],
     judgement_function=_compute_judgement,
 )
@@ -1,5 +1,5 @@
 from risk_of_bias.types._domain_types import Domain
-from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._question_types import Precondition, Question
 
 q3_1 = Question(
     question=(
@@ -31,6 +31,10 @@ q3_2 = Question(
     ],
     index=3.2,
     is_required=True,
+    precondition=Precondition(
+        questions=[3.1],
+        answers=["No", "Probably No", "No Information"],
+    ),
 )
 
 q3_3 = Question(
@@ -48,6 +52,10 @@ q3_3 = Question(
     ],
     index=3.3,
     is_required=True,
+    precondition=Precondition(
+        questions=[3.2],
+        answers=["No", "Probably No"],
+    ),
 )
 
 q3_4 = Question(
@@ -65,6 +73,10 @@ q3_4 = Question(
     ],
     index=3.4,
     is_required=True,
+    precondition=Precondition(
+        questions=[3.3],
+        answers=["Yes", "Probably Yes", "No Information"],
+    ),
 )
 
 q3_o = Question(
@@ -128,5 +140,6 @@ domain_3_missing = Domain(
     questions=[q3_1, q3_2, q3_3, q3_4, q3_o],
     name="Missing outcome data",
     index=3,
+    depends_on=[],
     judgement_function=_compute_judgement,
 )
@@ -1,5 +1,5 @@
 from risk_of_bias.types._domain_types import Domain
-from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._question_types import Precondition, Question
 
 q4_1 = Question(
     question=("Question 4.1: Was the method of measuring the outcome inappropriate?"),
@@ -45,6 +45,11 @@ q4_3 = Question(
     ],
     index=4.3,
     is_required=True,
+    precondition=Precondition(
+        questions=[4.1, 4.2],
+        answers=["No", "Probably No", "No Information"],
+        match="all",
+    ),
 )
 
 q4_4 = Question(
@@ -63,6 +68,10 @@ q4_4 = Question(
     ],
     index=4.4,
     is_required=True,
+    precondition=Precondition(
+        questions=[4.3],
+        answers=["Yes", "Probably Yes", "No Information"],
+    ),
 )
 
 q4_5 = Question(
@@ -81,6 +90,10 @@ q4_5 = Question(
     ],
     index=4.5,
     is_required=True,
+    precondition=Precondition(
+        questions=[4.4],
+        answers=["Yes", "Probably Yes", "No Information"],
+    ),
 )
 
 q4_o = Question(
@@ -160,5 +173,6 @@ domain_4_measurement = Domain(
     questions=[q4_1, q4_2, q4_3, q4_4, q4_5, q4_o],
     name="Measurement of the outcome",
     index=4,
+    depends_on=[],
     judgement_function=_compute_judgement,
 )
@@ -114,5 +114,6 @@ domain_5_selection = Domain(
     questions=[q5_1, q5_2, q5_3, q5_o],
     name="Selection of the reported result",
     index=5,
+    depends_on=[],
     judgement_function=_compute_judgement,
 )
@@ -19,4 +19,5 @@ overall_domain = Domain(
     questions=[q6_o],
     name="Overall",
     index=6,
+    depends_on=[1, 2, 3, 4, 5],
 )
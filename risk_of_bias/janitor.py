@@ -0,0 +1,170 @@
+"""Removal of expired web service uploads and results."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from risk_of_bias.config import settings
+
+
+class Janitor:
+    """
+    Keep the web service's job directories within an age and disk budget.
+
+    Every upload and its exports are written to a directory of their own under
+    ``root``. Without cleaning up, a long running service eventually fills its
+    disk. The janitor removes job directories that were last used more than
+    ``ttl_seconds`` ago, then removes the least recently used directories
+    until the total size is within ``max_bytes``. A directory counts as used
+    when it is written to or :meth:`touch` is called, for example when one of
+    its files is downloaded.
+
+    Parameters
+    ----------
+    root : Path
+        The directory holding one sub-directory per job.
+    ttl_seconds : float | None, default=settings.web_retention_days in seconds
+        Maximum time since a job directory was last used. ``None`` disables
+        the limit.
+    max_bytes : int | None, default=settings.web_max_disk_bytes
+        Maximum total size of the job directories. ``None`` disables the
+        limit.
+    in_use : Callable[[str], bool], optional
+        Called with a job id to check whether its directory must be kept
+        regardless of the limits, such as while the job is running.
+    on_evict : Callable[[str], None], optional
+        Called with the id of each job whose directory was removed.
+
+    Examples
+    --------
+    >>> janitor = Janitor(Path("/tmp/risk_of_bias_web"), max_bytes=10**9)
+    >>> janitor.start(interval=600)
+    >>> janitor.usage()["bytes"]
+    52428800
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        ttl_seconds: Optional[float] = (
+            settings.web_retention_days * 24 * 60 * 60
+            if settings.web_retention_days is not None
+            else None
+        ),
+        max_bytes: Optional[int] = settings.web_max_disk_bytes,
+        in_use: Optional[Callable[[str], bool]] = None,
+        on_evict: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.in_use = in_use
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self, job_id: str) -> None:
+        """Mark a job directory as just used, keeping it longest."""
+        try:
+            os.utime(self.root / job_id)
+        except FileNotFoundError:
+            pass
+
+    def usage(self) -> dict[str, Any]:
+        """Return the number and total size of the job directories and limits."""
+        directories = self._directories()
+        return {
+            "jobs": len(directories),
+            "bytes": sum(size for _, _, size in directories),
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def sweep(self) -> list[str]:
+        """Remove expired and least recently used job directories.
+
+        Returns
+        -------
+        list[str]
+            The ids of the jobs that were removed.
+        """
+        with self._lock:
+            now = time.time()
+            evicted: list[str] = []
+            remaining: list[tuple[Path, int, bool]] = []
+            # Least recently used first
+            for path, used, size in sorted(self._directories(), key=lambda d: d[1]):
+                protected = self.in_use is not None and self.in_use(path.name)
+                if (
+                    not protected
+                    and self.ttl_seconds is not None
+                    and now - used > self.ttl_seconds
+                ):
+                    self._evict(path, evicted)
+                else:
+                    remaining.append((path, size, protected))
+
+            if self.max_bytes is not None:
+                total = sum(size for _, size, _ in remaining)
+                for path, size, protected in remaining:
+                    if total <= self.max_bytes:
+                        break
+                    if not protected:
+                        self._evict(path, evicted)
+                        total -= size
+            return evicted
+
+    def start(self, interval: float = settings.web_cleanup_interval_seconds) -> None:
+        """Sweep now and then every ``interval`` seconds on a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while True:
+                self.sweep()
+                if self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(
+            target=run, name="risk_of_bias_janitor", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread started by :meth:`start`."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _directories(self) -> list[tuple[Path, float, int]]:
+        """Return each job directory with its last use time and size."""
+        directories: list[tuple[Path, float, int]] = []
+        if not self.root.is_dir():
+            return directories
+        for path in self.root.iterdir():
+            try:
+                if not path.is_dir():
+                    continue
+                used = path.stat().st_mtime
+                size = sum(
+                    file.stat().st_size for file in path.rglob("*") if file.is_file()
+                )
+            except FileNotFoundError:
+                # Removed while scanning
+                continue
+            directories.append((path, used, size))
+        return directories
+
+    def _evict(self, path: Path, evicted: list[str]) -> None:
+        shutil.rmtree(path, ignore_errors=True)
+        evicted.append(path.name)
+        if self.on_evict is not None:
+            self.on_evict(path.name)
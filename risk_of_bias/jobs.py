@@ -0,0 +1,207 @@
+"""Background execution of assessments submitted to the web service."""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Literal, Optional
+
+from risk_of_bias.config import settings
+from risk_of_bias.types._framework_types import Framework
+
+JobStatus = Literal["queued", "running", "completed", "failed"]
+
+
+@dataclass
+class Job:
+    """
+    An assessment of one uploaded manuscript.
+
+    Parameters
+    ----------
+    manuscript : Path
+        The uploaded PDF. The job's outputs are written to the same directory.
+    model : str
+        The model used for the assessment.
+    id : str
+        Identifies the job in URLs. A random id is generated by default.
+    sha256 : str, optional
+        The SHA-256 digest of the manuscript, when known.
+    key : str, optional
+        Identifies the assessment's inputs, see
+        :func:`~risk_of_bias.manifest.assessment_key`. Jobs submitted with the
+        key of a job still in progress are merged into it.
+    """
+
+    manuscript: Path
+    model: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    sha256: Optional[str] = None
+    key: Optional[str] = None
+    status: JobStatus = "queued"
+    error: Optional[str] = None
+    result: Optional[Framework] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _events: list[dict[str, Any]] = field(default_factory=list, repr=False)
+    _events_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def work_dir(self) -> Path:
+        """The directory holding the upload and its outputs."""
+        return self.manuscript.parent
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has completed or failed."""
+        return self.status in ("completed", "failed")
+
+    def publish(self, event: str, **data: Any) -> None:
+        """Append a progress event, such as a domain starting, to the job.
+
+        Events are kept for the lifetime of the job so that clients connecting
+        late, or reconnecting, receive the full history.
+        """
+        with self._events_lock:
+            self._events.append({"type": event, "id": len(self._events), **data})
+
+    def events(self, start: int = 0) -> list[dict[str, Any]]:
+        """Return the progress events published from position ``start`` on."""
+        with self._events_lock:
+            return self._events[start:]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the job's status as JSON serialisable data."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "manuscript": self.manuscript.name,
+            "model": self.model,
+            "sha256": self.sha256,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Run assessments on a bounded pool of background threads.
+
+    An assessment makes several model requests and takes minutes, so running it
+    inside a request handler ties up a server worker for that long and causes
+    proxies to time out. Jobs submitted to the queue return immediately, while
+    at most ``max_workers`` assessments run at once and the rest wait their
+    turn. Clients then poll :meth:`get` for the job's status.
+
+    Submitting a job with the same :attr:`Job.key` as a job that is queued or
+    running returns the existing job instead, so identical uploads arriving
+    together are only assessed once.
+
+    Parameters
+    ----------
+    max_workers : int, default=settings.web_max_concurrent_jobs
+        Maximum number of assessments running at the same time.
+
+    Examples
+    --------
+    >>> queue = JobQueue(max_workers=2)
+    >>> job = queue.submit(Job(Path("upload/manuscript.pdf"), "gpt-4.1"), assess)
+    >>> queue.wait(job.id).status
+    'completed'
+    """
+
+    def __init__(self, max_workers: int = settings.web_max_concurrent_jobs) -> None:
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="risk_of_bias_job"
+        )
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+        self._in_flight: dict[str, Job] = {}
+
+    def submit(self, job: Job, run: Callable[[Job], Framework]) -> Job:
+        """Queue ``run(job)`` and return the job without waiting for it.
+
+        The framework returned by ``run`` is stored on :attr:`Job.result`. If
+        ``run`` raises, the job fails and the exception message is stored on
+        :attr:`Job.error`. If a job with the same key is in progress it is
+        returned instead and ``job`` is discarded.
+        """
+        with self._lock:
+            if job.key is not None:
+                existing = self._in_flight.get(job.key)
+                if existing is not None:
+                    return existing
+                self._in_flight[job.key] = job
+            self._jobs[job.id] = job
+        job.publish("status", status=job.status)
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job with ``job_id``, or ``None`` if it is unknown."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        """Return every job that has not been forgotten, oldest first."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def forget(self, job_id: str) -> None:
+        """Drop a finished job, for example once its files have been removed."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.done:
+                del self._jobs[job_id]
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        """Block until the job has finished, or ``timeout`` seconds pass.
+
+        Raises
+        ------
+        KeyError
+            If no job with ``job_id`` was submitted.
+        """
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        job._done.wait(timeout)
+        return job
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs, optionally waiting for running ones to finish."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job: Job, run: Callable[[Job], Framework]) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        job.publish("status", status=job.status)
+
+        status: JobStatus = "completed"
+        try:
+            job.result = run(job)
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            status = "failed"
+        job.finished_at = time.time()
+        with self._lock:
+            if job.key is not None and self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+        # Publish the final event before the job reports it is done, so a
+        # client that sees the job finish has already been sent every event
+        job.publish("status", status=status, error=job.error)
+        job.status = status
+        job._done.set()
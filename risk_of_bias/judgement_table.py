@@ -0,0 +1,334 @@
+"""Compile domain judgement algorithms into dense lookup tables.
+
+Each domain's judgement is computed by a hand-written decision tree that is
+re-evaluated for every domain. A :class:`JudgementTable` enumerates every
+combination of answers to the questions the judgement depends on once, so the
+judgement of any domain becomes a single table lookup, and the judgements of
+many assessments can be evaluated together with NumPy.
+"""
+
+import itertools
+import threading
+from types import SimpleNamespace
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+from risk_of_bias.types._domain_types import Domain
+from risk_of_bias.types._response_types import ReasonedResponseWithEvidenceAndRawData
+
+# Code used for questions without a response
+UNANSWERED = 0
+
+_tables: dict[Any, "JudgementTable"] = {}
+_tables_lock = threading.Lock()
+
+
+class JudgementTable:
+    """
+    A domain's judgement algorithm evaluated for every combination of answers.
+
+    Each answer is encoded as an integer: ``0`` for an unanswered question,
+    otherwise one plus the position of the answer in the question's
+    ``allowed_answers``. An assessment is then a row of codes, one per
+    question, and its judgement is found by indexing the table with that row.
+
+    Tables are usually created with :func:`compile_judgement_table`.
+
+    Parameters
+    ----------
+    questions : list[float]
+        Indices of the questions the judgement depends on, in the order of the
+        code columns.
+    answers : list[list[str]]
+        The allowed answers of each question in ``questions``.
+    labels : list[str | None]
+        The distinct judgements returned by the algorithm.
+    table : numpy.ndarray
+        Positions in ``labels`` of the judgement for every combination of
+        answer codes, with one axis per question.
+    """
+
+    def __init__(
+        self,
+        questions: list[float],
+        answers: list[list[str]],
+        labels: list[Optional[str]],
+        table: np.ndarray,
+    ) -> None:
+        self.questions = questions
+        self.answers = answers
+        self.labels = labels
+        self.table = table
+        self._codes = [
+            {answer: code for code, answer in enumerate(allowed, start=1)}
+            for allowed in answers
+        ]
+        self._label_array = np.array(labels, dtype=object)
+
+    @classmethod
+    def compile(
+        cls, domain: Domain, questions: Optional[Sequence[float]] = None
+    ) -> "JudgementTable":
+        """
+        Enumerate the judgement of ``domain`` for every combination of answers.
+
+        Parameters
+        ----------
+        domain : Domain
+            A domain with a ``judgement_function``. Its current responses are
+            not used or modified.
+        questions : Sequence[float], optional
+            Indices of the questions the judgement depends on. Defaults to the
+            required questions of the domain. Other questions are left
+            unanswered while compiling, so the judgement must not depend on
+            them.
+
+        Returns
+        -------
+        JudgementTable
+            The compiled table.
+
+        Raises
+        ------
+        ValueError
+            If the domain has no judgement function, or a question in
+            ``questions`` accepts free-form answers.
+        """
+
+        judgement_function = domain.judgement_function
+        if judgement_function is None:
+            raise ValueError(f"Domain {domain.index} has no judgement function")
+
+        if questions is None:
+            questions = [q.index for q in domain.questions if q.is_required]
+        positions = _question_positions(domain, questions)
+        answers = []
+        for position in positions:
+            allowed = domain.questions[position].allowed_answers
+            if allowed is None:
+                raise ValueError(
+                    f"Question {domain.questions[position].index} accepts "
+                    "free-form answers and cannot be compiled"
+                )
+            answers.append(list(allowed))
+
+        # Evaluate the judgement on a lightweight stand-in for the domain, so
+        # each combination only swaps the responses that changed.
+        view = SimpleNamespace(
+            questions=[SimpleNamespace(response=None) for _ in domain.questions]
+        )
+        states = [
+            [None] + [SimpleNamespace(response=answer) for answer in allowed]
+            for allowed in answers
+        ]
+        shape = tuple(len(state) for state in states)
+
+        labels: list[Optional[str]] = []
+        label_codes: dict[Optional[str], int] = {}
+        flat = np.empty(int(np.prod(shape)), dtype=np.uint8)
+        previous: tuple[int, ...] = ()
+        for i, combination in enumerate(itertools.product(*map(range, shape))):
+            for column, code in enumerate(combination):
+                if previous and previous[column] == code:
+                    continue
+                view.questions[positions[column]].response = states[column][code]
+            previous = combination
+
+            label = judgement_function(view)  # type: ignore[arg-type]
+            if label not in label_codes:
+                label_codes[label] = len(labels)
+                labels.append(label)
+            flat[i] = label_codes[label]
+
+        return cls(list(questions), answers, labels, flat.reshape(shape))
+
+    def encode(self, domains: Iterable[Domain]) -> np.ndarray:
+        """
+        Encode the answers of each domain as a row of answer codes.
+
+        Parameters
+        ----------
+        domains : Iterable[Domain]
+            Answered copies of the domain the table was compiled from.
+
+        Returns
+        -------
+        numpy.ndarray
+            An integer array with one row per domain and one column per
+            question in :attr:`questions`.
+
+        Raises
+        ------
+        ValueError
+            If an answer is not one of the question's allowed answers.
+        """
+
+        rows = [self._encode_domain(domain) for domain in domains]
+        if not rows:
+            return np.empty((0, len(self.questions)), dtype=np.uint8)
+        return np.array(rows, dtype=np.uint8)
+
+    def evaluate(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Look up the judgements of many encoded assessments at once.
+
+        Parameters
+        ----------
+        codes : numpy.ndarray
+            Answer codes with one row per assessment, as returned by
+            :meth:`encode`.
+
+        Returns
+        -------
+        numpy.ndarray
+            An object array holding the judgement of each row, ``None`` where
+            the algorithm returns no judgement.
+        """
+
+        return self._label_array[self.evaluate_codes(codes)]
+
+    def evaluate_codes(self, codes: np.ndarray) -> np.ndarray:
+        """Return the position in :attr:`labels` of each row's judgement."""
+
+        codes = np.asarray(codes)
+        if codes.ndim != 2 or codes.shape[1] != len(self.questions):
+            raise ValueError(
+                f"Expected an array of shape (n, {len(self.questions)}), "
+                f"got {codes.shape}"
+            )
+        flat = np.ravel_multi_index(tuple(codes.T), self.table.shape)
+        return self.table.reshape(-1)[flat]
+
+    def judgement(self, domain: Domain) -> Optional[str]:
+        """Return the judgement of one domain by table lookup."""
+
+        return self.labels[self.table[tuple(self._encode_domain(domain))]]
+
+    def verify(self, domain: Domain) -> None:
+        """
+        Check the table agrees with the domain's judgement function.
+
+        Every combination of answers is stored as responses on a copy of
+        ``domain``, exactly as an assessment stores them, and the judgement
+        function's result compared with the table entry for the combination.
+        As the check is exhaustive, passing proves the table equivalent to the
+        function for all answers to :attr:`questions`.
+
+        Raises
+        ------
+        ValueError
+            Describing the first combination of answers where they differ.
+        """
+
+        judgement_function = domain.judgement_function
+        if judgement_function is None:
+            raise ValueError(f"Domain {domain.index} has no judgement function")
+
+        copy = domain.model_copy(deep=True)
+        for question in copy.questions:
+            question.response = None
+        positions = _question_positions(copy, self.questions)
+        states = [
+            [None] + [_response(answer) for answer in allowed]
+            for allowed in self.answers
+        ]
+
+        previous: tuple[int, ...] = ()
+        for combination in itertools.product(*map(range, self.table.shape)):
+            for column, code in enumerate(combination):
+                if previous and previous[column] == code:
+                    continue
+                copy.questions[positions[column]].response = states[column][code]
+            previous = combination
+
+            expected = judgement_function(copy)
+            actual = self.labels[self.table[combination]]
+            if actual != expected:
+                answers = {
+                    index: self.answers[column][code - 1] if code else None
+                    for column, (index, code) in enumerate(
+                        zip(self.questions, combination)
+                    )
+                }
+                raise ValueError(
+                    f"Domain {domain.index} judgement differs for {answers}: "
+                    f"function returned {expected!r}, table returned {actual!r}"
+                )
+
+    def _encode_domain(self, domain: Domain) -> list[int]:
+        responses = {question.index: question.response for question in domain.questions}
+        row = []
+        for index, codes in zip(self.questions, self._codes):
+            response = responses.get(index)
+            if response is None:
+                row.append(UNANSWERED)
+                continue
+            try:
+                row.append(codes[response.response])
+            except KeyError:
+                raise ValueError(
+                    f"Answer {response.response!r} to question {index} is not "
+                    "one of its allowed answers"
+                ) from None
+        return row
+
+
+def compile_judgement_table(domain: Domain) -> JudgementTable:
+    """
+    Return the lookup table for a domain's judgement algorithm.
+
+    Tables are compiled once per judgement function and set of questions and
+    answers, then reused for every domain sharing them, such as the same
+    domain of many RoB2 assessments.
+
+    Parameters
+    ----------
+    domain : Domain
+        A domain with a ``judgement_function``.
+
+    Returns
+    -------
+    JudgementTable
+        The compiled table for the domain's required questions.
+
+    Examples
+    --------
+    >>> frameworks = load_frameworks_from_directory("./completed_assessments/")
+    >>> domains = [framework.domains[0] for framework in frameworks]
+    >>> table = compile_judgement_table(domains[0])
+    >>> judgements = table.evaluate(table.encode(domains))
+    """
+
+    if domain.judgement_function is None:
+        raise ValueError(f"Domain {domain.index} has no judgement function")
+
+    key = (
+        domain.judgement_function,
+        tuple(
+            (question.index, tuple(question.allowed_answers or ()))
+            for question in domain.questions
+            if question.is_required
+        ),
+    )
+    with _tables_lock:
+        table = _tables.get(key)
+        if table is None:
+            table = _tables[key] = JudgementTable.compile(domain)
+    return table
+
+
+def _question_positions(domain: Domain, questions: Sequence[float]) -> list[int]:
+    """Return the position in ``domain.questions`` of each question index."""
+
+    positions = {question.index: i for i, question in enumerate(domain.questions)}
+    try:
+        return [positions[index] for index in questions]
+    except KeyError as e:
+        raise ValueError(f"Domain {domain.index} has no question {e.args[0]}") from None
+
+
+def _response(answer: str) -> ReasonedResponseWithEvidenceAndRawData:
+    return ReasonedResponseWithEvidenceAndRawData(
+        response=answer, reasoning="", evidence=[]
+    )
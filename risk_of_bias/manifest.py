@@ -0,0 +1,226 @@
+"""Content-addressed manifest of the assessments completed in a corpus."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from risk_of_bias.cache import make_cache_key, sha256_file
+from risk_of_bias.prompts import SYSTEM_MESSAGE
+from risk_of_bias.types._framework_types import Framework
+
+
+def framework_version(framework: Framework) -> str:
+    """Return a digest identifying the questions a framework asks.
+
+    Assessments made with a different system prompt, question wording or set
+    of allowed answers have a different version, so changing the framework
+    invalidates previously recorded results.
+    """
+    return make_cache_key(
+        name=framework.name,
+        prompt=SYSTEM_MESSAGE,
+        questions=[
+            [
+                [question.question, question.allowed_answers]
+                for question in domain.questions
+            ]
+            for domain in framework.domains
+        ],
+    )
+
+
+def assessment_key(
+    manuscript: Path,
+    framework: Framework,
+    model: str,
+    temperature: float,
+    guidance_document: Optional[Path] = None,
+    skip_logic: bool = False,
+) -> str:
+    """Build the manifest key of an assessment from everything that determines it.
+
+    Parameters
+    ----------
+    manuscript : Path
+        The manuscript PDF. Only the SHA-256 of its bytes is used, so copies
+        and renamed files share a key.
+    framework : Framework
+        The framework used for the assessment, identified by
+        :func:`framework_version`.
+    model : str
+        The model name.
+    temperature : float
+        The sampling temperature.
+    guidance_document : Path, optional
+        The guidance document PDF, identified by the SHA-256 of its bytes.
+    skip_logic : bool, default=False
+        Whether conditional questions were only asked once the answers they
+        depend on were known.
+
+    Returns
+    -------
+    str
+        A hex encoded key that changes whenever any of the inputs changes.
+    """
+    return digest_assessment_key(
+        sha256_file(manuscript),
+        framework,
+        model,
+        temperature,
+        sha256_file(guidance_document) if guidance_document is not None else None,
+        skip_logic,
+    )
+
+
+def digest_assessment_key(
+    manuscript_sha256: str,
+    framework: Framework,
+    model: str,
+    temperature: float,
+    guidance_document_sha256: Optional[str] = None,
+    skip_logic: bool = False,
+) -> str:
+    """Build the key of :func:`assessment_key` from already computed digests.
+
+    Useful when the manuscript was hashed as it was received, such as an
+    upload to the web service.
+    """
+    return make_cache_key(
+        manuscript=manuscript_sha256,
+        guidance_document=guidance_document_sha256,
+        model=model,
+        temperature=temperature,
+        framework=framework_version(framework),
+        skip_logic=skip_logic,
+    )
+
+
+class AssessmentManifest:
+    """
+    Record which saved assessment answers each set of assessment inputs.
+
+    Saved assessments are found next to their manuscript, so the same trial
+    reached through a different path, file name or copy was previously
+    assessed again at full cost, and a saved assessment was reused even after
+    the model or guidance document changed. The manifest maps the
+    :func:`assessment_key` of each completed assessment to the JSON file
+    holding it. Results are therefore reused across paths and directories
+    sharing a manifest, and are not reused when any parameter changes.
+
+    The manifest is a JSON Lines file to which one line is appended per
+    recorded assessment, so recording stays cheap in very large corpora. When
+    a key or result file is recorded more than once the last line wins.
+
+    Parameters
+    ----------
+    path : Path | str
+        Location of the manifest, usually in the corpus root. Result paths
+        inside its directory are stored relative to it, so the corpus can be
+        moved as a whole.
+
+    Examples
+    --------
+    >>> manifest = AssessmentManifest("corpus/risk_of_bias_manifest.jsonl")
+    >>> key = assessment_key(Path("corpus/trial.pdf"), framework, model, 0.2)
+    >>> manifest.get(key)
+    PosixPath('corpus/old_name.pdf.json')
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._results: dict[str, str] = {}
+        self._keys: dict[str, str] = {}
+
+        if self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                    self._add(entry["key"], entry["result"])
+                except (ValueError, KeyError, TypeError):
+                    # Skip lines left incomplete by an interrupted write
+                    continue
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the saved assessment recorded for ``key``, if it still exists."""
+        with self._lock:
+            result = self._results.get(key)
+        if result is None:
+            return None
+        path = self._resolve(result)
+        return path if path.exists() else None
+
+    def key_for(self, result: Path) -> Optional[str]:
+        """Return the key the saved assessment at ``result`` was recorded with."""
+        with self._lock:
+            return self._keys.get(self._relative(result))
+
+    def record(self, key: str, result: Path, **details: Any) -> None:
+        """Record that the assessment saved at ``result`` answers ``key``.
+
+        ``details`` are written alongside the entry for reference, for example
+        the model name, and are not used for lookups.
+        """
+        relative = self._relative(result)
+        with self._lock:
+            # Identical manuscripts share a key, so the key may currently
+            # resolve to another result file recorded with it
+            if self._keys.get(relative) == key:
+                return
+            self._add(key, relative)
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a") as f:
+                f.write(json.dumps({"key": key, "result": relative, **details}) + "\n")
+
+    def remove(self, result: Path) -> None:
+        """Forget the saved assessment at ``result``, such as once it is deleted.
+
+        The manifest is rewritten without the lines recording it, so a key it
+        answered falls back to any other result recorded with that key.
+        """
+        relative = self._relative(result)
+        with self._lock:
+            if relative not in self._keys or not self.path.exists():
+                return
+            self._results.clear()
+            self._keys.clear()
+            kept = []
+            for line in self.path.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                    if entry["result"] == relative:
+                        continue
+                    self._add(entry["key"], entry["result"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+                kept.append(line + "\n")
+            # Replace the file at once so readers never see a partial manifest
+            temporary = self.path.with_name(f".{self.path.name}.tmp")
+            temporary.write_text("".join(kept))
+            os.replace(temporary, self.path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    def _add(self, key: str, result: str) -> None:
+        # A result file answers a single key, the one it was last saved with
+        stale = self._keys.get(result)
+        if stale is not None and self._results.get(stale) == result:
+            del self._results[stale]
+        self._results[key] = result
+        self._keys[result] = key
+
+    def _relative(self, result: Path) -> str:
+        result = Path(result).absolute()
+        try:
+            return result.relative_to(self.path.parent.absolute()).as_posix()
+        except ValueError:
+            return result.as_posix()
+
+    def _resolve(self, result: str) -> Path:
+        return self.path.parent / result
@@ -1,5 +1,5 @@
 # RoB 2: a revised tool for assessing risk of bias in randomised trials.
 
-from ._utils import pdf_to_base64
+from ._utils import aupload_pdf, pdf_to_base64, upload_pdf
 
-__all__ = ["pdf_to_base64"]
+__all__ = ["pdf_to_base64", "upload_pdf", "aupload_pdf"]
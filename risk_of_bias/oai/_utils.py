@@ -1,6 +1,6 @@
 import base64
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
 
 def pdf_to_base64(pdf_file_path: Path) -> str:
@@ -18,12 +18,46 @@ def pdf_to_base64(pdf_file_path: Path) -> str:
     return base64.b64encode(data).decode("utf-8")
 
 
+def upload_pdf(client: Any, pdf_file_path: Path) -> str:
+    """
+    Upload a PDF file using the OpenAI Files API.
+
+    Args:
+        client (OpenAI): The client used to upload the file.
+        pdf_file_path (Path): The path to the PDF file to be uploaded.
+
+    Returns:
+        str: The id of the uploaded file, for use with ``create_openai_message``.
+    """
+    with open(pdf_file_path, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="user_data")
+    return uploaded.id
+
+
+async def aupload_pdf(client: Any, pdf_file_path: Path) -> str:
+    """
+    Upload a PDF file using the asynchronous OpenAI Files API.
+
+    Args:
+        client (AsyncOpenAI): The client used to upload the file.
+        pdf_file_path (Path): The path to the PDF file to be uploaded.
+
+    Returns:
+        str: The id of the uploaded file, for use with ``create_openai_message``.
+    """
+    uploaded = await client.files.create(
+        file=(pdf_file_path.name, pdf_file_path.read_bytes()), purpose="user_data"
+    )
+    return uploaded.id
+
+
 def create_openai_message(
     role: str,
     text: Optional[str] = None,
     file_data: Optional[str] = None,
     filename: Optional[str] = None,
     content_type: str = "input",
+    file_id: Optional[str] = None,
 ) -> Dict[str, Union[str, List[Dict[str, str]]]]:
     """
     Create a message dictionary for chat input with proper type handling.
@@ -35,6 +69,8 @@ def create_openai_message(
         filename: Name of the file being attached
         content_type: Type of content ('input' for user messages,
                      'output' for assistant)
+        file_id: Id of a file previously uploaded with ``upload_pdf``. Takes
+                 precedence over ``file_data``.
 
     Returns:
         Dictionary formatted for chat input
@@ -46,8 +82,10 @@ def create_openai_message(
 
     content_list = []
 
-    # Add file data if provided
-    if file_data and filename:
+    # Reference an uploaded file, or add file data if provided
+    if file_id:
+        content_list.append({"type": f"{content_type}_file", "file_id": file_id})
+    elif file_data and filename:
         content_list.append(
             {
                 "type": f"{content_type}_file",
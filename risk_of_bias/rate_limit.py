@@ -0,0 +1,210 @@
+"""Client-side rate limiting of OpenAI requests."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from risk_of_bias.config import settings
+
+
+class TokenBucket:
+    """
+    A token bucket that refills continuously up to ``capacity``.
+
+    Amounts are reserved rather than waited for: :meth:`reserve` immediately
+    deducts the amount, letting the level go negative, and returns how long the
+    caller must wait before the reservation is covered. Later callers therefore
+    queue behind earlier ones in the order they reserved.
+
+    Parameters
+    ----------
+    capacity : float
+        Maximum number of tokens the bucket can hold, i.e. the largest burst.
+    refill_per_second : float
+        Rate at which tokens are added back to the bucket.
+    clock : Callable[[], float], default=time.monotonic
+        Source of the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._clock = clock
+        self._level = capacity
+        self._updated = clock()
+
+    @property
+    def level(self) -> float:
+        """The number of tokens currently available, negative when overdrawn."""
+        self._refill()
+        return self._level
+
+    def reserve(self, amount: float) -> float:
+        """Deduct ``amount`` and return the seconds to wait until it is covered.
+
+        Amounts larger than the capacity are clamped to the capacity, so an
+        oversized request waits for a full bucket rather than forever.
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        self._level -= amount
+        if self._level >= 0:
+            return 0.0
+        return -self._level / self.refill_per_second
+
+    def refund(self, amount: float) -> None:
+        """Return ``amount`` to the bucket, or deduct it when negative."""
+        self._refill()
+        self._level = min(self.capacity, self._level + amount)
+
+    def settle(self, reserved: float, actual: float) -> None:
+        """Replace an earlier reservation of ``reserved`` by the ``actual`` amount.
+
+        The difference is taken relative to the amount :meth:`reserve` deducted,
+        which was clamped to the capacity, so the bucket is never over-credited.
+        """
+        self.refund(min(reserved, self.capacity) - actual)
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        self._level = min(self.capacity, self._level + elapsed * self.refill_per_second)
+
+
+class RateLimiter:
+    """
+    Delay OpenAI requests so they stay within per-minute request and token limits.
+
+    OpenAI enforces both a requests-per-minute (RPM) and a tokens-per-minute
+    (TPM) limit on each account and model. When many manuscripts are assessed
+    concurrently these limits are reached quickly, and requests beyond them are
+    rejected with HTTP 429 errors. A single ``RateLimiter`` shared by every
+    concurrent assessment tracks both budgets with token buckets and delays
+    each request until it fits, so the quota can be used fully without
+    triggering rejections and retries.
+
+    Token usage is not known until a response arrives, so each request reserves
+    an estimate from :func:`estimate_request_tokens`. Once the response reports
+    its actual usage the difference is settled with :meth:`settle`.
+
+    The limiter is safe to share between threads and between asyncio tasks.
+
+    Parameters
+    ----------
+    requests_per_minute : int, optional
+        Maximum number of requests per minute. ``None`` disables the limit.
+    tokens_per_minute : int, optional
+        Maximum number of input and output tokens per minute. ``None``
+        disables the limit.
+    clock : Callable[[], float], default=time.monotonic
+        Source of the current time in seconds.
+
+    Examples
+    --------
+    >>> limiter = RateLimiter(requests_per_minute=500, tokens_per_minute=200_000)
+    >>> frameworks = asyncio.run(arun_frameworks(manuscripts, rate_limiter=limiter))
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = settings.requests_per_minute,
+        tokens_per_minute: Optional[int] = settings.tokens_per_minute,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._lock = threading.Lock()
+        self._requests = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60, clock)
+            if requests_per_minute
+            else None
+        )
+        self._tokens = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60, clock)
+            if tokens_per_minute
+            else None
+        )
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request using ``tokens`` and return the seconds to wait."""
+        with self._lock:
+            delays = [0.0]
+            if self._requests is not None:
+                delays.append(self._requests.reserve(1))
+            if self._tokens is not None:
+                delays.append(self._tokens.reserve(tokens))
+            return max(delays)
+
+    def acquire(self, tokens: int) -> None:
+        """Block until a request using ``tokens`` fits within the limits."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int) -> None:
+        """Wait, without blocking the event loop, until the request fits."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def settle(self, estimated_tokens: int, raw_response: Any) -> None:
+        """Correct a reservation using the usage reported by ``raw_response``.
+
+        Responses without usage information leave the reservation unchanged.
+        """
+        usage = getattr(raw_response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if self._tokens is None or not isinstance(total_tokens, int):
+            return
+        with self._lock:
+            self._tokens.settle(estimated_tokens, total_tokens)
+
+
+def estimate_pdf_tokens(size_bytes: int) -> int:
+    """Estimate the input tokens used by a PDF of ``size_bytes`` bytes."""
+    return size_bytes // settings.rate_limit_pdf_bytes_per_token
+
+
+def estimate_request_tokens(
+    chat_input: list[Any],
+    pdf_bytes: int,
+    questions: int,
+) -> int:
+    """
+    Estimate the tokens a domain request will use before it is sent.
+
+    Parameters
+    ----------
+    chat_input : list
+        The conversation sent with the request. Text is counted at roughly
+        four characters per token. Attached PDFs are not counted here.
+    pdf_bytes : int
+        Total size of the PDFs attached to the conversation, counted with
+        :func:`estimate_pdf_tokens`.
+    questions : int
+        Number of questions asked, used to allow for the output tokens.
+
+    Returns
+    -------
+    int
+        Estimated input plus output tokens.
+    """
+    characters = 0
+    for message in chat_input:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            characters += len(content)
+        elif isinstance(content, list):
+            characters += sum(len(part.get("text", "")) for part in content)
+
+    output_tokens = questions * settings.rate_limit_output_tokens_per_question
+    return characters // 4 + estimate_pdf_tokens(pdf_bytes) + output_tokens
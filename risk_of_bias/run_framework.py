@@ -1,17 +1,45 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional, Sequence
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+from pydantic import ValidationError
 
+from risk_of_bias.backends import LLMBackend, OpenAIBackend
+from risk_of_bias.cache import ResponseCache, make_cache_key, sha256_file
+from risk_of_bias.checkpoint import DomainCheckpoint
 from risk_of_bias.config import settings
+from risk_of_bias.conversation import (
+    QuestionCallback,
+    assessment_documents,
+    document_digests,
+    domain_cache_key,
+    domain_parse_kwargs,
+    prepare_chat_input,
+    replay_domain_response,
+    response_field_name,
+    set_question_response,
+    store_cached_response,
+    store_domain_response,
+)
 from risk_of_bias.frameworks import get_rob2_framework
-from risk_of_bias.oai._utils import create_openai_message, pdf_to_base64
-from risk_of_bias.prompts import SYSTEM_MESSAGE
+from risk_of_bias.rate_limit import RateLimiter, estimate_request_tokens
+from risk_of_bias.streaming import StreamingObjectParser
+from risk_of_bias.types._domain_types import Domain
 from risk_of_bias.types._framework_types import Framework
+from risk_of_bias.types._question_types import NOT_APPLICABLE, Question
 from risk_of_bias.types._response_types import (
     ReasonedResponseWithEvidenceAndRawData,
     create_domain_response_class,
 )
+from risk_of_bias.types._usage_types import Usage
+from risk_of_bias.usage import usage_from_response
+
+DomainCallback = Callable[[Domain], None]
 
 
 def run_framework(
@@ -22,6 +50,16 @@ def run_framework(
     verbose: bool = False,
     temperature: float = settings.temperature,
     api_key: Optional[str] = None,
+    upload_files: bool = False,
+    cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    checkpoint: Optional[Path] = None,
+    stream: bool = False,
+    on_question: Optional[QuestionCallback] = None,
+    backend: Optional[LLMBackend] = None,
+    skip_logic: bool = False,
+    on_domain_start: Optional[DomainCallback] = None,
+    on_domain_complete: Optional[DomainCallback] = None,
 ) -> Framework:
     """
     Perform systematic risk-of-bias assessment on a research manuscript using AI.
@@ -98,6 +136,63 @@ def run_framework(
     api_key : Optional[str], default=None
         API key to use for OpenAI calls. If ``None``, ``OPENAI_API_KEY`` from the
         environment will be used.
+    upload_files : bool, default=False
+        Whether to upload the manuscript and guidance document once using the
+        OpenAI Files API and reference them by file id. By default the PDFs are
+        embedded as base64 in the conversation, which is re-sent with every
+        domain request. Uploading avoids sending the same multi-megabyte payload
+        once per domain. Uploaded files are deleted when the assessment ends.
+    cache : Optional[ResponseCache], default=None
+        Optional cache of model responses consulted before each domain request.
+        Entries are keyed by the contents of the manuscript and guidance
+        document, the domain's response schema and questions, the model and the
+        temperature, so only domains whose inputs changed since a previous run
+        are sent to the model. Cached responses are stored without
+        ``raw_data``.
+    rate_limiter : Optional[RateLimiter], default=None
+        Optional limiter that delays each domain request until it fits within
+        the account's requests-per-minute and tokens-per-minute limits. Share
+        one limiter between concurrent assessments to avoid 429 errors.
+    checkpoint : Optional[Path], default=None
+        Optional path of a JSON checkpoint file. The model output for each
+        domain is written to it as soon as the domain completes. If the
+        assessment is interrupted, running it again with the same checkpoint
+        replays the completed domains without any requests and continues from
+        the first incomplete domain. A checkpoint left by a different
+        manuscript, guidance document, model, temperature or framework is
+        ignored. The file is not removed, delete it once the results are saved.
+    stream : bool, default=False
+        Whether to stream each domain response instead of waiting for it to
+        finish. While a response streams, each question's answer is stored on
+        ``Question.response`` as soon as its part of the JSON is complete, so
+        the first answers are available long before the whole domain is done.
+        Once the response finishes every answer is replaced by the final
+        parsed version, including ``raw_data``.
+    on_question : Optional[Callable[[Domain, Question], None]], default=None
+        Optional callback called once for each question as soon as its answer
+        is stored, whether it came from the model, the cache or a checkpoint.
+        Combined with ``stream=True`` this reports progress during long runs.
+    backend : Optional[LLMBackend], default=None
+        The backend that answers each domain request and stores uploaded
+        files. Defaults to an :class:`~risk_of_bias.backends.OpenAIBackend`
+        using ``api_key``. Pass a :class:`~risk_of_bias.backends.FakeBackend`
+        to run the pipeline offline, for example when benchmarking.
+    skip_logic : bool, default=False
+        Whether to skip conditional questions that do not apply. Domains with
+        questions that have a ``precondition`` are asked in phases: the
+        questions without preconditions first, then the questions whose
+        preconditions hold given those answers, and so on. Questions whose
+        preconditions fail are answered "Not Applicable" without reasoning or
+        evidence being generated, reducing output tokens at the cost of extra
+        requests for domains that need more than one phase.
+    on_domain_start : Optional[Callable[[Domain], None]], default=None
+        Optional callback called when work on each domain begins, before any
+        request is sent for it.
+    on_domain_complete : Optional[Callable[[Domain], None]], default=None
+        Optional callback called once each domain has been answered. The
+        domain's ``usage`` then records the tokens, latency and cost of its
+        requests. Domains that do not depend on each other are answered
+        concurrently, so the callbacks may be called from several threads.
 
     Returns
     -------
@@ -117,108 +212,927 @@ def run_framework(
         to JSON format for persistence, caching, and data sharing workflows.
     """
 
-    client = OpenAI(api_key=api_key)
+    if backend is None:
+        backend = OpenAIBackend(client=OpenAI(api_key=api_key))
+
+    file_ids: dict[Path, str] = {}
+    try:
+        if upload_files:
+            for document in assessment_documents(manuscript, guidance_document):
+                file_ids[document] = backend.upload(document)
+
+        runner = _DomainRunner(
+            framework=framework,
+            chat_input=prepare_chat_input(
+                framework, manuscript, model, guidance_document, file_ids
+            ),
+            model=model,
+            temperature=temperature,
+            verbose=verbose,
+            cache=cache,
+            digests=document_digests(cache, manuscript, guidance_document),
+            pdf_bytes=_pdf_bytes(manuscript, guidance_document),
+            rate_limiter=rate_limiter,
+            checkpoint=_open_checkpoint(
+                checkpoint, framework, manuscript, guidance_document, model, temperature
+            ),
+            stream=stream,
+            on_question=on_question,
+            skip_logic=skip_logic,
+            on_domain_start=on_domain_start,
+            on_domain_complete=on_domain_complete,
+        )
+
+        # Ask the AI model each domain's questions in a single request. Domains
+        # in the same wave do not depend on each other and are asked concurrently.
+        for wave in _domain_waves(framework):
+            if len(wave) == 1:
+                runner.answer(backend, wave[0])
+                continue
+            with ThreadPoolExecutor(max_workers=len(wave)) as executor:
+                list(executor.map(partial(runner.answer, backend), wave))
+    finally:
+        for file_id in file_ids.values():
+            backend.delete(file_id)
+
+    return framework
+
+
+async def arun_framework(
+    manuscript: Path,
+    framework: Framework = get_rob2_framework(),
+    model: str = settings.fast_ai_model,
+    guidance_document: Optional[Path] = None,
+    verbose: bool = False,
+    temperature: float = settings.temperature,
+    api_key: Optional[str] = None,
+    client: Optional[AsyncOpenAI] = None,
+    upload_files: bool = False,
+    cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    checkpoint: Optional[Path] = None,
+    stream: bool = False,
+    on_question: Optional[QuestionCallback] = None,
+    backend: Optional[LLMBackend] = None,
+    skip_logic: bool = False,
+    on_domain_start: Optional[DomainCallback] = None,
+    on_domain_complete: Optional[DomainCallback] = None,
+) -> Framework:
+    """
+    Asynchronously perform a risk-of-bias assessment on a research manuscript.
+
+    This is the asyncio-native counterpart of :func:`run_framework`. It follows
+    exactly the same assessment process, builds the same conversation and uses
+    the same domain response classes, but awaits each model call using
+    ``AsyncOpenAI`` instead of blocking. Many manuscripts can therefore be kept
+    in flight concurrently from a single process, see :func:`arun_frameworks`.
+
+    Parameters
+    ----------
+    manuscript : Path
+        Path to the research manuscript PDF file to analyze.
+    framework : Framework, default=get_rob2_framework()
+        The assessment framework defining the structure of the bias evaluation.
+    model : str, default=settings.fast_ai_model
+        The OpenAI model identifier to use for assessment.
+    guidance_document : Optional[Path], default=None
+        Optional path to a PDF guidance document, see :func:`run_framework`.
+    verbose : bool, default=False
+        Whether to print detailed progress information during assessment.
+    temperature : float, default=settings.temperature
+        Sampling temperature passed to the OpenAI model. If a negative value is
+        provided, the temperature parameter is omitted.
+    api_key : Optional[str], default=None
+        API key to use for OpenAI calls. Ignored when ``client`` is provided.
+    client : Optional[AsyncOpenAI], default=None
+        An existing ``AsyncOpenAI`` client. Sharing one client between many
+        concurrent assessments reuses its connection pool. If ``None``, a new
+        client is created for this assessment.
+    upload_files : bool, default=False
+        Whether to upload the PDFs once using the Files API instead of embedding
+        them as base64 in every domain request, see :func:`run_framework`.
+    cache : Optional[ResponseCache], default=None
+        Optional cache of model responses, see :func:`run_framework`.
+    rate_limiter : Optional[RateLimiter], default=None
+        Optional request and token rate limiter, see :func:`run_framework`.
+    checkpoint : Optional[Path], default=None
+        Optional checkpoint file used to resume an interrupted assessment, see
+        :func:`run_framework`.
+    stream : bool, default=False
+        Whether to stream each domain response and store answers as they
+        complete, see :func:`run_framework`.
+    on_question : Optional[Callable[[Domain, Question], None]], default=None
+        Optional callback called as each question is answered, see
+        :func:`run_framework`.
+    backend : Optional[LLMBackend], default=None
+        The backend that answers each domain request, see
+        :func:`run_framework`. Takes precedence over ``client``.
+    skip_logic : bool, default=False
+        Whether to skip conditional questions that do not apply, see
+        :func:`run_framework`.
+    on_domain_start : Optional[Callable[[Domain], None]], default=None
+        Optional callback called when work on each domain begins, see
+        :func:`run_framework`.
+    on_domain_complete : Optional[Callable[[Domain], None]], default=None
+        Optional callback called once each domain has been answered, see
+        :func:`run_framework`.
+
+    Returns
+    -------
+    Framework
+        The original framework structure populated with AI-generated responses.
+    """
+
+    if backend is None:
+        backend = OpenAIBackend(
+            async_client=client if client is not None else AsyncOpenAI(api_key=api_key)
+        )
+
+    file_ids: dict[Path, str] = {}
+    try:
+        if upload_files:
+            for document in assessment_documents(manuscript, guidance_document):
+                file_ids[document] = await backend.aupload(document)
+
+        # Reading and encoding large PDFs would otherwise block the event loop.
+        chat_input = await asyncio.to_thread(
+            prepare_chat_input,
+            framework,
+            manuscript,
+            model,
+            guidance_document,
+            file_ids,
+        )
+        digests = await asyncio.to_thread(
+            document_digests, cache, manuscript, guidance_document
+        )
+        domain_checkpoint = await asyncio.to_thread(
+            _open_checkpoint,
+            checkpoint,
+            framework,
+            manuscript,
+            guidance_document,
+            model,
+            temperature,
+        )
+        runner = _DomainRunner(
+            framework=framework,
+            chat_input=chat_input,
+            model=model,
+            temperature=temperature,
+            verbose=verbose,
+            cache=cache,
+            digests=digests,
+            pdf_bytes=_pdf_bytes(manuscript, guidance_document),
+            rate_limiter=rate_limiter,
+            checkpoint=domain_checkpoint,
+            stream=stream,
+            on_question=on_question,
+            skip_logic=skip_logic,
+            on_domain_start=on_domain_start,
+            on_domain_complete=on_domain_complete,
+        )
+
+        for wave in _domain_waves(framework):
+            await asyncio.gather(*(runner.aanswer(backend, domain) for domain in wave))
+    finally:
+        for file_id in file_ids.values():
+            await backend.adelete(file_id)
+
+    return framework
+
+
+async def arun_frameworks(
+    manuscripts: Sequence[Path],
+    framework_factory: Callable[[], Framework] = get_rob2_framework,
+    model: str = settings.fast_ai_model,
+    guidance_document: Optional[Path] = None,
+    verbose: bool = False,
+    temperature: float = settings.temperature,
+    api_key: Optional[str] = None,
+    max_concurrency: int = settings.max_concurrent_assessments,
+    upload_files: bool = False,
+    cache: Optional[ResponseCache] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    backend: Optional[LLMBackend] = None,
+    skip_logic: bool = False,
+) -> list[Framework]:
+    """
+    Assess many manuscripts concurrently using a single ``AsyncOpenAI`` client.
+
+    Each manuscript is assessed with :func:`arun_framework` against a fresh
+    framework obtained from ``framework_factory``. At most ``max_concurrency``
+    assessments are in flight at any time.
+
+    Parameters
+    ----------
+    manuscripts : Sequence[Path]
+        Paths to the manuscript PDF files to analyze.
+    framework_factory : Callable[[], Framework], default=get_rob2_framework
+        Called once per manuscript to create the framework to populate. A
+        factory is required because each assessment mutates its framework.
+    model : str, default=settings.fast_ai_model
+        The OpenAI model identifier to use for assessment.
+    guidance_document : Optional[Path], default=None
+        Optional guidance document applied to every manuscript.
+    verbose : bool, default=False
+        Whether to print detailed progress information during assessment.
+    temperature : float, default=settings.temperature
+        Sampling temperature passed to the OpenAI model.
+    api_key : Optional[str], default=None
+        API key to use for OpenAI calls.
+    max_concurrency : int, default=settings.max_concurrent_assessments
+        Maximum number of manuscripts assessed at the same time.
+    upload_files : bool, default=False
+        Whether to upload the PDFs once using the Files API, see
+        :func:`run_framework`.
+    cache : Optional[ResponseCache], default=None
+        Optional cache of model responses shared by all assessments, see
+        :func:`run_framework`.
+    rate_limiter : Optional[RateLimiter], default=None
+        Optional request and token rate limiter shared by all assessments, see
+        :func:`run_framework`.
+    backend : Optional[LLMBackend], default=None
+        The backend shared by all assessments, see :func:`run_framework`.
+        Defaults to an :class:`~risk_of_bias.backends.OpenAIBackend` with a
+        single ``AsyncOpenAI`` client.
+    skip_logic : bool, default=False
+        Whether to skip conditional questions that do not apply, see
+        :func:`run_framework`.
+
+    Returns
+    -------
+    list[Framework]
+        The completed frameworks, in the same order as ``manuscripts``.
+    """
 
-    # Send system message to set context for the AI model
-    chat_input: list[Any] = [create_openai_message("system", text=SYSTEM_MESSAGE)]
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
 
-    # Set the manuscript filename and model name on the framework
-    framework.manuscript = manuscript.name
-    framework.assessor = model
+    if backend is None:
+        backend = OpenAIBackend(async_client=AsyncOpenAI(api_key=api_key))
+    semaphore = asyncio.Semaphore(max_concurrency)
 
-    # Send the framework guidance to the AI model
-    if guidance_document is not None:
-        if not guidance_document.exists() or not guidance_document.is_file():
-            raise ValueError(
-                f"Guidance document {guidance_document} must exist and be a file."
+    async def assess(manuscript: Path) -> Framework:
+        async with semaphore:
+            return await arun_framework(
+                manuscript=manuscript,
+                framework=framework_factory(),
+                model=model,
+                guidance_document=guidance_document,
+                verbose=verbose,
+                temperature=temperature,
+                upload_files=upload_files,
+                cache=cache,
+                rate_limiter=rate_limiter,
+                backend=backend,
+                skip_logic=skip_logic,
             )
-        guidance_document_as_base64_string = pdf_to_base64(guidance_document)
-
-        chat_input.append(
-            create_openai_message(
-                "user",
-                text="This document provides guidance on how to answer the "
-                "risk of bias questions.",
-                file_data=f"data:application/pdf;base64,"
-                f"{guidance_document_as_base64_string}",
-                filename="guidance_document.pdf",
+
+    return list(await asyncio.gather(*(assess(m) for m in manuscripts)))
+
+
+@dataclass
+class _DomainRunner:
+    """Answer the domains of one assessment.
+
+    Every domain request starts from the shared ``chat_input`` prefix of
+    instructions and documents, followed by the question and answer turns of
+    the domains it depends on. The turns of each answered domain are kept in
+    ``turns`` for the domains that depend on it.
+
+    With ``skip_logic``, a domain containing questions with preconditions is
+    asked in phases within one conversation: each phase asks the questions
+    that apply given the answers so far, and questions whose precondition
+    fails are answered "Not Applicable" without being asked.
+    """
+
+    framework: Framework
+    chat_input: list[Any]
+    model: str
+    temperature: float
+    verbose: bool
+    cache: Optional[ResponseCache]
+    digests: dict[str, Optional[str]]
+    pdf_bytes: int
+    rate_limiter: Optional[RateLimiter]
+    checkpoint: Optional[DomainCheckpoint]
+    stream: bool
+    on_question: Optional[QuestionCallback]
+    skip_logic: bool = False
+    on_domain_start: Optional[DomainCallback] = None
+    on_domain_complete: Optional[DomainCallback] = None
+    turns: dict[int, list[Any]] = field(default_factory=dict)
+
+    def answer(self, backend: LLMBackend, domain: Domain) -> None:
+        if self.on_domain_start is not None:
+            self.on_domain_start(domain)
+        conversation, start = self._conversation(domain)
+
+        if self._phased(domain):
+            on_question = _announce_for(domain, self.on_question)
+            usages = []
+            for phase in _phases(domain, self.verbose, on_question):
+                parse_kwargs = self._parse_kwargs(phase, conversation)
+                if not self._restore_cached(
+                    phase, conversation, parse_kwargs, on_question
+                ):
+                    self._ask(backend, phase, conversation, parse_kwargs, on_question)
+                usages.append(phase.usage)
+            self._finish_phases(domain, usages)
+        else:
+            parse_kwargs = self._parse_kwargs(domain, conversation)
+            if not self._restore(domain, conversation, parse_kwargs):
+                raw_response = self._ask(
+                    backend, domain, conversation, parse_kwargs, self.on_question
+                )
+                _checkpoint_response(self.checkpoint, domain, raw_response)
+
+        self.turns[domain.index] = conversation[start:]
+        if self.on_domain_complete is not None:
+            self.on_domain_complete(domain)
+
+    async def aanswer(self, backend: LLMBackend, domain: Domain) -> None:
+        if self.on_domain_start is not None:
+            self.on_domain_start(domain)
+        conversation, start = self._conversation(domain)
+
+        if self._phased(domain):
+            on_question = _announce_for(domain, self.on_question)
+            usages = []
+            for phase in _phases(domain, self.verbose, on_question):
+                parse_kwargs = self._parse_kwargs(phase, conversation)
+                if not self._restore_cached(
+                    phase, conversation, parse_kwargs, on_question
+                ):
+                    await self._aask(
+                        backend, phase, conversation, parse_kwargs, on_question
+                    )
+                usages.append(phase.usage)
+            self._finish_phases(domain, usages)
+        else:
+            parse_kwargs = self._parse_kwargs(domain, conversation)
+            if not self._restore(domain, conversation, parse_kwargs):
+                raw_response = await self._aask(
+                    backend, domain, conversation, parse_kwargs, self.on_question
+                )
+                _checkpoint_response(self.checkpoint, domain, raw_response)
+
+        self.turns[domain.index] = conversation[start:]
+        if self.on_domain_complete is not None:
+            self.on_domain_complete(domain)
+
+    def _ask(
+        self,
+        backend: LLMBackend,
+        domain: Domain,
+        conversation: list[Any],
+        parse_kwargs: dict[str, Any],
+        on_question: Optional[QuestionCallback],
+    ) -> Any:
+        """Send one request to the model and store its answers."""
+
+        tokens = _request_tokens(
+            self.rate_limiter, domain, parse_kwargs, self.pdf_bytes
+        )
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(tokens)
+
+        announced: set[float] = set()
+        started = time.perf_counter()
+        if self.stream:
+            raw_response = _stream_domain_response(
+                backend, domain, parse_kwargs, self.verbose, on_question, announced
             )
+        else:
+            raw_response = backend.parse(**parse_kwargs)
+        self._store(
+            domain,
+            conversation,
+            parse_kwargs,
+            raw_response,
+            tokens,
+            time.perf_counter() - started,
+            on_question,
+            announced,
         )
+        return raw_response
 
-        chat_input.append(
-            create_openai_message(
-                "assistant",
-                text="Thank you for sharing the guidance document, "
-                "please share the manuscript for me to review.",
-                content_type="output",
+    async def _aask(
+        self,
+        backend: LLMBackend,
+        domain: Domain,
+        conversation: list[Any],
+        parse_kwargs: dict[str, Any],
+        on_question: Optional[QuestionCallback],
+    ) -> Any:
+        """Asynchronously send one request to the model, see :meth:`_ask`."""
+
+        tokens = _request_tokens(
+            self.rate_limiter, domain, parse_kwargs, self.pdf_bytes
+        )
+        if self.rate_limiter is not None:
+            await self.rate_limiter.aacquire(tokens)
+
+        announced: set[float] = set()
+        started = time.perf_counter()
+        if self.stream:
+            raw_response = await _astream_domain_response(
+                backend, domain, parse_kwargs, self.verbose, on_question, announced
             )
+        else:
+            raw_response = await backend.aparse(**parse_kwargs)
+        self._store(
+            domain,
+            conversation,
+            parse_kwargs,
+            raw_response,
+            tokens,
+            time.perf_counter() - started,
+            on_question,
+            announced,
         )
+        return raw_response
+
+    def _conversation(self, domain: Domain) -> tuple[list[Any], int]:
+        """Build the conversation preceding ``domain``'s questions.
+
+        Also returns the position in the conversation where the domain's own
+        turns begin.
+        """
 
-    # Send the manuscript to the AI model
-    file_as_base64_string = pdf_to_base64(manuscript)
-    chat_input.append(
-        create_openai_message(
-            "user",
-            text="This is the paper we will be analyzing for risk of bias.",
-            file_data=f"data:application/pdf;base64,{file_as_base64_string}",
-            filename=manuscript.name.split("/")[-1],
+        if self.verbose:
+            print(f"\n\nDomain {domain.index}: {domain.name}")
+
+        dependencies = _domain_dependencies(self.framework, domain)
+        conversation = list(self.chat_input)
+        for other in self.framework.domains:
+            if other.index in dependencies:
+                conversation.extend(self.turns.get(other.index, []))
+
+        return conversation, len(conversation)
+
+    def _parse_kwargs(self, domain: Domain, conversation: list[Any]) -> dict[str, Any]:
+        return domain_parse_kwargs(domain, conversation, self.model, self.temperature)
+
+    def _phased(self, domain: Domain) -> bool:
+        """Whether ``domain`` should be asked in phases using skip logic.
+
+        Domains completed by an earlier run are restored from the checkpoint in
+        one piece instead.
+        """
+
+        return (
+            self.skip_logic
+            and any(question.precondition for question in domain.questions)
+            and (self.checkpoint is None or self.checkpoint.get(domain.index) is None)
         )
-    )
 
-    # Ask the AI model each domain's questions in a single request.
+    def _restore(
+        self,
+        domain: Domain,
+        conversation: list[Any],
+        parse_kwargs: dict[str, Any],
+    ) -> bool:
+        """Answer ``domain`` from the checkpoint or cache, if possible."""
+
+        return _store_checkpointed_response(
+            self.checkpoint,
+            domain,
+            conversation,
+            parse_kwargs,
+            self.verbose,
+            self.on_question,
+        ) or self._restore_cached(domain, conversation, parse_kwargs, self.on_question)
+
+    def _restore_cached(
+        self,
+        domain: Domain,
+        conversation: list[Any],
+        parse_kwargs: dict[str, Any],
+        on_question: Optional[QuestionCallback],
+    ) -> bool:
+        return store_cached_response(
+            self.cache,
+            self.digests,
+            domain,
+            conversation,
+            parse_kwargs,
+            self.verbose,
+            on_question,
+        )
+
+    def _store(
+        self,
+        domain: Domain,
+        conversation: list[Any],
+        parse_kwargs: dict[str, Any],
+        raw_response: Any,
+        tokens: int,
+        latency: float,
+        on_question: Optional[QuestionCallback],
+        announced: set[float],
+    ) -> None:
+        """Record a model response on the domain and in the cache."""
+
+        domain.usage = usage_from_response(raw_response, self.model, latency)
+        if self.rate_limiter is not None:
+            self.rate_limiter.settle(tokens, raw_response)
+        # Cache before the answer joins the conversation the key covers
+        _cache_response(self.cache, self.digests, domain, parse_kwargs, raw_response)
+        store_domain_response(
+            domain,
+            conversation,
+            raw_response,
+            self.verbose,
+            on_question=on_question,
+            announced=announced,
+        )
+
+    def _finish_phases(self, domain: Domain, usages: list[Optional[Usage]]) -> None:
+        """Total the usage of a phased domain and record it in the checkpoint."""
+
+        requested = [usage for usage in usages if usage is not None]
+        domain.usage = sum(requested, Usage()) if requested else None
+
+        if self.checkpoint is None:
+            return
+        if any(question.response is None for question in domain.questions):
+            return
+        usage = domain.usage.model_dump() if domain.usage is not None else None
+        self.checkpoint.record(domain.index, _domain_output_text(domain), usage)
+
+
+def _direct_dependencies(framework: Framework, domain: Domain) -> list[int]:
+    """Return the indices of the domains ``domain`` declares it depends on."""
+
+    if domain.depends_on is not None:
+        return list(domain.depends_on)
+
+    # By default each domain depends on every domain before it.
+    previous = []
+    for other in framework.domains:
+        if other is domain:
+            break
+        previous.append(other.index)
+    return previous
+
+
+def _domain_dependencies(framework: Framework, domain: Domain) -> set[int]:
+    """Return the indices of every domain ``domain`` depends on, transitively."""
+
+    domains = {other.index: other for other in framework.domains}
+    dependencies: set[int] = set()
+    pending = _direct_dependencies(framework, domain)
+    while pending:
+        index = pending.pop()
+        if index in dependencies:
+            continue
+        if index not in domains:
+            raise ValueError(f"Domain {domain.index} depends on unknown domain {index}")
+        dependencies.add(index)
+        pending.extend(_direct_dependencies(framework, domains[index]))
+    return dependencies
+
+
+def _domain_waves(framework: Framework) -> list[list[Domain]]:
+    """Group domains into waves that can be answered concurrently.
+
+    Each domain is placed in the wave after the last of its dependencies, so
+    every wave only depends on earlier waves. Domains keep their framework
+    order within a wave.
+    """
+
+    domains = {domain.index: domain for domain in framework.domains}
+    levels: dict[int, int] = {}
+    visiting: set[int] = set()
+
+    def level(domain: Domain) -> int:
+        if domain.index in levels:
+            return levels[domain.index]
+        if domain.index in visiting:
+            raise ValueError(f"Circular dependency involving domain {domain.index}")
+        visiting.add(domain.index)
+
+        dependency_levels = []
+        for index in _direct_dependencies(framework, domain):
+            if index not in domains:
+                raise ValueError(
+                    f"Domain {domain.index} depends on unknown domain {index}"
+                )
+            dependency_levels.append(level(domains[index]))
+
+        visiting.discard(domain.index)
+        levels[domain.index] = 1 + max(dependency_levels, default=-1)
+        return levels[domain.index]
+
+    waves: list[list[Domain]] = []
     for domain in framework.domains:
-        if verbose:
-            print(f"\n\nDomain {domain.index}: {domain.name}")
+        wave = level(domain)
+        while len(waves) <= wave:
+            waves.append([])
+        waves[wave].append(domain)
+    return waves
 
-        # Create a single response class for all questions in the domain
-        domain_response_class = create_domain_response_class(domain)
 
-        questions_text = "\n".join(q.question for q in domain.questions)
+def _phases(
+    domain: Domain,
+    verbose: bool,
+    on_question: Optional[QuestionCallback],
+) -> Iterator[Domain]:
+    """Yield the phases of a domain assessed with skip logic.
 
-        chat_input.append(create_openai_message("user", text=questions_text))
+    Each phase is a copy of ``domain`` holding only the unanswered questions
+    whose preconditions hold given the answers stored so far, so answers to a
+    phase must be stored before the next one is requested. Questions whose
+    preconditions fail are answered "Not Applicable" in between. Each question
+    is asked at most once, and questions whose preconditions can never be
+    decided, for example because they refer to unknown questions, are asked
+    once nothing else remains.
+    """
+
+    for question in domain.questions:
+        question.response = None
+
+    asked: set[float] = set()
+    while True:
+        pending = [
+            question
+            for question in domain.questions
+            if question.response is None and question.index not in asked
+        ]
+        responses = _domain_answers(domain)
+        skipped = [
+            question
+            for question in pending
+            if question.precondition is not None
+            and question.precondition.evaluate(responses) is False
+        ]
+        if skipped:
+            for question in skipped:
+                _set_not_applicable(domain, question, verbose, on_question)
+            continue
+        if not pending:
+            return
+
+        ready = [
+            question
+            for question in pending
+            if question.precondition is None
+            or question.precondition.evaluate(responses)
+        ]
+        phase = ready or pending
+        asked.update(question.index for question in phase)
+        yield domain.model_copy(update={"questions": phase, "usage": None})
+
+
+def _domain_answers(domain: Domain) -> dict[float, Optional[str]]:
+    """Return the answer to each question of ``domain`` by question index."""
+
+    return {
+        question.index: (
+            question.response.response if question.response is not None else None
+        )
+        for question in domain.questions
+    }
+
+
+def _set_not_applicable(
+    domain: Domain,
+    question: Question,
+    verbose: bool,
+    on_question: Optional[QuestionCallback],
+) -> None:
+    """Answer a question whose precondition failed without asking the model."""
+
+    assert question.precondition is not None
+    gates = ", ".join(str(index) for index in question.precondition.questions)
+    question.response = ReasonedResponseWithEvidenceAndRawData(
+        response=NOT_APPLICABLE,
+        reasoning=(
+            f"Not asked because the answers to question {gates} "
+            "did not meet its precondition."
+        ),
+        evidence=[],
+    )
 
-        parse_kwargs: dict[str, Any] = {
-            "model": model,
-            "input": chat_input,
-            "text_format": domain_response_class,
+    if verbose:
+        print(f"  Question {question.index}: {NOT_APPLICABLE} (precondition not met)")
+    if on_question is not None:
+        on_question(domain, question)
+
+
+def _announce_for(
+    domain: Domain, on_question: Optional[QuestionCallback]
+) -> Optional[QuestionCallback]:
+    """Report questions answered in a phase of ``domain`` as part of ``domain``."""
+
+    if on_question is None:
+        return None
+    return lambda _, question: on_question(domain, question)
+
+
+def _domain_output_text(domain: Domain) -> str:
+    """Serialise the answers of ``domain`` as one response of its response class."""
+
+    fields = {
+        response_field_name(question): {
+            "reasoning": question.response.reasoning,
+            "evidence": "\n".join(question.response.evidence),
+            "response": question.response.response,
         }
-        if temperature >= 0:
-            parse_kwargs["temperature"] = temperature
+        for question in domain.questions
+        if question.response is not None
+    }
+    response_class: Any = create_domain_response_class(domain)
+    return response_class.model_validate(fields).model_dump_json()
 
-        raw_response = client.responses.parse(**parse_kwargs)
-        parsed_response = raw_response.output_parsed
 
-        chat_input.append(
-            create_openai_message(
-                "assistant", text=raw_response.output_text, content_type="output"
-            )
+def _pdf_bytes(manuscript: Path, guidance_document: Optional[Path]) -> int:
+    """Return the total size of the PDFs attached to the conversation."""
+
+    return sum(
+        document.stat().st_size
+        for document in assessment_documents(manuscript, guidance_document)
+    )
+
+
+def _request_tokens(
+    rate_limiter: Optional[RateLimiter],
+    domain: Domain,
+    parse_kwargs: dict[str, Any],
+    pdf_bytes: int,
+) -> int:
+    """Estimate the tokens of a domain request, only when rate limiting."""
+
+    if rate_limiter is None:
+        return 0
+    return estimate_request_tokens(
+        parse_kwargs["input"], pdf_bytes, len(domain.questions)
+    )
+
+
+def _open_checkpoint(
+    checkpoint: Optional[Path],
+    framework: Framework,
+    manuscript: Path,
+    guidance_document: Optional[Path],
+    model: str,
+    temperature: float,
+) -> Optional[DomainCheckpoint]:
+    """Open the checkpoint for this assessment, or ``None`` when not requested."""
+
+    if checkpoint is None:
+        return None
+
+    fingerprint = make_cache_key(
+        manuscript=sha256_file(manuscript),
+        guidance_document=(
+            sha256_file(guidance_document) if guidance_document is not None else None
+        ),
+        model=model,
+        temperature=temperature,
+        framework=framework.name,
+        questions=[
+            [question.question for question in domain.questions]
+            for domain in framework.domains
+        ],
+    )
+    return DomainCheckpoint(checkpoint, fingerprint)
+
+
+def _store_checkpointed_response(
+    domain_checkpoint: Optional[DomainCheckpoint],
+    domain: Domain,
+    chat_input: list[Any],
+    parse_kwargs: dict[str, Any],
+    verbose: bool,
+    on_question: Optional[QuestionCallback] = None,
+) -> bool:
+    """Restore a domain completed by an earlier run, returning ``False`` if none."""
+
+    if domain_checkpoint is None:
+        return False
+
+    output_text = domain_checkpoint.get(domain.index)
+    if output_text is None:
+        return False
+
+    if verbose:
+        print("  Resuming from checkpoint")
+    replay_domain_response(
+        domain, chat_input, parse_kwargs, output_text, verbose, on_question
+    )
+    usage = domain_checkpoint.get_usage(domain.index)
+    domain.usage = Usage.model_validate(usage) if usage is not None else None
+    return True
+
+
+def _checkpoint_response(
+    domain_checkpoint: Optional[DomainCheckpoint],
+    domain: Domain,
+    raw_response: Any,
+) -> None:
+    """Record a completed domain in the checkpoint."""
+
+    if domain_checkpoint is None or raw_response.output_parsed is None:
+        return
+    usage = domain.usage.model_dump() if domain.usage is not None else None
+    domain_checkpoint.record(domain.index, raw_response.output_text, usage)
+
+
+def _cache_response(
+    cache: Optional[ResponseCache],
+    digests: dict[str, Optional[str]],
+    domain: Domain,
+    parse_kwargs: dict[str, Any],
+    raw_response: Any,
+) -> None:
+    """Store a successfully parsed domain answer in the response cache."""
+
+    if cache is None or raw_response.output_parsed is None:
+        return
+    cache.set(domain_cache_key(digests, domain, parse_kwargs), raw_response.output_text)
+
+
+def _stream_domain_response(
+    backend: LLMBackend,
+    domain: Domain,
+    parse_kwargs: dict[str, Any],
+    verbose: bool,
+    on_question: Optional[QuestionCallback],
+    announced: set[float],
+) -> Any:
+    """Stream a domain request, storing each answer as soon as it is complete."""
+
+    parser = StreamingObjectParser()
+
+    def on_text(fragment: str) -> None:
+        _store_streamed_answers(
+            domain,
+            parse_kwargs,
+            parser.feed(fragment),
+            verbose,
+            on_question,
+            announced,
         )
 
-        # Process each question response from the domain response
-        if parsed_response:
-            for question in domain.questions:
-                field_name = (
-                    f"question_{int(question.index * 10)}"  # 1.1 -> 11, 1.2 -> 12
-                )
+    return backend.stream(on_text, **parse_kwargs)
 
-                if hasattr(parsed_response, field_name):
-                    parsed = getattr(parsed_response, field_name)
-
-                    if verbose:
-                        print(
-                            f"  Question {question.index}: {question.question} "
-                            f"({question.allowed_answers})"
-                        )
-                        print(f"    Response: {parsed.response}")
-                        print(f"      Reasoning: {parsed.reasoning}")
-                        print(f"        Evidence: {parsed.evidence}")
-                        print("\n\n")
-
-                    question.response = ReasonedResponseWithEvidenceAndRawData(
-                        response=parsed.response,
-                        reasoning=parsed.reasoning,
-                        evidence=[parsed.evidence],  # Convert string to list
-                        raw_data=raw_response,
-                    )
 
-    return framework
+async def _astream_domain_response(
+    backend: LLMBackend,
+    domain: Domain,
+    parse_kwargs: dict[str, Any],
+    verbose: bool,
+    on_question: Optional[QuestionCallback],
+    announced: set[float],
+) -> Any:
+    """Asynchronously stream a domain request, see :func:`_stream_domain_response`."""
+
+    parser = StreamingObjectParser()
+
+    def on_text(fragment: str) -> None:
+        _store_streamed_answers(
+            domain,
+            parse_kwargs,
+            parser.feed(fragment),
+            verbose,
+            on_question,
+            announced,
+        )
+
+    return await backend.astream(on_text, **parse_kwargs)
+
+
+def _store_streamed_answers(
+    domain: Domain,
+    parse_kwargs: dict[str, Any],
+    members: list[tuple[str, Any]],
+    verbose: bool,
+    on_question: Optional[QuestionCallback],
+    announced: set[float],
+) -> None:
+    """Store the answers completed so far in a streamed domain response."""
+
+    fields = parse_kwargs["text_format"].model_fields
+    questions = {
+        response_field_name(question): question for question in domain.questions
+    }
+    for field_name, value in members:
+        if field_name not in fields or field_name not in questions:
+            continue
+        try:
+            parsed = fields[field_name].annotation.model_validate(value)
+        except ValidationError:
+            # Leave malformed partial answers to the final parsed response
+            continue
+        set_question_response(
+            domain,
+            questions[field_name],
+            parsed,
+            None,
+            verbose,
+            on_question,
+            announced,
+        )
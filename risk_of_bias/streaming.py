@@ -0,0 +1,96 @@
+"""Incremental parsing of JSON objects streamed by the model."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+
+class StreamingObjectParser:
+    """
+    Extract the members of a JSON object as soon as each one is complete.
+
+    Structured responses are streamed as fragments of a single JSON object such
+    as ``{"question_11": {...}, "question_12": {...}}``. Parsing the whole text
+    only succeeds once the final brace has arrived. This parser instead scans
+    the fragments as they are fed in, tracking string and nesting state, and
+    returns each top-level member whose value is an object or array as soon as
+    its closing bracket is seen. Each character is scanned only once.
+
+    Examples
+    --------
+    >>> parser = StreamingObjectParser()
+    >>> parser.feed('{"question_11": {"response": "Ye')
+    []
+    >>> parser.feed('s"}, "question_12": ')
+    [('question_11', {'response': 'Yes'})]
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._expect_key = False
+        self._string_start = 0
+        self._value_start: Optional[int] = None
+        self._key: Optional[str] = None
+
+    def feed(self, fragment: str) -> list[tuple[str, Any]]:
+        """Add the next fragment of text and return any newly completed members.
+
+        Parameters
+        ----------
+        fragment : str
+            The next piece of the streamed JSON text.
+
+        Returns
+        -------
+        list[tuple[str, Any]]
+            ``(key, value)`` pairs for the top-level members completed by this
+            fragment, in the order they appear.
+        """
+        self._text += fragment
+        completed: list[tuple[str, Any]] = []
+
+        text = self._text
+        for position in range(self._position, len(text)):
+            character = text[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif character == "\\":
+                    self._escaped = True
+                elif character == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        start, end = self._string_start, position + 1
+                        self._key = json.loads(text[start:end])
+                continue
+
+            if character == '"':
+                self._in_string = True
+                self._string_start = position
+            elif character in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+                elif self._depth == 2:
+                    self._value_start = position
+            elif character in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    start, end = self._value_start, position + 1
+                    value = json.loads(text[start:end])
+                    if self._key is not None:
+                        completed.append((self._key, value))
+                    self._value_start = None
+            elif self._depth == 1 and character == ",":
+                self._expect_key = True
+            elif self._depth == 1 and character == ":":
+                self._expect_key = False
+
+        self._position = len(text)
+        return completed
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import csv
 from pathlib import Path
-from typing import Dict, List, Mapping
+from typing import Dict, List, Mapping, Sequence
 
 from rich.console import Console
 from rich.table import Table
@@ -107,16 +107,40 @@ def summarise_frameworks(
     """
     summary: dict[str, dict[str, str | None]] = {}
     for fw in frameworks:
-        manuscript = fw.manuscript or ""
-        domain_results: dict[str, str | None] = {}
-        for domain in fw.domains:
-            domain_results[domain.name] = domain.judgement
+        summary[fw.manuscript or ""] = summarise_framework(fw)
+    return summary
 
-        if "Overall" not in domain_results or domain_results["Overall"] is None:
-            domain_results["Overall"] = fw.judgement
 
-        summary[manuscript] = domain_results
-    return summary
+def summarise_framework(framework: Framework) -> dict[str, str | None]:
+    """Summarise the domain judgements of a single assessment.
+
+    This is the row :func:`summarise_frameworks` builds for each manuscript,
+    for callers that receive assessments one at a time.
+
+    Parameters
+    ----------
+    framework : Framework
+        A completed framework assessment.
+
+    Returns
+    -------
+    dict[str, str | None]
+        The judgement of each domain, keyed by domain name, followed by the
+        ``Overall`` judgement. Judgements that were not recorded are None.
+
+    Examples
+    --------
+    >>> summarise_framework(framework)["Overall"]
+    'some concerns'
+    """
+
+    domain_results: dict[str, str | None] = {}
+    for domain in framework.domains:
+        domain_results[domain.name] = domain.judgement
+
+    if "Overall" not in domain_results or domain_results["Overall"] is None:
+        domain_results["Overall"] = framework.judgement
+    return domain_results
 
 
 def print_summary(
@@ -222,47 +246,132 @@ def export_summary(
         return
 
     domain_names = list(next(iter(summary.values())).keys())
-    has_overall = "Overall" in domain_names
-    if has_overall:
-        domain_names_no_overall = [d for d in domain_names if d != "Overall"]
-    else:
-        domain_names_no_overall = domain_names
     path = Path(path)
 
     with path.open("w", newline="") as csv_file:
         writer = csv.writer(csv_file)
-        writer.writerow(
-            ["Study"]
-            + [f"D{i}" for i in range(1, len(domain_names_no_overall) + 1)]
-            + ["Overall"]
-        )
+        writer.writerow(_summary_header(domain_names))
+        for manuscript, domains in summary.items():
+            writer.writerow(_summary_row(manuscript, domains, domain_names))
 
-        ranking = {"low": 0, "some concerns": 1, "high": 2}
-        inverse_ranking = {0: "Low", 1: "Some concerns", 2: "High"}
 
-        for manuscript, domains in summary.items():
-            row: list[str | None] = [manuscript]
-            worst = -1
-            for domain in domain_names_no_overall:
-                judgement = domains.get(domain)
-                # robvis requires a specific format
-                if judgement is not None:
-                    judgement_robvis = judgement.replace("Concerns", "concerns")
-                else:
-                    judgement_robvis = None
-                row.append(judgement_robvis)
-                if judgement:
-                    score = ranking.get(judgement.lower(), -1)
-                    if score > worst:
-                        worst = score
-
-            if has_overall:
-                overall_raw = domains.get("Overall")
-                if overall_raw is not None:
-                    overall = overall_raw.replace("Concerns", "concerns")
-                else:
-                    overall = ""
-            else:
-                overall = inverse_ranking.get(worst, "")
-            row.append(overall)
-            writer.writerow(row)
+class SummaryWriter:
+    """Maintain a summary CSV while assessments complete one at a time.
+
+    :func:`export_summary` rewrites the whole file, so calling it after every
+    manuscript of a large directory costs time quadratic in the number of
+    manuscripts. A ``SummaryWriter`` keeps the running summary in memory and
+    appends one row per new manuscript, producing the same file as
+    :func:`export_summary` would for the summary so far. The file is only
+    rewritten when a manuscript already in the summary is updated, or a
+    framework with different domains is added.
+
+    Parameters
+    ----------
+    path : Path | str
+        Destination of the CSV file. Any existing file is replaced when the
+        first framework is added.
+
+    Attributes
+    ----------
+    summary : dict[str, dict[str, str | None]]
+        The summary of every framework added so far, in the format returned by
+        :func:`summarise_frameworks`.
+
+    Examples
+    --------
+    >>> writer = SummaryWriter("risk_of_bias_summary.csv")
+    >>> for manuscript in manuscripts:
+    ...     writer.add(run_framework(manuscript))
+    >>> print_summary(writer.summary)
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.summary: dict[str, dict[str, str | None]] = {}
+        self._domain_names: list[str] | None = None
+
+    def add(self, framework: Framework) -> None:
+        """Add or update the summary row for ``framework``."""
+
+        manuscript = framework.manuscript or ""
+        domains = summarise_framework(framework)
+        replaced = manuscript in self.summary
+        self.summary[manuscript] = domains
+
+        if self._domain_names is None:
+            self._domain_names = list(domains.keys())
+            with self.path.open("w", newline="") as csv_file:
+                csv.writer(csv_file).writerow(_summary_header(self._domain_names))
+
+        if replaced or list(domains.keys()) != self._domain_names:
+            # The columns are taken from the first manuscript, as in
+            # export_summary, so rewrite the file to stay identical to it.
+            export_summary(self.summary, self.path)
+            return
+
+        with self.path.open("a", newline="") as csv_file:
+            csv.writer(csv_file).writerow(
+                _summary_row(manuscript, domains, self._domain_names)
+            )
+
+    def reorder(self, manuscripts: Sequence[str]) -> None:
+        """Rewrite the file with its rows in the order of ``manuscripts``.
+
+        Manuscripts in the summary but not in ``manuscripts`` follow in their
+        current order. The file is left alone when the order is unchanged.
+        """
+
+        order = [manuscript for manuscript in manuscripts if manuscript in self.summary]
+        order += [manuscript for manuscript in self.summary if manuscript not in order]
+        if order == list(self.summary):
+            return
+        self.summary = {manuscript: self.summary[manuscript] for manuscript in order}
+        export_summary(self.summary, self.path)
+
+
+def _summary_header(domain_names: list[str]) -> list[str]:
+    """Return the robvis CSV header for a summary with ``domain_names``."""
+
+    count = len([d for d in domain_names if d != "Overall"])
+    return ["Study"] + [f"D{i}" for i in range(1, count + 1)] + ["Overall"]
+
+
+def _summary_row(
+    manuscript: str,
+    domains: Mapping[str, str | None],
+    domain_names: list[str],
+) -> list[str | None]:
+    """Return the robvis CSV row of one manuscript."""
+
+    has_overall = "Overall" in domain_names
+    ranking = {"low": 0, "some concerns": 1, "high": 2}
+    inverse_ranking = {0: "Low", 1: "Some concerns", 2: "High"}
+
+    row: list[str | None] = [manuscript]
+    worst = -1
+    for domain in domain_names:
+        if domain == "Overall":
+            continue
+        judgement = domains.get(domain)
+        # robvis requires a specific format
+        if judgement is not None:
+            judgement_robvis = judgement.replace("Concerns", "concerns")
+        else:
+            judgement_robvis = None
+        row.append(judgement_robvis)
+        if judgement:
+            score = ranking.get(judgement.lower(), -1)
+            if score > worst:
+                worst = score
+
+    if has_overall:
+        overall_raw = domains.get("Overall")
+        if overall_raw is not None:
+            overall = overall_raw.replace("Concerns", "concerns")
+        else:
+            overall = ""
+    else:
+        overall = inverse_ranking.get(worst, "")
+    row.append(overall)
+    return row
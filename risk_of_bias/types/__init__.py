@@ -2,14 +2,17 @@
 
 from ._domain_types import Domain
 from ._framework_types import Framework
-from ._question_types import Question
+from ._question_types import Precondition, Question
 from ._response_types import ReasonedResponse, ReasonedResponseWithEvidence, Response
+from ._usage_types import Usage
 
 __all__ = [
     "Response",
     "ReasonedResponse",
     "ReasonedResponseWithEvidence",
     "Question",
+    "Precondition",
     "Domain",
     "Framework",
+    "Usage",
 ]
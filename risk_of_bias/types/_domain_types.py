@@ -1,8 +1,13 @@
-from typing import Callable, Optional
+import itertools
+from typing import Any, Callable, Optional, Self
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
-from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._question_types import Question, response_generation
+from risk_of_bias.types._usage_types import Usage
+
+# Unique revision numbers, taken by a domain when it is created or modified.
+_revisions = itertools.count()
 
 
 class Domain(BaseModel):
@@ -54,18 +59,73 @@ class Domain(BaseModel):
         The sequential position of this domain within the overall framework.
         Used for organizing assessment workflow and reporting results in a
         consistent order.
+    depends_on : list[int] | None
+        Indices of the domains whose answers must be known before this domain
+        is assessed. Their questions and answers are included in the
+        conversation when this domain is asked. An empty list means the domain
+        can be answered from the manuscript alone, and ``None``, the default,
+        means the domain depends on every domain before it. Domains that do not
+        depend on each other are assessed concurrently.
+    usage : Usage | None
+        Token usage, latency and estimated cost of the model request that
+        answered this domain. ``None`` if the domain was answered manually or
+        restored from a cache.
     """
 
     questions: list[Question] = []
     name: str = ""
     index: int = 0
+    depends_on: Optional[list[int]] = None
+    usage: Optional[Usage] = None
     judgement_function: Optional[Callable[["Domain"], str | None]] = Field(
         default=None, exclude=True
     )
+    _judgement_cache: Optional[tuple[Any, str | None]] = PrivateAttr(default=None)
+    _revision: int = PrivateAttr(default_factory=lambda: next(_revisions))
 
     @property
     def judgement(self) -> str | None:
-        """Return the risk-of-bias judgement for this domain."""
+        """Return the risk-of-bias judgement for this domain.
+
+        The judgement is computed once and cached until a question's response
+        is assigned, a question is added, removed or replaced, or a field of
+        the domain is assigned.
+        """
         if self.judgement_function is None:
             return None
-        return self.judgement_function(self)
+
+        # Private attributes are read through the private dict because
+        # BaseModel.__getattr__ is slower than most judgement functions.
+        private = self._private()
+        # Holding the questions keeps their identity, so an equal length list
+        # with another question invalidates the cache
+        key = (response_generation(), private["_revision"], tuple(self.questions))
+        cache = private["_judgement_cache"]
+        if cache is not None and cache[0] == key:
+            return cache[1]
+
+        judgement = self.judgement_function(self)
+        private["_judgement_cache"] = (key, judgement)
+        return judgement
+
+    def _private(self) -> dict[str, Any]:
+        private = self.__pydantic_private__
+        assert private is not None
+        return private
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if not name.startswith("_"):
+            self._private()["_revision"] = next(_revisions)
+
+    def __copy__(self) -> Self:
+        # Copies, such as those made by model_copy(update=...), must not share
+        # the cached judgement of the original
+        copied = super().__copy__()
+        copied._private().update(_judgement_cache=None, _revision=next(_revisions))
+        return copied
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> Self:
+        copied = super().__deepcopy__(memo)
+        copied._private().update(_judgement_cache=None, _revision=next(_revisions))
+        return copied
@@ -1,9 +1,11 @@
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
 
 from risk_of_bias.types._domain_types import Domain
+from risk_of_bias.types._question_types import response_generation
+from risk_of_bias.types._usage_types import Usage
 
 
 class Framework(BaseModel):
@@ -41,6 +43,7 @@ class Framework(BaseModel):
     name: str = ""
     manuscript: Optional[str] = None
     assessor: Optional[str] = None
+    _judgement_cache: Optional[tuple[Any, str | None]] = PrivateAttr(default=None)
 
     @property
     def judgement(self) -> str | None:
@@ -55,8 +58,32 @@ class Framework(BaseModel):
         str | None
             "Low", "Some concerns", or "High" when all domain judgements are
             available, otherwise ``None``.
+
+        Notes
+        -----
+        The judgement is cached until a question's response is assigned or the
+        domains change, so repeated access during exports and summaries does
+        not recompute it.
         """
 
+        private = self.__pydantic_private__
+        assert private is not None
+        key = (
+            response_generation(),
+            tuple(
+                (domain._private()["_revision"], tuple(domain.questions))
+                for domain in self.domains
+            ),
+        )
+        cache = private["_judgement_cache"]
+        if cache is not None and cache[0] == key:
+            return cache[1]
+
+        judgement = self._compute_judgement()
+        private["_judgement_cache"] = (key, judgement)
+        return judgement
+
+    def _compute_judgement(self) -> str | None:
         ranking = {"low": 0, "some concerns": 1, "high": 2}
         inverse_ranking = {0: "Low", 1: "Some concerns", 2: "High"}
 
@@ -74,6 +101,16 @@ class Framework(BaseModel):
 
         return inverse_ranking[worst]
 
+    @property
+    def usage(self) -> Usage:
+        """Return the combined usage of every domain answered by the model."""
+
+        total = Usage()
+        for domain in self.domains:
+            if domain.usage is not None:
+                total = total + domain.usage
+        return total
+
     def __str__(self) -> str:
         """
         Provide a comprehensive human-readable representation of the Framework.
@@ -1,7 +1,88 @@
-from pydantic import BaseModel
+import threading
+from typing import Any, Literal, Optional
+
+from pydantic import BaseModel, model_validator
 
 from risk_of_bias.types._response_types import ReasonedResponseWithEvidenceAndRawData
 
+NOT_APPLICABLE = "Not Applicable"
+
+# Incremented whenever a question's response is assigned, so judgements cached
+# on domains and frameworks can tell whether any answer may have changed.
+_response_generation = 0
+_response_generation_lock = threading.Lock()
+
+
+def response_generation() -> int:
+    """Return a number that changes whenever any ``Question.response`` is set."""
+
+    return _response_generation
+
+
+def _responses_changed() -> None:
+    global _response_generation
+    with _response_generation_lock:
+        _response_generation += 1
+
+
+class Precondition(BaseModel):
+    """
+    The answers to earlier questions under which a question should be asked.
+
+    Frameworks like RoB2 contain conditional signalling questions such as
+    "If Yes, Probably Yes or No Information to 2.1 or 2.2: ...". A precondition
+    makes that condition machine readable, so the question is only asked once
+    the questions it depends on have been answered, and is otherwise answered
+    "Not Applicable" without a model request.
+
+    Attributes
+    ----------
+    questions : list[float]
+        Indices of the questions in the same domain whose answers decide
+        whether the question applies.
+    answers : list[str]
+        The answers to those questions for which the question applies.
+    match : {"any", "all"}, default="any"
+        Whether the question applies when any, or only when all, of
+        ``questions`` were answered with one of ``answers``.
+
+    Examples
+    --------
+    >>> Precondition(questions=[2.1, 2.2], answers=["Yes", "Probably Yes"])
+    """
+
+    questions: list[float]
+    answers: list[str]
+    match: Literal["any", "all"] = "any"
+
+    def evaluate(self, responses: dict[float, Optional[str]]) -> Optional[bool]:
+        """
+        Decide whether the condition holds given the answers so far.
+
+        Parameters
+        ----------
+        responses : dict[float, str | None]
+            The answer to each question of the domain by question index, or
+            ``None`` for questions that have not been answered yet.
+
+        Returns
+        -------
+        bool | None
+            Whether the condition holds, or ``None`` if it cannot be decided
+            until more of ``questions`` have been answered.
+        """
+
+        gates = [responses.get(index) for index in self.questions]
+        met = [gate in self.answers for gate in gates if gate is not None]
+
+        if self.match == "any" and any(met):
+            return True
+        if self.match == "all" and not all(met):
+            return False
+        if len(met) < len(gates):
+            return None
+        return self.match == "all" or any(met)
+
 
 class Question(BaseModel):
     """
@@ -77,6 +158,18 @@ class Question(BaseModel):
         The AI-generated assessment response, populated during framework
         execution. Contains the structured response, reasoning, supporting
         evidence, and raw model output data.
+    precondition : Precondition | None, default=None
+        The answers to earlier questions in the domain under which this
+        question applies. When assessing with skip logic, the question is only
+        sent to the model once its precondition holds, and is otherwise
+        answered "Not Applicable", which must then be one of
+        ``allowed_answers``. ``None`` means the question always applies.
+
+    Notes
+    -----
+    Domain and framework judgements are cached until a response is assigned.
+    Replace ``response`` with a new object rather than modifying the existing
+    response in place, so the cached judgements are recomputed.
     """
 
     question: str
@@ -91,3 +184,25 @@ class Question(BaseModel):
     index: float = 0.0
     is_required: bool = False
     response: ReasonedResponseWithEvidenceAndRawData | None = None
+    precondition: Optional[Precondition] = None
+
+    @model_validator(mode="after")
+    def _check_not_applicable_allowed(self) -> "Question":
+        if (
+            self.precondition is not None
+            and self.allowed_answers is not None
+            and NOT_APPLICABLE not in self.allowed_answers
+        ):
+            raise ValueError(
+                f"Questions with a precondition must allow {NOT_APPLICABLE!r}"
+            )
+        return self
+
+    def model_post_init(self, context: Any) -> None:
+        if self.response is not None:
+            _responses_changed()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "response":
+            _responses_changed()
@@ -0,0 +1,69 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class Usage(BaseModel):
+    """
+    Token usage, latency and estimated cost of one or more model requests.
+
+    A ``Usage`` is recorded on each :class:`Domain` answered by the model and is
+    saved with the framework, unlike the ``raw_data`` of each response. Usages
+    can be added together, which is how the totals for a framework or a corpus
+    of frameworks are built.
+
+    Attributes
+    ----------
+    model : str | None
+        The model that served the request, as reported by the API. ``None``
+        when usages from different models have been combined.
+    request_id : str | None
+        The identifier of the response. ``None`` for combined usages.
+    requests : int
+        Number of requests included.
+    input_tokens : int
+        Input tokens, including cached input tokens.
+    cached_input_tokens : int
+        Input tokens served from the prompt cache at a reduced price.
+    output_tokens : int
+        Output tokens, including any reasoning tokens.
+    latency_seconds : float
+        Wall-clock time spent waiting for the responses.
+    cost : float | None
+        Estimated cost in US dollars, or ``None`` if the price of the model is
+        unknown.
+    """
+
+    model: Optional[str] = None
+    request_id: Optional[str] = None
+    requests: int = 0
+    input_tokens: int = 0
+    cached_input_tokens: int = 0
+    output_tokens: int = 0
+    latency_seconds: float = 0.0
+    cost: Optional[float] = None
+
+    @property
+    def total_tokens(self) -> int:
+        """Input plus output tokens."""
+        return self.input_tokens + self.output_tokens
+
+    def __add__(self, other: "Usage") -> "Usage":
+        if self.requests == 0:
+            return other.model_copy()
+        if other.requests == 0:
+            return self.model_copy()
+
+        cost = None
+        if self.cost is not None and other.cost is not None:
+            cost = self.cost + other.cost
+
+        return Usage(
+            model=self.model if self.model == other.model else None,
+            requests=self.requests + other.requests,
+            input_tokens=self.input_tokens + other.input_tokens,
+            cached_input_tokens=self.cached_input_tokens + other.cached_input_tokens,
+            output_tokens=self.output_tokens + other.output_tokens,
+            latency_seconds=self.latency_seconds + other.latency_seconds,
+            cost=cost,
+        )
@@ -0,0 +1,201 @@
+"""Token usage, latency and cost accounting for model requests."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, Literal, Mapping, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from risk_of_bias.types._framework_types import Framework
+from risk_of_bias.types._usage_types import Usage
+
+# US dollars per million input, cached input and output tokens.
+MODEL_PRICES: dict[str, tuple[float, float, float]] = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-5": (1.25, 0.125, 10.00),
+    "gpt-5-mini": (0.25, 0.025, 2.00),
+    "gpt-5-nano": (0.05, 0.005, 0.40),
+    "o3": (2.00, 0.50, 8.00),
+    "o4-mini": (1.10, 0.275, 4.40),
+}
+
+
+def estimate_cost(
+    model: str,
+    input_tokens: int,
+    cached_input_tokens: int,
+    output_tokens: int,
+    prices: Mapping[str, tuple[float, float, float]] = MODEL_PRICES,
+) -> Optional[float]:
+    """Estimate the cost of a request in US dollars.
+
+    Parameters
+    ----------
+    model : str
+        The model name. Dated snapshots such as ``gpt-4.1-2025-04-14`` use the
+        price of the longest matching model name in ``prices``.
+    input_tokens : int
+        Input tokens, including cached input tokens.
+    cached_input_tokens : int
+        Input tokens served from the prompt cache.
+    output_tokens : int
+        Output tokens.
+    prices : Mapping[str, tuple[float, float, float]], default=MODEL_PRICES
+        Dollars per million input, cached input and output tokens by model.
+
+    Returns
+    -------
+    float | None
+        The estimated cost, or ``None`` when the model has no known price.
+    """
+    matches = [name for name in prices if model == name or model.startswith(name + "-")]
+    if not matches:
+        return None
+
+    input_price, cached_price, output_price = prices[max(matches, key=len)]
+    uncached_tokens = input_tokens - cached_input_tokens
+    return (
+        uncached_tokens * input_price
+        + cached_input_tokens * cached_price
+        + output_tokens * output_price
+    ) / 1_000_000
+
+
+def usage_from_response(
+    raw_response: Any,
+    model: str,
+    latency_seconds: float,
+) -> Usage:
+    """Build the :class:`Usage` of a single Responses API request.
+
+    Parameters
+    ----------
+    raw_response : Any
+        The response returned by the API. Missing usage information is
+        recorded as zero tokens.
+    model : str
+        The model requested, used when the response does not report one.
+    latency_seconds : float
+        Wall-clock time spent waiting for the response.
+
+    Returns
+    -------
+    Usage
+        The usage of the request, including its estimated cost.
+    """
+    usage = getattr(raw_response, "usage", None)
+    input_tokens = getattr(usage, "input_tokens", None) or 0
+    output_tokens = getattr(usage, "output_tokens", None) or 0
+    details = getattr(usage, "input_tokens_details", None)
+    cached_input_tokens = getattr(details, "cached_tokens", None) or 0
+    response_model = getattr(raw_response, "model", None) or model
+
+    return Usage(
+        model=response_model,
+        request_id=getattr(raw_response, "id", None),
+        requests=1,
+        input_tokens=input_tokens,
+        cached_input_tokens=cached_input_tokens,
+        output_tokens=output_tokens,
+        latency_seconds=latency_seconds,
+        cost=estimate_cost(
+            response_model, input_tokens, cached_input_tokens, output_tokens
+        ),
+    )
+
+
+def summarise_usage(
+    frameworks: Iterable[Framework],
+    by: Literal["domain", "model", "manuscript"] = "domain",
+) -> dict[str, Usage]:
+    """Combine the usage recorded across a corpus of assessments.
+
+    Parameters
+    ----------
+    frameworks : Iterable[Framework]
+        Completed assessments, for example from
+        :func:`~risk_of_bias.summary.load_frameworks_from_directory`.
+    by : {"domain", "model", "manuscript"}, default="domain"
+        How to group the usage. Grouping by domain shows which parts of the
+        framework dominate spend and latency, grouping by model compares
+        models, and grouping by manuscript finds the most expensive studies.
+
+    Returns
+    -------
+    dict[str, Usage]
+        The combined usage of each group, sorted from most to least expensive.
+        Domains without recorded usage are ignored.
+    """
+    if by not in ("domain", "model", "manuscript"):
+        raise ValueError("by must be 'domain', 'model' or 'manuscript'")
+
+    totals: dict[str, Usage] = {}
+    for framework in frameworks:
+        for domain in framework.domains:
+            if domain.usage is None:
+                continue
+            if by == "domain":
+                group = domain.name
+            elif by == "model":
+                group = domain.usage.model or "unknown"
+            else:
+                group = framework.manuscript or "unknown"
+            totals[group] = totals.get(group, Usage()) + domain.usage
+
+    return dict(
+        sorted(
+            totals.items(),
+            key=lambda item: (item[1].cost or 0.0, item[1].total_tokens),
+            reverse=True,
+        )
+    )
+
+
+def print_usage(
+    usage: Mapping[str, Usage],
+    console: Console | None = None,
+) -> None:
+    """Display a table of usage from :func:`summarise_usage`.
+
+    Parameters
+    ----------
+    usage : Mapping[str, Usage]
+        Output from :func:`summarise_usage`.
+    console : Console, optional
+        Rich console used for output. If ``None``, a default console is created.
+    """
+    if console is None:
+        console = Console()
+
+    if not usage:
+        console.print("No usage to display.")
+        return
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Group")
+    for column in ("Requests", "Input", "Cached", "Output", "Latency (s)", "Cost ($)"):
+        table.add_column(column, justify="right")
+
+    total = Usage()
+    for group, group_usage in usage.items():
+        total = total + group_usage
+        table.add_row(group, *_usage_cells(group_usage))
+    table.add_row("Total", *_usage_cells(total), style="bold")
+
+    console.print(table)
+
+
+def _usage_cells(usage: Usage) -> list[str]:
+    return [
+        str(usage.requests),
+        str(usage.input_tokens),
+        str(usage.cached_input_tokens),
+        str(usage.output_tokens),
+        f"{usage.latency_seconds:.1f}",
+        "?" if usage.cost is None else f"{usage.cost:.4f}",
+    ]
@@ -1,23 +1,135 @@
 from __future__ import annotations
 
+import asyncio
+import gzip
+import hashlib
+import json
+import mimetypes
 import os
+import shutil
 import tempfile
+import threading
 import uuid
 import webbrowser
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache, partial
+from html import escape
 from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import FileResponse, HTMLResponse
+from fastapi import FastAPI, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    RedirectResponse,
+    Response,
+    StreamingResponse,
+)
 
 from risk_of_bias.config import settings
+from risk_of_bias.export import (
+    export_framework_as_html,
+    export_framework_as_markdown,
+)
 from risk_of_bias.frameworks.rob2 import get_rob2_framework
+from risk_of_bias.janitor import Janitor
+from risk_of_bias.jobs import Job, JobQueue, JobStatus
+from risk_of_bias.manifest import AssessmentManifest, digest_assessment_key
 from risk_of_bias.run_framework import run_framework
+from risk_of_bias.summary import summarise_framework
+from risk_of_bias.types._domain_types import Domain
 from risk_of_bias.types._framework_types import Framework
+from risk_of_bias.types._question_types import Question
 
 APP_TEMP_DIR = Path(tempfile.gettempdir()) / "risk_of_bias_web"
 APP_TEMP_DIR.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Remove expired uploads and results while the server runs."""
+    janitor.start()
+    try:
+        yield
+    finally:
+        janitor.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# Assessments run in the background so uploads return immediately
+jobs = JobQueue()
+
+# Completed assessments by the content of the upload and their parameters
+results = AssessmentManifest(APP_TEMP_DIR / settings.manifest_filename)
+
+
+def _job_in_use(job_id: str) -> bool:
+    job = jobs.get(job_id)
+    return job is not None and not job.done
+
+
+def _forget_job(job_id: str) -> None:
+    jobs.forget(job_id)
+    results.remove(APP_TEMP_DIR / job_id / "result.json")
+    with _file_cache_lock:
+        for key in [key for key in _file_cache if key[0] == job_id]:
+            del _file_cache[key]
+
+
+# Job directories are removed once expired or when over the disk quota, least
+# recently downloaded first
+janitor = Janitor(APP_TEMP_DIR, in_use=_job_in_use, on_evict=_forget_job)
+
+# Uploads are copied to disk in chunks of this size. PDFs must start with the
+# signature, and requests may exceed the upload limit by the other form fields
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+PDF_SIGNATURE = b"%PDF-"
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Exports rendered from result.json on first request. Files up to
+# FILE_CACHE_MAX_FILE_BYTES are served from memory, and text responses of at
+# least GZIP_MIN_BYTES are also kept gzip compressed
+EXPORTS: dict[str, Callable[[Framework, Path], None]] = {
+    "result.md": export_framework_as_markdown,
+    "result.html": export_framework_as_html,
+}
+FILE_CACHE_MAX_FILE_BYTES = 1024 * 1024
+GZIP_MIN_BYTES = 500
+
+
+@dataclass
+class _CachedFile:
+    path: Path
+    etag: str
+    modified: float
+    media_type: str
+    # None for files too large to keep in memory
+    content: Optional[bytes]
+    gzipped: Optional[bytes]
+
+
+_file_cache: OrderedDict[tuple[str, str], _CachedFile] = OrderedDict()
+_file_cache_lock = threading.Lock()
+_render_lock = threading.Lock()
+
+# The saved assessment including raw model responses, for the JSON API
+RAW_RESULT_FILENAME = "result.raw.json.gz"
+
+# Where the JSON API is served, and its default and largest page sizes
+API_PREFIX = "/api/v1"
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 500
+
+# How often event streams check for new job events, and the longest they stay
+# silent before sending a keep-alive comment
+SSE_POLL_SECONDS = 0.25
+SSE_KEEPALIVE_SECONDS = 15.0
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -56,7 +168,7 @@ def index() -> str:
                                 </label>
                                 <p class="pl-1">or drag and drop</p>
                             </div>
-                            <p class="text-xs text-gray-500">PDF up to 10MB</p>
+                            <p class="text-xs text-gray-500">PDF up to {{MAX_UPLOAD_SIZE}}</p>
                         </div>
                     </div>
                 </div>
@@ -178,43 +290,241 @@ def index() -> str:
     else:
         html = html.replace("{{API_KEY_FIELD}}", key_field)
 
+    html = html.replace(
+        "{{MAX_UPLOAD_SIZE}}", f"{settings.web_max_upload_bytes / 1024 / 1024:g}MB"
+    )
     return html.replace("{{MODEL_OPTIONS}}", options)
 
 
-@app.post("/analyze", response_class=HTMLResponse)
+@app.post("/analyze")
 def analyze(
     file: UploadFile = File(...),
     model: str = Form(settings.fast_ai_model),
     api_key: str | None = Form(None),
-) -> str:
-    """Process a PDF with the selected model and return the assessment HTML."""
-    file_id = uuid.uuid4().hex
-    work_dir = APP_TEMP_DIR / file_id
+) -> RedirectResponse:
+    """Queue an assessment of the uploaded PDF and redirect to its job page."""
+    job_id, _ = _submit_upload(file, model, api_key)
+    return RedirectResponse(f"/jobs/{job_id}", status_code=303)
+
+
+def _submit_upload(
+    file: UploadFile, model: str, api_key: str | None
+) -> tuple[str, bool]:
+    """Save an uploaded PDF and queue its assessment.
+
+    Returns the job id and whether it is an earlier job whose assessment is
+    reused. The id of an earlier job is returned when an identical upload was
+    already assessed with the same parameters, or is being assessed.
+    """
+    job_id = uuid.uuid4().hex
+    work_dir = APP_TEMP_DIR / job_id
     work_dir.mkdir(parents=True, exist_ok=True)
 
-    filename = file.filename or "manuscript.pdf"
+    filename = Path(file.filename or "manuscript.pdf").name
     pdf_path = work_dir / filename
-    with pdf_path.open("wb") as f:
-        f.write(file.file.read())
+    try:
+        digest = _save_upload(file, pdf_path)
+    except HTTPException:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        raise
+
+    # Reuse the assessment of an identical upload, or join one in progress
+    key = digest_assessment_key(
+        digest, get_rob2_framework(), model, settings.temperature
+    )
+    saved = results.get(key)
+    if saved is not None:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        janitor.touch(saved.parent.name)
+        return saved.parent.name, True
+
+    job = jobs.submit(
+        Job(manuscript=pdf_path, model=model, id=job_id, sha256=digest, key=key),
+        partial(_assess, api_key=api_key),
+    )
+    if job.id != job_id:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return job.id, False
+
+
+@app.middleware("http")
+async def limit_upload_size(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Reject uploads declaring a body larger than allowed before reading them."""
+    length = request.headers.get("content-length")
+    if (
+        request.method == "POST"
+        and length is not None
+        and length.isdigit()
+        and int(length) > settings.web_max_upload_bytes + UPLOAD_FORM_OVERHEAD_BYTES
+    ):
+        return JSONResponse({"detail": _upload_too_large_message()}, status_code=413)
+    return await call_next(request)
+
+
+def _save_upload(file: UploadFile, path: Path) -> str:
+    """Copy an uploaded PDF to ``path`` in chunks, returning its SHA-256.
+
+    The upload is never held in memory in full. Uploads that do not start with
+    the PDF signature or exceed ``settings.web_max_upload_bytes`` are rejected
+    as soon as this is known, before any model request is made.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with path.open("wb") as f:
+        while chunk := file.file.read(UPLOAD_CHUNK_BYTES):
+            if size == 0 and not chunk.startswith(PDF_SIGNATURE):
+                raise HTTPException(status_code=415, detail="The file is not a PDF")
+            size += len(chunk)
+            if size > settings.web_max_upload_bytes:
+                raise HTTPException(status_code=413, detail=_upload_too_large_message())
+            digest.update(chunk)
+            f.write(chunk)
+    if size == 0:
+        raise HTTPException(status_code=415, detail="The file is not a PDF")
+    return digest.hexdigest()
+
+
+def _upload_too_large_message() -> str:
+    limit = settings.web_max_upload_bytes / 1024 / 1024
+    return f"The file is larger than the {limit:g}MB limit"
+
+
+@app.get("/jobs/{job_id}", response_class=HTMLResponse)
+def job_page(job_id: str) -> str:
+    """Return the assessment once complete, otherwise a page awaiting it."""
+    job = jobs.get(job_id)
+    if job is None:
+        # Results outlive the in-memory job record, e.g. across restarts
+        if (APP_TEMP_DIR / job_id / "result.json").is_file():
+            return _result_page(job_id)
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status == "completed":
+        return _result_page(job.id)
+    if job.status == "failed":
+        return _failed_page(job)
+    return _pending_page(job)
+
+
+@app.get("/jobs/{job_id}/status")
+def job_status(job_id: str) -> dict[str, Any]:
+    """Return the status of an assessment job as JSON."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request) -> StreamingResponse:
+    """Stream the progress events of an assessment job as server-sent events.
+
+    Every event published so far is sent first, then new events as they occur,
+    until the job finishes. Reconnecting clients resume after the
+    ``Last-Event-ID`` they received.
+    """
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    try:
+        start = int(request.headers.get("last-event-id", -1)) + 1
+    except ValueError:
+        start = 0
+
+    async def stream() -> AsyncIterator[str]:
+        position = start
+        idle = 0.0
+        while True:
+            # Check for completion first, as the final event is published
+            # before the job reports that it is done
+            done = job.done
+            events = job.events(position)
+            for event in events:
+                yield (
+                    f"id: {event['id']}\nevent: {event['type']}\n"
+                    f"data: {json.dumps(event)}\n\n"
+                )
+            position += len(events)
+            if done and not events:
+                return
+
+            if events:
+                idle = 0.0
+            elif idle >= SSE_KEEPALIVE_SECONDS:
+                # Stop proxies closing an idle connection
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(SSE_POLL_SECONDS)
+            idle += SSE_POLL_SECONDS
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _assess(job: Job, api_key: str | None) -> Framework:
+    """Assess the job's manuscript and save the results next to it."""
+
+    def domain_started(domain: Domain) -> None:
+        job.publish("domain_started", domain=domain.index, name=domain.name)
+
+    def question_answered(domain: Domain, question: Question) -> None:
+        response = question.response
+        job.publish(
+            "question_answered",
+            domain=domain.index,
+            question=question.index,
+            text=question.question,
+            response=response.response if response else None,
+            reasoning=response.reasoning if response else None,
+        )
+
+    def domain_completed(domain: Domain) -> None:
+        job.publish(
+            "domain_completed",
+            domain=domain.index,
+            name=domain.name,
+            judgement=domain.judgement,
+            usage=domain.usage.model_dump() if domain.usage else None,
+        )
 
     framework: Framework = run_framework(
-        manuscript=pdf_path,
+        manuscript=job.manuscript,
         framework=get_rob2_framework(),
-        model=model,
+        model=job.model,
         verbose=True,
         temperature=settings.temperature,
         api_key=api_key,
+        stream=True,
+        on_question=question_answered,
+        on_domain_start=domain_started,
+        on_domain_complete=domain_completed,
     )
 
-    json_path = work_dir / "result.json"
-    md_path = work_dir / "result.md"
-    html_path = work_dir / "result.html"
+    # The Markdown and HTML exports are rendered when first requested. The raw
+    # model responses are only kept compressed, for the JSON API
+    framework.save(job.work_dir / "result.json")
+    (job.work_dir / RAW_RESULT_FILENAME).write_bytes(
+        gzip.compress(framework.model_dump_json().encode())
+    )
+    if job.key is not None:
+        results.record(job.key, job.work_dir / "result.json", model=job.model)
+    return framework
 
-    framework.save(json_path)
-    framework.export_to_markdown(md_path)
-    framework.export_to_html(html_path)
 
-    html_content = html_path.read_text()
+def _result_page(job_id: str) -> str:
+    """Return the HTML assessment of a completed job with download links."""
+    cached = _cached_file(job_id, "result.html")
+    html_content = (
+        cached.content.decode()
+        if cached.content is not None
+        else cached.path.read_text()
+    )
     download_links = (
         '<div class="bg-blue-50 border-l-4 border-blue-400 p-4 mb-6">'
         '<div class="flex">'
@@ -222,9 +532,9 @@ def analyze(
         '<h3 class="text-sm font-medium text-blue-800">Download Results</h3>'
         '<div class="mt-2 text-sm text-blue-700">'
         '<p class="space-x-4">'
-        f'<a href="/download/{file_id}/result.json" class="font-medium underline hover:text-blue-600">JSON </a> | '
-        f'<a href="/download/{file_id}/result.md" class="font-medium underline hover:text-blue-600">Markdown </a> | '
-        f'<a href="/download/{file_id}/result.html" class="font-medium underline hover:text-blue-600">HTML </a>'
+        f'<a href="/download/{job_id}/result.json" class="font-medium underline hover:text-blue-600">JSON </a> | '
+        f'<a href="/download/{job_id}/result.md" class="font-medium underline hover:text-blue-600">Markdown </a> | '
+        f'<a href="/download/{job_id}/result.html" class="font-medium underline hover:text-blue-600">HTML </a>'
         "</p>"
         "</div>"
         "</div>"
@@ -241,13 +551,478 @@ def analyze(
     return html_content.replace("<body>", f"<body>{download_links}", 1)
 
 
+def _pending_page(job: Job) -> str:
+    """Return a page showing the progress of a queued or running job.
+
+    The page subscribes to the job's event stream and renders each domain's
+    answers as they arrive, then reloads to show the report once the job
+    finishes.
+    """
+    return f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>Risk of Bias Assessment</title>
+        <script src="https://cdn.tailwindcss.com"></script>
+    </head>
+    <body class="bg-gray-50 min-h-screen">
+        <div class="max-w-3xl mx-auto space-y-6 p-8">
+            <div class="text-center space-y-4">
+                <div class="inline-block animate-spin rounded-full h-8 w-8 border-b-2 border-indigo-600"></div>
+                <h3 class="text-lg font-medium text-gray-900">Processing {escape(job.manuscript.name)}...</h3>
+                <p id="status" class="text-sm text-gray-600">Status: {job.status}</p>
+                <p id="tokens" class="text-sm text-gray-600"></p>
+                <p class="text-sm text-gray-600">This may take several minutes. You can leave this page and return to it later.</p>
+            </div>
+            <div id="domains" class="space-y-4"></div>
+        </div>
+
+        <script>
+            const domains = document.getElementById('domains');
+            let tokens = 0;
+
+            function domainSection(event) {{
+                let section = document.getElementById('domain-' + event.domain);
+                if (!section) {{
+                    section = document.createElement('div');
+                    section.id = 'domain-' + event.domain;
+                    section.className = 'bg-white shadow rounded-md p-4';
+                    const heading = document.createElement('h2');
+                    heading.className = 'text-lg font-medium text-gray-900';
+                    heading.textContent = 'Domain ' + event.domain + ': ' + (event.name || '');
+                    const list = document.createElement('ul');
+                    list.className = 'mt-2 space-y-2 text-sm text-gray-700';
+                    section.append(heading, list);
+                    domains.append(section);
+                }}
+                return section;
+            }}
+
+            const source = new EventSource('/jobs/{job.id}/events');
+            source.addEventListener('status', (e) => {{
+                const event = JSON.parse(e.data);
+                document.getElementById('status').textContent = 'Status: ' + event.status;
+                if (event.status === 'completed' || event.status === 'failed') {{
+                    source.close();
+                    window.location.reload();
+                }}
+            }});
+            source.addEventListener('domain_started', (e) => {{
+                domainSection(JSON.parse(e.data));
+            }});
+            source.addEventListener('question_answered', (e) => {{
+                const event = JSON.parse(e.data);
+                const item = document.createElement('li');
+                const answer = document.createElement('strong');
+                answer.textContent = event.response;
+                item.append(event.text + ' ', answer);
+                domainSection(event).querySelector('ul').append(item);
+            }});
+            source.addEventListener('domain_completed', (e) => {{
+                const event = JSON.parse(e.data);
+                const section = domainSection(event);
+                const judgement = document.createElement('p');
+                judgement.className = 'mt-2 font-medium';
+                judgement.textContent = 'Judgement: ' + (event.judgement || 'None');
+                section.append(judgement);
+                if (event.usage) {{
+                    tokens += event.usage.input_tokens + event.usage.output_tokens;
+                    document.getElementById('tokens').textContent = 'Tokens used: ' + tokens;
+                }}
+            }});
+        </script>
+    </body>
+    </html>
+    """
+
+
+def _failed_page(job: Job) -> str:
+    """Return a page reporting why a job failed."""
+    return f"""
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <title>Risk of Bias Assessment</title>
+        <script src="https://cdn.tailwindcss.com"></script>
+    </head>
+    <body class="bg-gray-50 min-h-screen flex items-center justify-center">
+        <div class="max-w-md w-full text-center space-y-4 p-8">
+            <h3 class="text-lg font-medium text-red-700">Assessment of {escape(job.manuscript.name)} failed</h3>
+            <p class="text-sm text-gray-600">{escape(job.error or "")}</p>
+            <a href="/" class="font-medium text-indigo-600 underline">Upload another manuscript</a>
+        </div>
+    </body>
+    </html>
+    """
+
+
 @app.get("/download/{file_id}/{filename}")
-def download(file_id: str, filename: str) -> FileResponse:
-    """Return a saved file for download."""
-    file_path = APP_TEMP_DIR / file_id / filename
-    if not file_path.is_file():
-        raise HTTPException(status_code=404, detail="File not found")
-    return FileResponse(file_path, filename=filename)
+def download(file_id: str, filename: str, request: Request) -> Response:
+    """Return a saved file for download.
+
+    The Markdown and HTML exports are rendered on first request. Results are
+    kept in memory with their gzip encoding, and requests repeating the
+    ``ETag`` or ``Last-Modified`` of the version they hold receive a 304.
+    """
+    filename = Path(filename).name
+    if filename == RAW_RESULT_FILENAME:
+        # Stored compressed, so sent with its encoding or decompressed
+        response = _raw_result_response(
+            request,
+            APP_TEMP_DIR / file_id,
+            {"Content-Disposition": f'attachment; filename="{Path(filename).stem}"'},
+        )
+        janitor.touch(file_id)
+        return response
+    try:
+        cached = _cached_file(file_id, filename)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found") from None
+    janitor.touch(file_id)
+
+    return _cached_response(
+        request,
+        cached,
+        {"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _cached_response(
+    request: Request, cached: _CachedFile, headers: dict[str, str]
+) -> Response:
+    """Respond with a cached file, or 304 if the client holds it already.
+
+    The gzip encoded variant has its own ``ETag``, so caches never confuse it
+    with the identity encoded file.
+    """
+    gzipped = cached.gzipped is not None and _accepts_gzip(request)
+    headers = {**_validator_headers(cached, gzipped), **headers}
+    if _not_modified(request, cached):
+        return Response(status_code=304, headers=headers)
+    if cached.content is None:
+        return FileResponse(cached.path, media_type=cached.media_type, headers=headers)
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(cached.gzipped, media_type=cached.media_type, headers=headers)
+    return Response(cached.content, media_type=cached.media_type, headers=headers)
+
+
+def _cached_file(job_id: str, filename: str) -> _CachedFile:
+    """Return a job's file from memory, rendering a missing export first.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the job or file does not exist.
+    """
+    path = APP_TEMP_DIR / job_id / filename
+    if filename in EXPORTS and not path.is_file():
+        _render_export(path)
+
+    stat = path.stat()
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    key = (job_id, filename)
+    with _file_cache_lock:
+        cached = _file_cache.get(key)
+        if cached is not None and cached.etag == etag:
+            _file_cache.move_to_end(key)
+            return cached
+
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    if stat.st_size > FILE_CACHE_MAX_FILE_BYTES:
+        return _CachedFile(path, etag, stat.st_mtime, media_type, None, None)
+
+    content = path.read_bytes()
+    compressible = media_type.startswith("text/") or media_type == "application/json"
+    cached = _CachedFile(
+        path=path,
+        etag=etag,
+        modified=stat.st_mtime,
+        media_type=media_type,
+        content=content,
+        gzipped=(
+            gzip.compress(content)
+            if compressible and len(content) >= GZIP_MIN_BYTES
+            else None
+        ),
+    )
+    with _file_cache_lock:
+        _file_cache[key] = cached
+        _file_cache.move_to_end(key)
+        while len(_file_cache) > settings.web_file_cache_entries:
+            _file_cache.popitem(last=False)
+    return cached
+
+
+def _render_export(path: Path) -> None:
+    """Render a Markdown or HTML export from the job's saved assessment."""
+    with _render_lock:
+        if path.is_file():
+            return
+        framework = Framework.load(path.with_name("result.json"))
+        # Render to a temporary file so readers never see a partial export
+        temporary = path.with_name(f".{path.name}.tmp")
+        EXPORTS[path.name](framework, temporary)
+        os.replace(temporary, path)
+
+
+def _validator_headers(cached: _CachedFile, gzipped: bool = False) -> dict[str, str]:
+    """Return the headers letting clients revalidate their copy of a file.
+
+    ``gzipped`` selects the ``ETag`` of the gzip encoded variant.
+    """
+    return {
+        "ETag": _gzip_etag(cached.etag) if gzipped else cached.etag,
+        "Last-Modified": formatdate(cached.modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+
+def _not_modified(request: Request, cached: _CachedFile) -> bool:
+    """Whether the client already holds the current version of the file."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        # Either encoding of the current version is up to date
+        return "*" in tags or cached.etag in tags or _gzip_etag(cached.etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return int(cached.modified) <= since
+    return False
+
+
+def _gzip_etag(etag: str) -> str:
+    """Return the ``ETag`` of the gzip encoded variant of a file."""
+    return f'{etag[:-1]}-gzip"'
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+@app.get("/storage")
+def storage() -> dict[str, Any]:
+    """Return the disk space used by uploads and results, and its limits."""
+    return janitor.usage()
+
+
+# Versioned JSON API for programmatic clients. It is a separate application so
+# that its responses, unlike the file downloads, are compressed as a whole
+api = FastAPI(
+    title="Risk of Bias API",
+    version="1",
+    description="Submit manuscripts for assessment and retrieve the results.",
+)
+api.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES)
+
+
+@api.post("/jobs", status_code=202)
+def api_submit(
+    request: Request,
+    file: UploadFile = File(...),
+    model: str = Form(settings.fast_ai_model),
+    api_key: str | None = Form(None),
+) -> JSONResponse:
+    """Queue an assessment of the uploaded PDF.
+
+    Responds 202 with the queued job, or 200 with the earlier job when an
+    identical upload was already assessed with the same model. A new job
+    responds 202 even if it completes before the response is sent.
+    """
+    job_id, reused = _submit_upload(file, model, api_key)
+    job = _api_job(job_id, request)
+    return JSONResponse(
+        job,
+        status_code=200 if reused else 202,
+        headers={"Location": job["links"]["self"]},
+    )
+
+
+@api.get("/jobs")
+def api_jobs(
+    request: Request,
+    status: Optional[JobStatus] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+) -> dict[str, Any]:
+    """List the jobs known to the server, newest first."""
+    listed = [job for job in jobs.list() if status is None or job.status == status]
+    listed.reverse()
+    return _api_page(
+        request,
+        [_api_job(job.id, request) for job in listed[offset : offset + limit]],
+        len(listed),
+        offset,
+        limit,
+    )
+
+
+@api.get("/jobs/{job_id}")
+def api_job(job_id: str, request: Request) -> dict[str, Any]:
+    """Return the status of a job and links to its results."""
+    return _api_job(job_id, request)
+
+
+@api.get("/jobs/{job_id}/result")
+def api_result(job_id: str, request: Request, raw_data: bool = False) -> Response:
+    """Return the assessment of a completed job as Framework JSON.
+
+    With ``raw_data`` each response includes the raw model response it was
+    parsed from. Responds 409 while the job is still in progress.
+    """
+    job = _api_job(job_id, request)
+    if job["status"] != "completed":
+        raise HTTPException(
+            status_code=409, detail=f"The job is {job['status']}, not completed"
+        )
+    janitor.touch(job_id)
+    if raw_data:
+        return _raw_result_response(request, APP_TEMP_DIR / job_id)
+    return _cached_response(request, _cached_file(job_id, "result.json"), {})
+
+
+@api.get("/summary")
+def api_summary(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(API_PAGE_SIZE, ge=1, le=API_MAX_PAGE_SIZE),
+) -> dict[str, Any]:
+    """Return the domain judgements of every completed assessment.
+
+    Each item holds the judgements :func:`~risk_of_bias.summary.summarise_frameworks`
+    gives for the manuscript. Assessments are listed in the order they
+    completed, so later pages grow as assessments complete.
+    """
+    completed = []
+    for path in APP_TEMP_DIR.glob("*/result.json"):
+        try:
+            completed.append((path.stat().st_mtime_ns, path))
+        except FileNotFoundError:
+            # Evicted while listing
+            continue
+    completed.sort()
+
+    items = []
+    for mtime_ns, path in completed[offset : offset + limit]:
+        try:
+            manuscript, judgements = _summarise_result(path, mtime_ns)
+        except FileNotFoundError:
+            continue
+        items.append(
+            {
+                "job_id": path.parent.name,
+                "manuscript": manuscript,
+                "judgements": judgements,
+            }
+        )
+    return _api_page(request, items, len(completed), offset, limit)
+
+
+def _api_job(job_id: str, request: Request) -> dict[str, Any]:
+    """Return a job's status and links, including jobs completed before a restart.
+
+    Raises
+    ------
+    HTTPException
+        404 if the job does not exist.
+    """
+    job = jobs.get(job_id)
+    if job is not None:
+        data = job.to_dict()
+    elif (APP_TEMP_DIR / job_id / "result.json").is_file():
+        data = {"id": job_id, "status": "completed"}
+    else:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    data["links"] = {
+        name: str(request.url_for(route, job_id=job_id))
+        for name, route in [
+            ("self", "api_job"),
+            ("result", "api_result"),
+            ("events", "job_events"),
+        ]
+    }
+    return data
+
+
+def _api_page(
+    request: Request, items: list[Any], total: int, offset: int, limit: int
+) -> dict[str, Any]:
+    """Return one page of ``items`` with a link to the next page."""
+    next_url = None
+    if offset + limit < total:
+        next_url = str(request.url.include_query_params(offset=offset + limit))
+    return {
+        "items": items,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next": next_url,
+    }
+
+
+@lru_cache(maxsize=4096)
+def _summarise_result(
+    path: Path, mtime_ns: int
+) -> tuple[str | None, dict[str, str | None]]:
+    """Return the manuscript and domain judgements of a saved assessment.
+
+    ``mtime_ns`` is only part of the cache key, so a changed file is read again.
+    """
+    framework = Framework.load(path)
+    return framework.manuscript, summarise_framework(framework)
+
+
+def _raw_result_response(
+    request: Request, work_dir: Path, headers: Optional[dict[str, str]] = None
+) -> Response:
+    """Respond with the saved assessment including the raw model responses.
+
+    The file is stored gzip compressed and sent as is to clients accepting
+    gzip, otherwise it is decompressed.
+    """
+    path = work_dir / RAW_RESULT_FILENAME
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404, detail="Raw model responses were not saved for this job"
+        ) from None
+    cached = _CachedFile(
+        path,
+        f'"{stat.st_mtime_ns:x}-{stat.st_size:x}-raw"',
+        stat.st_mtime,
+        "application/json",
+        None,
+        None,
+    )
+    gzipped = _accepts_gzip(request)
+    headers = {**_validator_headers(cached, gzipped), **(headers or {})}
+    if _not_modified(request, cached):
+        return Response(status_code=304, headers=headers)
+    content = path.read_bytes()
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content, media_type="application/json", headers=headers)
+    return Response(
+        gzip.decompress(content), media_type="application/json", headers=headers
+    )
+
+
+app.mount(API_PREFIX, api)
 
 
 # For local development
@@ -0,0 +1,124 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from risk_of_bias.backends import FakeBackend, OpenAIBackend
+from risk_of_bias.frameworks import get_rob2_framework
+from risk_of_bias.run_framework import arun_frameworks, run_framework
+
+
+def _answers(framework):
+    return [
+        question.response.response if question.response else None
+        for domain in framework.domains
+        for question in domain.questions
+    ]
+
+
+def test_fake_backend_answers_full_framework_deterministically(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake manuscript")
+
+    backend = FakeBackend()
+    first = run_framework(manuscript=pdf, backend=backend, upload_files=True)
+    second = run_framework(manuscript=pdf, backend=FakeBackend())
+
+    assert len(backend.requests) == len(first.domains)
+    assert backend.uploaded_files == {}
+    assert _answers(first) == _answers(second)
+    for domain in first.domains:
+        for question in domain.questions:
+            if question.allowed_answers:
+                assert question.response.response in question.allowed_answers
+        assert domain.usage.requests == 1
+        assert domain.usage.output_tokens > 0
+    assert len(set(_answers(first))) > 1
+
+
+def test_fake_backend_records_requests_as_sent():
+    from risk_of_bias.oai._utils import create_openai_message
+    from risk_of_bias.types._domain_types import Domain
+    from risk_of_bias.types._question_types import Question
+    from risk_of_bias.types._response_types import create_domain_response_class
+
+    domain = Domain(name="D1", index=1, questions=[Question(question="Q", index=1.1)])
+    chat_input = [
+        create_openai_message(
+            "user",
+            text="The paper",
+            file_data="data:application/pdf;base64," + "A" * 4000,
+            filename="paper.pdf",
+        ),
+        create_openai_message("user", text="Q"),
+    ]
+    backend = FakeBackend()
+
+    response = backend.parse(
+        input=chat_input, text_format=create_domain_response_class(domain)
+    )
+    chat_input.append(create_openai_message("assistant", text="Later turn"))
+
+    assert len(backend.requests[0]["input"]) == 2
+    # The attached file still counts towards the estimated input tokens
+    assert response.usage.input_tokens > 1000
+
+
+def test_fake_backend_streams_answers(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake manuscript")
+    announced = []
+
+    framework = run_framework(
+        manuscript=pdf,
+        backend=FakeBackend(stream_chunk_size=5),
+        stream=True,
+        on_question=lambda domain, question: announced.append(question.index),
+    )
+
+    # Independent domains run concurrently, so answers arrive in any order
+    assert sorted(announced) == sorted(
+        question.index for domain in framework.domains for question in domain.questions
+    )
+
+
+def test_fake_backend_latency_overlaps_concurrent_assessments(tmp_path):
+    manuscripts = []
+    for i in range(4):
+        pdf = tmp_path / f"paper_{i}.pdf"
+        pdf.write_bytes(b"%PDF-1.4 fake manuscript")
+        manuscripts.append(pdf)
+
+    backend = FakeBackend(latency=0.05)
+    domains = len(get_rob2_framework().domains)
+
+    started = time.perf_counter()
+    frameworks = asyncio.run(
+        arun_frameworks(manuscripts, backend=backend, max_concurrency=4)
+    )
+    elapsed = time.perf_counter() - started
+
+    assert len(backend.requests) == 4 * domains
+    assert all(None not in _answers(framework) for framework in frameworks)
+    # Sequential execution would take at least 4 * domains * latency
+    assert elapsed < 4 * domains * 0.05
+
+
+def test_openai_backend_delegates_to_client(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    calls = []
+
+    client = SimpleNamespace(
+        responses=SimpleNamespace(parse=lambda **kwargs: calls.append(kwargs)),
+        files=SimpleNamespace(
+            create=lambda file, purpose: SimpleNamespace(id="file-1"),
+            delete=lambda file_id: calls.append(file_id),
+        ),
+    )
+    backend = OpenAIBackend(client=client)
+
+    backend.parse(model="m")
+    assert backend.upload(pdf) == "file-1"
+    backend.delete("file-1")
+
+    assert calls == [{"model": "m"}, "file-1"]
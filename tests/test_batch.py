@@ -0,0 +1,249 @@
+import json
+from pathlib import Path
+from typing import Any
+
+from risk_of_bias.batch import (
+    LocalBatchClient,
+    _text_format_param,
+    example_output_text,
+    run_frameworks_batch,
+)
+from risk_of_bias.cache import ResponseCache
+from risk_of_bias.types._domain_types import Domain
+from risk_of_bias.types._framework_types import Framework
+from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._response_types import create_domain_response_class
+
+
+def _small_framework() -> Framework:
+    return Framework(
+        name="Test Framework",
+        domains=[
+            Domain(name="D1", index=1, questions=[Question(question="Q1", index=1.1)]),
+            Domain(name="D2", index=2, questions=[Question(question="Q2", index=2.1)]),
+        ],
+    )
+
+
+def _manuscripts(tmp_path: Path, count: int) -> list[Path]:
+    manuscripts = []
+    for i in range(count):
+        pdf = tmp_path / f"paper{i}.pdf"
+        pdf.write_bytes(f"manuscript {i}".encode())
+        manuscripts.append(pdf)
+    return manuscripts
+
+
+def test_run_frameworks_batch_stages_one_round_per_domain(tmp_path: Path) -> None:
+    manuscripts = _manuscripts(tmp_path, 3)
+    guidance = tmp_path / "guidance.pdf"
+    guidance.write_bytes(b"guidance")
+    client = LocalBatchClient(polls_until_complete=2)
+
+    frameworks = run_frameworks_batch(
+        manuscripts,
+        framework_factory=_small_framework,
+        model="test-model",
+        guidance_document=guidance,
+        temperature=-1,
+        client=client,
+        poll_interval=0,
+    )
+
+    assert [fw.manuscript for fw in frameworks] == [m.name for m in manuscripts]
+    for framework in frameworks:
+        for domain in framework.domains:
+            assert domain.questions[0].response is not None
+            assert domain.questions[0].response.response == "Yes"
+
+    # One batch job per domain, each containing every manuscript
+    assert [len(requests) for requests in client.submitted] == [3, 3]
+    first_body = client.submitted[0][0]["body"]
+    assert first_body["model"] == "test-model"
+    assert "temperature" not in first_body
+    assert first_body["text"]["format"]["type"] == "json_schema"
+
+    # The second round includes the first round's answer in the conversation
+    second_input = client.submitted[1][0]["body"]["input"]
+    assert second_input[-2]["role"] == "assistant"
+    assert "question_11" in second_input[-2]["content"][0]["text"]
+
+    # PDFs are referenced by file id and the guidance is uploaded only once
+    file_ids = {
+        part["file_id"]
+        for requests in client.submitted
+        for request in requests
+        for message in request["body"]["input"]
+        if isinstance(message["content"], list)
+        for part in message["content"]
+        if "file_id" in part
+    }
+    assert len(file_ids) == 4
+
+    # Every uploaded and generated file is cleaned up
+    assert client.stored_files == {}
+
+
+def test_run_frameworks_batch_skips_manuscripts_with_failed_requests(
+    tmp_path: Path,
+) -> None:
+    manuscripts = _manuscripts(tmp_path, 2)
+
+    def responder(body):
+        if (
+            any(
+                part.get("text") == "Q1"
+                for message in body["input"]
+                if isinstance(message["content"], list)
+                for part in message["content"]
+            )
+            and len(body["input"]) == 3
+        ):
+            return example_output_text(body)
+        return ""
+
+    client = LocalBatchClient(responder=responder)
+    frameworks = run_frameworks_batch(
+        manuscripts,
+        framework_factory=_small_framework,
+        client=client,
+        poll_interval=0,
+    )
+
+    for framework in frameworks:
+        assert framework.domains[0].questions[0].response is not None
+        assert framework.domains[1].questions[0].response is None
+
+
+def test_run_frameworks_batch_reports_failures_per_manuscript(
+    tmp_path: Path,
+) -> None:
+    manuscripts = _manuscripts(tmp_path, 3)
+    bad_file_id = None
+
+    def responder(body):
+        file_ids = {
+            part.get("file_id")
+            for message in body["input"]
+            if isinstance(message["content"], list)
+            for part in message["content"]
+        }
+        if bad_file_id in file_ids:
+            return '{"not": "an answer"}'
+        return example_output_text(body)
+
+    client = LocalBatchClient(responder=responder)
+    create_file = client.files.create
+
+    def create_and_track(file, purpose):
+        nonlocal bad_file_id
+        created = create_file(file=file, purpose=purpose)
+        if purpose == "user_data" and bad_file_id is None:
+            bad_file_id = created.id
+        return created
+
+    client.files.create = create_and_track
+
+    failures: dict[Path, str] = {}
+    frameworks = run_frameworks_batch(
+        manuscripts,
+        framework_factory=_small_framework,
+        client=client,
+        poll_interval=0,
+        on_failure=failures.__setitem__,
+    )
+
+    assert list(failures) == [manuscripts[0]]
+    assert "Invalid response for domain 1" in failures[manuscripts[0]]
+    assert frameworks[0].domains[0].questions[0].response is None
+    for framework in frameworks[1:]:
+        for domain in framework.domains:
+            assert domain.questions[0].response is not None
+    # The failed manuscript is not part of the second round
+    assert [len(requests) for requests in client.submitted] == [3, 2]
+
+
+def test_run_frameworks_batch_continues_after_a_failed_batch(
+    tmp_path: Path,
+) -> None:
+    manuscripts = _manuscripts(tmp_path, 2)
+    client = LocalBatchClient()
+    create_batch = client.batches.create
+
+    def create_failed_batch(**kwargs):
+        batch = create_batch(**kwargs)
+        batch.status = "failed"
+        return batch
+
+    client.batches.create = create_failed_batch
+
+    failures: dict[Path, str] = {}
+    frameworks = run_frameworks_batch(
+        manuscripts,
+        framework_factory=_small_framework,
+        client=client,
+        poll_interval=0,
+        on_failure=failures.__setitem__,
+    )
+
+    assert list(failures) == manuscripts
+    assert "finished with status failed" in failures[manuscripts[0]]
+    assert len(client.submitted) == 1
+    assert all(
+        question.response is None
+        for framework in frameworks
+        for domain in framework.domains
+        for question in domain.questions
+    )
+
+
+def test_run_frameworks_batch_uses_response_cache(tmp_path: Path) -> None:
+    manuscripts = _manuscripts(tmp_path, 2)
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+
+    first = LocalBatchClient()
+    run_frameworks_batch(
+        manuscripts,
+        framework_factory=_small_framework,
+        client=first,
+        cache=cache,
+        poll_interval=0,
+    )
+    assert len(first.submitted) == 2
+
+    second = LocalBatchClient()
+    frameworks = run_frameworks_batch(
+        manuscripts,
+        framework_factory=_small_framework,
+        client=second,
+        cache=cache,
+        poll_interval=0,
+    )
+    assert second.submitted == []
+    assert frameworks[1].domains[1].questions[0].response is not None
+
+
+def test_example_output_text_is_schema_valid() -> None:
+    from risk_of_bias.frameworks.rob2 import get_rob2_framework
+    from risk_of_bias.types._response_types import create_domain_response_class
+
+    for domain in get_rob2_framework().domains:
+        response_class: Any = create_domain_response_class(domain)
+        body = {"text": {"format": _text_format_param(response_class)}}
+        parsed = response_class.model_validate(json.loads(example_output_text(body)))
+        assert len(parsed.model_fields_set) == len(domain.questions)
+
+
+def test_text_format_param_matches_the_responses_api() -> None:
+    """Fails if the SDK's private helper behind batch requests changes."""
+    domain = _small_framework().domains[0]
+    response_class = create_domain_response_class(domain)
+
+    text_format = _text_format_param(response_class)
+
+    assert text_format["type"] == "json_schema"
+    assert text_format["strict"] is True
+    assert text_format["name"] == response_class.__name__
+    schema = text_format["schema"]
+    assert schema["additionalProperties"] is False
+    assert schema["required"] == ["question_11"]
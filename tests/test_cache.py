@@ -0,0 +1,76 @@
+import time
+from pathlib import Path
+
+from risk_of_bias.cache import ResponseCache, make_cache_key, sha256_file
+
+
+def test_sha256_file_depends_on_content(tmp_path: Path) -> None:
+    first = tmp_path / "a.pdf"
+    second = tmp_path / "b.pdf"
+    first.write_bytes(b"same")
+    second.write_bytes(b"same")
+
+    assert sha256_file(first) == sha256_file(second)
+
+    second.write_bytes(b"different")
+    assert sha256_file(first) != sha256_file(second)
+
+
+def test_make_cache_key_is_order_independent() -> None:
+    key = make_cache_key(model="m", temperature=0.2, prompt=["a"])
+    assert key == make_cache_key(prompt=["a"], temperature=0.2, model="m")
+    assert key != make_cache_key(model="m", temperature=0.3, prompt=["a"])
+
+
+def test_response_cache_round_trip(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "cache" / "responses.sqlite")
+    assert cache.get("missing") is None
+
+    cache.set("key", '{"answer": 1}')
+    assert cache.get("key") == '{"answer": 1}'
+    assert "key" in cache
+    assert len(cache) == 1
+
+    # Entries persist across connections
+    cache.close()
+    reopened = ResponseCache(tmp_path / "cache" / "responses.sqlite")
+    assert reopened.get("key") == '{"answer": 1}'
+
+    reopened.clear()
+    assert len(reopened) == 0
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    # Reading "a" makes "b" the least recently used entry
+    assert cache.get("a") == "1"
+    time.sleep(0.01)
+    cache.set("c", "3")
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_response_cache_evicts_by_size(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_bytes=10)
+    cache.set("a", "x" * 6)
+    time.sleep(0.01)
+    cache.set("b", "y" * 6)
+
+    assert "a" not in cache
+    assert cache.get("b") == "y" * 6
+
+
+def test_response_cache_expires_old_entries(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite", max_age_days=1)
+    cache.set("a", "1")
+
+    cache.max_age_days = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+    assert len(cache) == 0
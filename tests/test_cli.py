@@ -1,3 +1,4 @@
+import json
 import sys
 import types
 from pathlib import Path
@@ -20,6 +21,7 @@ def test_cli_runs_with_defaults(tmp_path, monkeypatch):
         guidance_document,
         verbose: bool = False,
         temperature: float = settings.temperature,
+        **kwargs,
     ):
         called["manuscript"] = manuscript
         called["model"] = model
@@ -62,6 +64,7 @@ def test_cli_override_temperature(tmp_path, monkeypatch):
         guidance_document,
         verbose: bool = False,
         temperature: float = settings.temperature,
+        **kwargs,
     ):
         called["temperature"] = temperature
         from risk_of_bias.types._framework_types import Framework
@@ -93,6 +96,7 @@ def test_cli_negative_temperature(tmp_path, monkeypatch):
         guidance_document,
         verbose: bool = False,
         temperature: float = settings.temperature,
+        **kwargs,
     ):
         called["temperature"] = temperature
         from risk_of_bias.types._framework_types import Framework
@@ -125,6 +129,7 @@ def test_cli_sets_manuscript_filename(tmp_path, monkeypatch):
         guidance_document,
         verbose: bool = False,
         temperature: float = settings.temperature,
+        **kwargs,
     ):
         # Return a framework with manuscript name set (simulating run_framework behavior)
         from risk_of_bias.types._framework_types import Framework
@@ -211,6 +216,7 @@ def test_cli_exports_include_manuscript_name(tmp_path, monkeypatch):
         guidance_document,
         verbose: bool = False,
         temperature: float = settings.temperature,
+        **kwargs,
     ):
         result_framework = Framework(name="Test Framework")
         result_framework.manuscript = manuscript.name
@@ -278,6 +284,7 @@ def test_cli_analyse_directory_processes_all_pdfs(tmp_path, monkeypatch):
         guidance_document,
         verbose: bool = False,
         temperature: float = settings.temperature,
+        **kwargs,
     ):
         processed.append(manuscript)
         from risk_of_bias.types._framework_types import Framework
@@ -290,8 +297,8 @@ def test_cli_analyse_directory_processes_all_pdfs(tmp_path, monkeypatch):
 
     pdf1 = tmp_path / "file1.pdf"
     pdf2 = tmp_path / "file2.pdf"
-    pdf1.write_bytes(b"dummy")
-    pdf2.write_bytes(b"dummy")
+    pdf1.write_bytes(b"dummy 1")
+    pdf2.write_bytes(b"dummy 2")
 
     sub = tmp_path / "sub"
     sub.mkdir()
@@ -309,6 +316,114 @@ def test_cli_analyse_directory_processes_all_pdfs(tmp_path, monkeypatch):
         assert (pdf.with_suffix(pdf.suffix + ".html")).exists()
 
 
+def test_cli_analyse_reuses_assessment_of_copied_manuscript(tmp_path, monkeypatch):
+    """A renamed copy of an assessed manuscript should reuse its assessment."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.types._framework_types import Framework
+
+    processed = []
+
+    def fake_run_framework(manuscript, model, **kwargs):
+        processed.append((manuscript, model))
+        return Framework(name="dummy", manuscript=Path(manuscript).name)
+
+    monkeypatch.setattr(cli, "run_framework", fake_run_framework)
+
+    manifest = tmp_path / "manifest.jsonl"
+    first = tmp_path / "first" / "trial.pdf"
+    copy = tmp_path / "second" / "renamed.pdf"
+    for pdf in [first, copy]:
+        pdf.parent.mkdir()
+        pdf.write_bytes(b"same trial")
+
+    runner = CliRunner()
+    for pdf in [first, copy]:
+        result = runner.invoke(
+            cli.app, ["analyse", str(pdf), "--manifest", str(manifest)]
+        )
+        assert result.exit_code == 0
+
+    assert processed == [(first, settings.fast_ai_model)]
+    copied = Framework.load(copy.with_suffix(copy.suffix + ".json"))
+    assert copied.manuscript == "renamed.pdf"
+
+    # Changing a parameter invalidates the saved assessment
+    result = runner.invoke(
+        cli.app,
+        ["analyse", str(copy), "--manifest", str(manifest), "--model", "other"],
+    )
+    assert result.exit_code == 0
+    assert processed[-1] == (copy, "other")
+
+
+def test_cli_analyse_only_regenerates_stale_exports(tmp_path, monkeypatch):
+    """Reruns should leave up to date exports and summary untouched."""
+    import os
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.types._framework_types import Framework
+
+    processed = []
+
+    def fake_run_framework(manuscript, **kwargs):
+        processed.append(manuscript)
+        return Framework(name="dummy", manuscript=Path(manuscript).name)
+
+    monkeypatch.setattr(cli, "run_framework", fake_run_framework)
+
+    pdfs = [tmp_path / "file1.pdf", tmp_path / "file2.pdf"]
+    for i, pdf in enumerate(pdfs):
+        pdf.write_bytes(f"dummy {i}".encode())
+
+    runner = CliRunner()
+    assert runner.invoke(cli.app, ["analyse", str(tmp_path)]).exit_code == 0
+    assert len(processed) == 2
+
+    # Age every artifact so any rewrite is visible in its modification time
+    # Age every artifact, in build order, so any rewrite changes its mtime
+    artifacts = [
+        pdf.with_suffix(pdf.suffix + suffix)
+        for pdf in pdfs
+        for suffix in (".json", ".md", ".html")
+    ] + [tmp_path / "risk_of_bias_summary.csv"]
+    for i, path in enumerate(artifacts):
+        os.utime(path, ns=(10**18 + i, 10**18 + i))
+    stamps = {path: path.stat().st_mtime_ns for path in artifacts}
+
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--dry-run"])
+    assert result.exit_code == 0
+    assert "Everything is up to date" in result.output
+
+    assert runner.invoke(cli.app, ["analyse", str(tmp_path)]).exit_code == 0
+    assert len(processed) == 2
+    assert {path: path.stat().st_mtime_ns for path in artifacts} == stamps
+
+    # Updating one assessment only rebuilds the artifacts depending on it
+    json_path = pdfs[0].with_suffix(".pdf.json")
+    os.utime(json_path, ns=(10**18 + 100, 10**18 + 100))
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--dry-run"])
+    assert result.exit_code == 0
+    assert "Would assess" not in result.output
+    assert "file1.pdf.md" in result.output
+    assert "file2.pdf.md" not in result.output
+    assert "risk_of_bias_summary.csv" in result.output
+    assert {path: path.stat().st_mtime_ns for path in artifacts}[
+        pdfs[0].with_suffix(".pdf.md")
+    ] == stamps[pdfs[0].with_suffix(".pdf.md")]
+
+    assert runner.invoke(cli.app, ["analyse", str(tmp_path)]).exit_code == 0
+    rebuilt = {path for path in artifacts if path.stat().st_mtime_ns != stamps[path]}
+    assert rebuilt == {
+        json_path,
+        pdfs[0].with_suffix(".pdf.md"),
+        pdfs[0].with_suffix(".pdf.html"),
+        tmp_path / "risk_of_bias_summary.csv",
+    }
+    assert len(processed) == 2
+
+
 def test_cli_human_command(tmp_path, monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test")
     from risk_of_bias import cli
@@ -557,3 +672,317 @@ def test_cli_compare_no_verbose(tmp_path, monkeypatch):
     # But should still contain the main results
     assert "Comparison Results:" in result.stdout
     assert "Overall Agreement:" in result.stdout
+
+
+def test_cli_analyse_directory_batch(tmp_path, monkeypatch):
+    """The --batch flag submits pending manuscripts to the batch runner."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.batch import LocalBatchClient
+    from risk_of_bias.batch import run_frameworks_batch as real_run_frameworks_batch
+    from risk_of_bias.types._framework_types import Framework
+
+    submitted = []
+
+    def fake_run_frameworks_batch(manuscripts, **kwargs):
+        submitted.extend(manuscripts)
+        return real_run_frameworks_batch(
+            manuscripts, client=LocalBatchClient(), poll_interval=0, **kwargs
+        )
+
+    def fail_run_framework(*args, **kwargs):
+        raise AssertionError("interactive assessment should not be used")
+
+    monkeypatch.setattr(cli, "run_frameworks_batch", fake_run_frameworks_batch)
+    monkeypatch.setattr(cli, "run_framework", fail_run_framework)
+
+    done = tmp_path / "done.pdf"
+    done.write_bytes(b"dummy")
+    existing = Framework(name="dummy")
+    existing.manuscript = "done.pdf"
+    existing.save(done.with_suffix(".pdf.json"))
+
+    pending = tmp_path / "pending.pdf"
+    pending.write_bytes(b"dummy")
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--batch"])
+
+    assert result.exit_code == 0
+    assert submitted == [pending]
+    loaded = Framework.load(pending.with_suffix(".pdf.json"))
+    assert loaded.manuscript == "pending.pdf"
+    assert loaded.domains[0].questions[0].response is not None
+    assert (tmp_path / "risk_of_bias_summary.csv").exists()
+
+
+def test_cli_analyse_batch_failures_are_not_saved(tmp_path, monkeypatch):
+    """Incomplete batch assessments are reported and retried by the next run."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.batch import LocalBatchClient
+    from risk_of_bias.batch import run_frameworks_batch as real_run_frameworks_batch
+    from risk_of_bias.manifest import AssessmentManifest
+
+    submitted = []
+
+    def fake_run_frameworks_batch(manuscripts, on_failure, **kwargs):
+        submitted.append(list(manuscripts))
+        frameworks = real_run_frameworks_batch(
+            manuscripts, client=LocalBatchClient(), poll_interval=0, **kwargs
+        )
+        for manuscript, framework in zip(manuscripts, frameworks):
+            if manuscript.name == "bad.pdf":
+                on_failure(manuscript, "Invalid response for domain 1")
+                framework.domains[1].questions[0].response = None
+        return frameworks
+
+    def fail_run_framework(*args, **kwargs):
+        raise AssertionError("interactive assessment should not be used")
+
+    monkeypatch.setattr(cli, "run_frameworks_batch", fake_run_frameworks_batch)
+    monkeypatch.setattr(cli, "run_framework", fail_run_framework)
+
+    bad = tmp_path / "bad.pdf"
+    bad.write_bytes(b"%PDF-1.4 bad")
+    good = tmp_path / "good.pdf"
+    good.write_bytes(b"%PDF-1.4 good")
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--batch"])
+
+    assert result.exit_code == 0, result.output
+    assert "Batch assessment of" in result.output
+    assert not bad.with_suffix(".pdf.json").exists()
+    assert not bad.with_suffix(".pdf.md").exists()
+    assert good.with_suffix(".pdf.json").exists()
+    assert len(AssessmentManifest(tmp_path / "risk_of_bias_manifest.jsonl")) == 1
+    rows = (tmp_path / "risk_of_bias_summary.csv").read_text().splitlines()[1:]
+    assert [row.split(",")[0] for row in rows] == ["good.pdf"]
+
+    # The failed manuscript stays stale and is submitted again
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--dry-run"])
+    assert f"Would assess {bad}" in result.output
+    assert f"Would assess {good}" not in result.output
+    runner.invoke(cli.app, ["analyse", str(tmp_path), "--batch"])
+    assert submitted[-1] == [bad]
+
+
+def test_cli_analyse_directory_with_jobs(tmp_path, monkeypatch):
+    """--jobs assesses manuscripts concurrently and keeps the summary ordered."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import threading
+    import time
+
+    from risk_of_bias import cli
+    from risk_of_bias.backends import FakeBackend
+    from risk_of_bias.run_framework import run_framework
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def concurrent_run_framework(manuscript, **kwargs):
+        with lock:
+            active.append(manuscript)
+            peak.append(len(active))
+        # Later manuscripts finish first
+        time.sleep(0.05 * (5 - int(manuscript.stem[-1])))
+        try:
+            return run_framework(manuscript, backend=FakeBackend(), **kwargs)
+        finally:
+            with lock:
+                active.remove(manuscript)
+
+    monkeypatch.setattr(cli, "run_framework", concurrent_run_framework)
+
+    for i in range(5):
+        (tmp_path / f"paper{i}.pdf").write_bytes(f"%PDF-1.4 paper {i}".encode())
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--jobs", "3"])
+
+    assert result.exit_code == 0, result.output
+    assert max(peak) == 3
+    rows = (tmp_path / "risk_of_bias_summary.csv").read_text().splitlines()[1:]
+    assert [row.split(",")[0] for row in rows] == [f"paper{i}.pdf" for i in range(5)]
+    for i in range(5):
+        assert (tmp_path / f"paper{i}.pdf.json").exists()
+
+
+def test_cli_analyse_with_jobs_assesses_identical_manuscripts_once(
+    tmp_path, monkeypatch
+):
+    """Identical PDFs submitted together reuse the first assessment."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.backends import FakeBackend
+    from risk_of_bias.run_framework import run_framework
+    from risk_of_bias.types._framework_types import Framework
+
+    assessed = []
+    limiters = []
+
+    def counting_run_framework(manuscript, **kwargs):
+        assessed.append(manuscript.name)
+        limiters.append(kwargs["rate_limiter"])
+        return run_framework(manuscript, backend=FakeBackend(), **kwargs)
+
+    monkeypatch.setattr(cli, "run_framework", counting_run_framework)
+
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 same")
+    (tmp_path / "b.pdf").write_bytes(b"%PDF-1.4 other")
+    (tmp_path / "dup.pdf").write_bytes(b"%PDF-1.4 same")
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.app,
+        ["analyse", str(tmp_path), "--jobs", "3", "--rpm", "600", "--tpm", "100000"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert sorted(assessed) == ["a.pdf", "b.pdf"]
+    assert Framework.load(tmp_path / "dup.pdf.json").manuscript == "dup.pdf"
+    assert (tmp_path / "dup.pdf.html").exists()
+    rows = (tmp_path / "risk_of_bias_summary.csv").read_text().splitlines()[1:]
+    assert [row.split(",")[0] for row in rows] == ["a.pdf", "b.pdf", "dup.pdf"]
+
+    # Both jobs share one limiter with the requested limits
+    assert limiters[0] is limiters[1]
+    assert limiters[0]._requests.capacity == 600
+    assert limiters[0]._tokens.capacity == 100000
+
+
+def test_cli_analyse_identical_manuscripts_are_not_rewritten(tmp_path, monkeypatch):
+    """A second run over identical PDFs reuses each one's own assessment."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.backends import FakeBackend
+    from risk_of_bias.run_framework import run_framework
+
+    assessed = []
+
+    def counting_run_framework(manuscript, **kwargs):
+        assessed.append(manuscript.name)
+        return run_framework(manuscript, backend=FakeBackend(), **kwargs)
+
+    monkeypatch.setattr(cli, "run_framework", counting_run_framework)
+
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 same")
+    (tmp_path / "b.pdf").write_bytes(b"%PDF-1.4 same")
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert assessed == ["a.pdf"]
+
+    written = {path: path.stat().st_mtime_ns for path in tmp_path.iterdir()}
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path)])
+
+    assert result.exit_code == 0, result.output
+    assert assessed == ["a.pdf"]
+    assert {path: path.stat().st_mtime_ns for path in tmp_path.iterdir()} == written
+
+
+def test_cli_analyse_dry_run_after_completed_run(tmp_path, monkeypatch):
+    """A dry run after a completed run, including duplicates, rebuilds nothing."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.backends import FakeBackend
+    from risk_of_bias.run_framework import run_framework
+
+    def fake_run_framework(manuscript, **kwargs):
+        return run_framework(manuscript, backend=FakeBackend(), **kwargs)
+
+    monkeypatch.setattr(cli, "run_framework", fake_run_framework)
+
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 same")
+    (tmp_path / "b.pdf").write_bytes(b"%PDF-1.4 same")
+    (tmp_path / "c.pdf").write_bytes(b"%PDF-1.4 other")
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--jobs", "2"])
+    assert result.exit_code == 0, result.output
+
+    written = {path: path.stat().st_mtime_ns for path in tmp_path.iterdir()}
+    for _ in range(2):
+        result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--dry-run"])
+        assert result.exit_code == 0, result.output
+        assert "Everything is up to date" in result.output
+        assert "Would" not in result.output
+    assert {path: path.stat().st_mtime_ns for path in tmp_path.iterdir()} == written
+
+
+def test_cli_analyse_reassesses_when_skip_logic_changes(tmp_path, monkeypatch):
+    """Assessments made with and without skip logic do not stand in for each other."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    from risk_of_bias import cli
+    from risk_of_bias.backends import FakeBackend
+    from risk_of_bias.run_framework import run_framework
+
+    assessed = []
+
+    def counting_run_framework(manuscript, **kwargs):
+        assessed.append(kwargs["skip_logic"])
+        return run_framework(manuscript, backend=FakeBackend(), **kwargs)
+
+    monkeypatch.setattr(cli, "run_framework", counting_run_framework)
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 trial")
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--skip-logic"])
+    assert result.exit_code == 0, result.output
+
+    result = runner.invoke(
+        cli.app, ["analyse", str(tmp_path), "--skip-logic", "--dry-run"]
+    )
+    assert "Everything is up to date" in result.output
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--dry-run"])
+    assert f"Would assess {tmp_path / 'a.pdf'}" in result.output
+
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert assessed == [True, False]
+
+    manifest = tmp_path / settings.manifest_filename
+    entries = [json.loads(line) for line in manifest.read_text().splitlines()]
+    assert [entry["skip_logic"] for entry in entries] == [True, False]
+
+
+def test_cli_analyse_with_jobs_writes_rows_as_assessments_complete(
+    tmp_path, monkeypatch
+):
+    """Rows of completed assessments survive a later failure."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    import time
+
+    from risk_of_bias import cli
+    from risk_of_bias.backends import FakeBackend
+    from risk_of_bias.run_framework import run_framework
+
+    summary_path = tmp_path / "risk_of_bias_summary.csv"
+
+    def crashing_run_framework(manuscript, **kwargs):
+        if manuscript.name == "paper3.pdf":
+            # Fail once the other assessments have been written
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline and (
+                not summary_path.exists()
+                or len(summary_path.read_text().splitlines()) < 4
+            ):
+                time.sleep(0.01)
+            raise RuntimeError("connection lost")
+        return run_framework(manuscript, backend=FakeBackend(), **kwargs)
+
+    monkeypatch.setattr(cli, "run_framework", crashing_run_framework)
+    for i in range(4):
+        (tmp_path / f"paper{i}.pdf").write_bytes(f"%PDF-1.4 paper {i}".encode())
+
+    runner = CliRunner()
+    result = runner.invoke(cli.app, ["analyse", str(tmp_path), "--jobs", "4"])
+
+    assert isinstance(result.exception, RuntimeError)
+    rows = summary_path.read_text().splitlines()[1:]
+    assert sorted(row.split(",")[0] for row in rows) == [
+        f"paper{i}.pdf" for i in range(3)
+    ]
@@ -3,6 +3,8 @@ from pathlib import Path
 from risk_of_bias.frameworks.rob2 import get_rob2_framework
 from risk_of_bias.types._domain_types import Domain
 from risk_of_bias.types._framework_types import Framework
+from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._response_types import ReasonedResponseWithEvidenceAndRawData
 
 
 def test_framework_save_and_load(tmp_path: Path) -> None:
@@ -73,3 +75,72 @@ def test_framework_judgement_property() -> None:
     domain1.judgement_function = lambda d: "Low"
     domain2.judgement_function = lambda d: "Low"
     assert framework.judgement == "Low"
+
+
+def test_judgements_are_cached_until_a_response_changes() -> None:
+    calls = []
+
+    def judge(domain: Domain) -> str | None:
+        calls.append(domain.index)
+        response = domain.questions[0].response
+        return "High" if response and response.response == "No" else "Low"
+
+    question = Question(question="Q1", index=1.1)
+    domain = Domain(index=1, name="Random", questions=[question])
+    domain.judgement_function = judge
+    framework = Framework(domains=[domain])
+
+    assert framework.judgement == "Low"
+    assert domain.judgement == "Low"
+    assert framework.judgement == "Low"
+    assert calls == [1]
+
+    question.response = ReasonedResponseWithEvidenceAndRawData(
+        response="No", reasoning="", evidence=[]
+    )
+    assert framework.judgement == "High"
+    assert calls == [1, 1]
+
+    domain.questions.append(Question(question="Q2", index=1.2))
+    assert domain.judgement == "High"
+    assert calls == [1, 1, 1]
+
+    framework.domains = [
+        Domain(
+            index=2,
+            name="Other",
+            questions=[Question(question="Q3", index=2.1)],
+            judgement_function=judge,
+        )
+    ]
+    assert framework.judgement == "Low"
+
+
+def test_judgements_are_recomputed_when_a_question_is_replaced() -> None:
+    def judge(domain: Domain) -> str | None:
+        return "High" if domain.questions[0].question == "Risky" else "Low"
+
+    domain = Domain(
+        index=1,
+        name="Random",
+        questions=[Question(question="Q1", index=1.1)],
+        judgement_function=judge,
+    )
+    framework = Framework(domains=[domain])
+    assert domain.judgement == "Low"
+    assert framework.judgement == "Low"
+
+    # Same length, so only the question's identity reveals the change
+    domain.questions[0] = Question(question="Risky", index=1.1)
+    assert domain.judgement == "High"
+    assert framework.judgement == "High"
+
+    domain.questions = [Question(question="Q1", index=1.1)]
+    assert domain.judgement == "Low"
+
+    copied = domain.model_copy(
+        update={"questions": [Question(question="Risky", index=1.1)]}
+    )
+    assert copied.judgement == "High"
+    assert domain.judgement == "Low"
+    assert copied._private()["_revision"] != domain._private()["_revision"]
@@ -0,0 +1,82 @@
+import os
+import time
+from pathlib import Path
+
+from risk_of_bias.janitor import Janitor
+from risk_of_bias.manifest import AssessmentManifest
+
+
+def _job_dir(root: Path, name: str, size: int, age: float) -> Path:
+    path = root / name
+    path.mkdir(parents=True)
+    (path / "result.json").write_bytes(b"x" * size)
+    used = time.time() - age
+    os.utime(path, (used, used))
+    return path
+
+
+def test_janitor_removes_expired_directories(tmp_path: Path) -> None:
+    _job_dir(tmp_path, "old", 10, age=3600)
+    _job_dir(tmp_path, "new", 10, age=10)
+    (tmp_path / "manifest.jsonl").write_text("")
+
+    janitor = Janitor(tmp_path, ttl_seconds=600, max_bytes=None)
+    assert janitor.sweep() == ["old"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["manifest.jsonl", "new"]
+
+
+def test_janitor_evicts_least_recently_used_over_quota(tmp_path: Path) -> None:
+    _job_dir(tmp_path, "a", 100, age=300)
+    _job_dir(tmp_path, "b", 100, age=200)
+    _job_dir(tmp_path, "c", 100, age=100)
+    manifest = AssessmentManifest(tmp_path / "manifest.jsonl")
+    for job_id in "abc":
+        manifest.record(f"key-{job_id}", tmp_path / job_id / "result.json")
+    evicted_ids: list[str] = []
+
+    def forget(job_id: str) -> None:
+        evicted_ids.append(job_id)
+        manifest.remove(tmp_path / job_id / "result.json")
+
+    janitor = Janitor(
+        tmp_path,
+        ttl_seconds=None,
+        max_bytes=150,
+        in_use=lambda job_id: job_id == "a",
+        on_evict=forget,
+    )
+
+    # Downloading b makes it the most recently used
+    janitor.touch("b")
+    assert janitor.usage() == {
+        "jobs": 3,
+        "bytes": 300,
+        "max_bytes": 150,
+        "ttl_seconds": None,
+    }
+
+    # a is running so is kept, c is evicted before b was downloaded
+    assert janitor.sweep() == ["c", "b"]
+    assert evicted_ids == ["c", "b"]
+    assert janitor.usage()["bytes"] == 100
+
+    # The manifest no longer points at the removed results
+    assert manifest.get("key-a") == tmp_path / "a" / "result.json"
+    assert manifest.get("key-b") is None
+    assert manifest.key_for(tmp_path / "c" / "result.json") is None
+    reloaded = AssessmentManifest(tmp_path / "manifest.jsonl")
+    assert len(reloaded) == 1
+    assert reloaded.get("key-a") == tmp_path / "a" / "result.json"
+
+
+def test_janitor_background_thread(tmp_path: Path) -> None:
+    _job_dir(tmp_path, "old", 10, age=3600)
+    janitor = Janitor(tmp_path, ttl_seconds=60, max_bytes=None)
+    janitor.start(interval=60)
+    try:
+        deadline = time.time() + 10
+        while (tmp_path / "old").exists() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        janitor.stop()
+    assert not (tmp_path / "old").exists()
@@ -0,0 +1,38 @@
+import threading
+from pathlib import Path
+
+from risk_of_bias.jobs import Job, JobQueue
+from risk_of_bias.types._framework_types import Framework
+
+
+def test_job_queue_bounds_concurrency(tmp_path: Path) -> None:
+    queue = JobQueue(max_workers=1)
+    release = threading.Event()
+
+    def run(job: Job) -> Framework:
+        release.wait(10)
+        return Framework(name=job.model)
+
+    first = queue.submit(Job(tmp_path / "a.pdf", "first"), run)
+    second = queue.submit(Job(tmp_path / "b.pdf", "second"), run)
+    assert second.status == "queued"
+    assert queue.get(first.id) is first
+
+    release.set()
+    assert queue.wait(second.id, timeout=10).status == "completed"
+    assert second.result is not None and second.result.name == "second"
+    assert first.done and first.finished_at is not None
+    queue.shutdown()
+
+
+def test_job_queue_records_failures(tmp_path: Path) -> None:
+    queue = JobQueue(max_workers=1)
+
+    def run(job: Job) -> Framework:
+        raise ValueError("bad manuscript")
+
+    job = queue.submit(Job(tmp_path / "a.pdf", "model"), run)
+    assert queue.wait(job.id, timeout=10).status == "failed"
+    assert job.error == "bad manuscript"
+    assert job.to_dict()["error"] == "bad manuscript"
+    queue.shutdown()
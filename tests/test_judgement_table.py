@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from risk_of_bias.frameworks import get_rob2_framework
+from risk_of_bias.judgement_table import JudgementTable, compile_judgement_table
+from risk_of_bias.types._domain_types import Domain
+from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._response_types import ReasonedResponseWithEvidenceAndRawData
+
+
+def _answer(domain, answers):
+    for question, answer in zip(domain.questions, answers):
+        question.response = (
+            ReasonedResponseWithEvidenceAndRawData(
+                response=answer, reasoning="", evidence=[]
+            )
+            if answer is not None
+            else None
+        )
+    return domain
+
+
+@pytest.mark.parametrize("position", range(5))
+def test_judgement_table_is_equivalent_to_rob2_algorithm(position):
+    domain = get_rob2_framework().domains[position]
+
+    table = compile_judgement_table(domain)
+
+    assert table.table.size == np.prod([len(a) + 1 for a in table.answers])
+    table.verify(domain)
+
+
+def test_judgement_table_evaluates_many_assessments():
+    framework = get_rob2_framework()
+    template = framework.domains[0]
+    table = compile_judgement_table(template)
+
+    answer_sets = [
+        ["Yes", "Yes", "No"],
+        ["Yes", "No", "No"],
+        ["No", "Yes", "Yes"],
+        ["Yes", "No Information", "Not Applicable"],
+        [None, "Yes", "No"],
+    ]
+    domains = [
+        _answer(template.model_copy(deep=True), answers) for answers in answer_sets
+    ]
+
+    codes = table.encode(domains)
+    judgements = table.evaluate(codes)
+
+    expected = [domain.judgement for domain in domains]
+    assert (
+        list(judgements)
+        == expected
+        == [
+            "Low",
+            "High",
+            "Some concerns",
+            None,
+            None,
+        ]
+    )
+    assert [table.judgement(domain) for domain in domains] == expected
+
+    many = table.evaluate(np.tile(codes, (20_000, 1)))
+    assert many.shape == (100_000,)
+    assert list(many[:5]) == expected
+
+
+def test_compile_judgement_table_reuses_tables():
+    first = get_rob2_framework().domains[2]
+    second = get_rob2_framework().domains[2]
+
+    assert compile_judgement_table(first) is compile_judgement_table(second)
+
+
+def test_judgement_table_rejects_unknown_answers_and_domains():
+    domain = get_rob2_framework().domains[4]
+    table = compile_judgement_table(domain)
+
+    with pytest.raises(ValueError, match="not one of its allowed answers"):
+        table.encode([_answer(domain.model_copy(deep=True), ["Maybe"])])
+
+    with pytest.raises(ValueError, match="no judgement function"):
+        compile_judgement_table(Domain(questions=[Question(question="Q")]))
+
+
+def test_verify_reports_differences():
+    domain = Domain(
+        index=1,
+        questions=[Question(question="Q", index=1.1, is_required=True)],
+        judgement_function=lambda d: "Low",
+    )
+    table = JudgementTable.compile(domain)
+    domain.judgement_function = lambda d: "High" if d.questions[0].response else "Low"
+
+    with pytest.raises(ValueError, match="judgement differs"):
+        table.verify(domain)
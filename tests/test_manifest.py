@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from risk_of_bias.frameworks.rob2 import get_rob2_framework
+from risk_of_bias.manifest import AssessmentManifest, assessment_key
+
+
+def test_assessment_key_depends_on_content_and_parameters(tmp_path: Path) -> None:
+    framework = get_rob2_framework()
+    first = tmp_path / "a.pdf"
+    copy = tmp_path / "b.pdf"
+    other = tmp_path / "c.pdf"
+    first.write_bytes(b"trial")
+    copy.write_bytes(b"trial")
+    other.write_bytes(b"another trial")
+
+    key = assessment_key(first, framework, "model", 0.2)
+    assert assessment_key(copy, framework, "model", 0.2) == key
+    assert assessment_key(other, framework, "model", 0.2) != key
+    assert assessment_key(first, framework, "other", 0.2) != key
+    assert assessment_key(first, framework, "model", 0.5) != key
+    assert assessment_key(first, framework, "model", 0.2, other) != key
+    assert assessment_key(first, framework, "model", 0.2, skip_logic=True) != key
+
+    framework.domains[0].questions[0].question = "A reworded question?"
+    assert assessment_key(first, framework, "model", 0.2) != key
+
+
+def test_manifest_records_and_reloads(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.jsonl"
+    result = tmp_path / "papers" / "a.pdf.json"
+    result.parent.mkdir()
+    result.write_text("{}")
+
+    manifest = AssessmentManifest(path)
+    assert manifest.get("key") is None
+    manifest.record("key", result, model="model")
+    manifest.record("key", result, model="model")
+    assert len(path.read_text().splitlines()) == 1
+    assert "papers/a.pdf.json" in path.read_text()
+
+    reloaded = AssessmentManifest(path)
+    assert reloaded.get("key") == result
+    assert reloaded.key_for(result) == "key"
+
+    # Saving the result with new parameters replaces the old entry
+    reloaded.record("new key", result)
+    reloaded = AssessmentManifest(path)
+    assert reloaded.get("key") is None
+    assert reloaded.key_for(result) == "new key"
+
+    result.unlink()
+    assert reloaded.get("new key") is None
+
+
+def test_manifest_ignores_incomplete_lines(tmp_path: Path) -> None:
+    path = tmp_path / "manifest.jsonl"
+    result = tmp_path / "a.pdf.json"
+    result.write_text("{}")
+    AssessmentManifest(path).record("key", result)
+    with path.open("a") as f:
+        f.write('{"key": "trunc')
+
+    assert AssessmentManifest(path).get("key") == result
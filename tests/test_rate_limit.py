@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from risk_of_bias.rate_limit import (
+    RateLimiter,
+    TokenBucket,
+    estimate_pdf_tokens,
+    estimate_request_tokens,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_reservations_queue_in_order() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_per_second=1, clock=clock)
+
+    assert bucket.reserve(10) == 0.0
+    assert bucket.reserve(5) == pytest.approx(5.0)
+    # The second reservation queues behind the first
+    assert bucket.reserve(5) == pytest.approx(10.0)
+
+    clock.now = 10.0
+    assert bucket.level == pytest.approx(0.0)
+
+
+def test_token_bucket_clamps_oversized_requests() -> None:
+    bucket = TokenBucket(capacity=10, refill_per_second=1, clock=FakeClock())
+    assert bucket.reserve(1_000) == 0.0
+    assert bucket.level == pytest.approx(0.0)
+
+
+def test_token_bucket_never_exceeds_capacity() -> None:
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=10, refill_per_second=1, clock=clock)
+    clock.now = 100.0
+    assert bucket.level == 10
+
+
+def test_token_bucket_settles_clamped_reservations() -> None:
+    bucket = TokenBucket(capacity=10, refill_per_second=1, clock=FakeClock())
+    assert bucket.reserve(1_000) == 0.0
+    # Only the capacity was deducted, so only the unused part of it returns
+    bucket.settle(1_000, 4)
+    assert bucket.level == pytest.approx(6.0)
+
+    bucket.settle(6, 0)
+    assert bucket.level == pytest.approx(10.0)
+
+
+def test_rate_limiter_applies_the_tighter_limit() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, clock=clock)
+
+    # Request limit: one request per second once the burst is used
+    assert limiter.reserve(1) == 0.0
+    # Token limit: 10 tokens per second, 599 tokens already reserved
+    assert limiter.reserve(599) == 0.0
+    assert limiter.reserve(100) == pytest.approx(10.0)
+
+
+def test_rate_limiter_settles_with_actual_usage() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=600, clock=clock)
+
+    assert limiter.reserve(600) == 0.0
+    response = SimpleNamespace(usage=SimpleNamespace(total_tokens=100))
+    limiter.settle(600, response)
+    assert limiter.reserve(500) == 0.0
+
+    # Responses without usage information are ignored
+    limiter.settle(600, SimpleNamespace())
+    assert limiter.reserve(10) > 0
+
+
+def test_rate_limiter_without_limits_never_waits() -> None:
+    limiter = RateLimiter(requests_per_minute=None, tokens_per_minute=None)
+    assert limiter.reserve(10**9) == 0.0
+    asyncio.run(limiter.aacquire(10**9))
+
+
+def test_estimate_request_tokens() -> None:
+    chat_input = [
+        {"role": "system", "content": "x" * 400},
+        {"role": "user", "content": [{"type": "input_text", "text": "y" * 400}]},
+    ]
+    estimate = estimate_request_tokens(chat_input, pdf_bytes=200_000, questions=2)
+    assert estimate == 200 + estimate_pdf_tokens(200_000) + 2 * 400
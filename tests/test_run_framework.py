@@ -1,9 +1,21 @@
+import asyncio
+import time
 from types import SimpleNamespace
 
-from risk_of_bias import run_framework
+import pytest
+from openai.types.responses.parsed_response import (
+    ParsedResponse,
+    ParsedResponseOutputMessage,
+    ParsedResponseOutputText,
+)
+
+from risk_of_bias import conversation, run_framework
+from risk_of_bias.backends import FakeBackend
+from risk_of_bias.cache import ResponseCache
+from risk_of_bias.frameworks import get_rob2_framework
 from risk_of_bias.types._domain_types import Domain
 from risk_of_bias.types._framework_types import Framework
-from risk_of_bias.types._question_types import Question
+from risk_of_bias.types._question_types import Precondition, Question
 
 
 def test_run_framework_omits_negative_temperature(tmp_path, monkeypatch):
@@ -22,12 +34,12 @@ def test_run_framework_omits_negative_temperature(tmp_path, monkeypatch):
             self.responses = DummyResponses()
 
     monkeypatch.setattr(run_framework, "OpenAI", lambda api_key=None: DummyClient())
-    monkeypatch.setattr(run_framework, "pdf_to_base64", lambda path: "encoded")
+    monkeypatch.setattr(conversation, "pdf_to_base64", lambda path: "encoded")
     monkeypatch.setattr(
-        run_framework, "create_openai_message", lambda *args, **kwargs: {}
+        conversation, "create_openai_message", lambda *args, **kwargs: {}
     )
     monkeypatch.setattr(
-        run_framework, "create_domain_response_class", lambda domain: object
+        conversation, "create_domain_response_class", lambda domain: object
     )
 
     framework = Framework(
@@ -42,3 +54,656 @@ def test_run_framework_omits_negative_temperature(tmp_path, monkeypatch):
     )
 
     assert "temperature" not in parse_kwargs
+
+
+def _patch_message_helpers(monkeypatch):
+    monkeypatch.setattr(conversation, "pdf_to_base64", lambda path: "encoded")
+    monkeypatch.setattr(
+        conversation, "create_openai_message", lambda *args, **kwargs: {}
+    )
+
+
+def _parsed_response(domain_response_class, answer="Yes"):
+    fields = {}
+    for name, field in domain_response_class.model_fields.items():
+        fields[name] = field.annotation(
+            reasoning="Because", evidence="Quote", response=answer
+        )
+    parsed = domain_response_class(**fields)
+    content = ParsedResponseOutputText.model_construct(
+        type="output_text", text=parsed.model_dump_json(), parsed=parsed
+    )
+    message = ParsedResponseOutputMessage.model_construct(
+        type="message", role="assistant", content=[content]
+    )
+    return ParsedResponse.model_construct(id="resp_1", output=[message])
+
+
+class DummyAsyncResponses:
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def parse(self, **kwargs):
+        self.calls.append(kwargs)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return _parsed_response(kwargs["text_format"])
+
+
+class DummyAsyncClient:
+    def __init__(self, *args, **kwargs):
+        self.responses = DummyAsyncResponses()
+
+
+def _small_framework():
+    return Framework(
+        name="Test Framework",
+        domains=[
+            Domain(name="D1", index=1, questions=[Question(question="Q1", index=1.1)]),
+            Domain(name="D2", index=2, questions=[Question(question="Q2", index=2.1)]),
+        ],
+    )
+
+
+def test_arun_framework_populates_responses(tmp_path, monkeypatch):
+    _patch_message_helpers(monkeypatch)
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"dummy")
+    client = DummyAsyncClient()
+
+    framework = asyncio.run(
+        run_framework.arun_framework(
+            manuscript=pdf,
+            framework=_small_framework(),
+            model="test-model",
+            temperature=-1.0,
+            client=client,
+        )
+    )
+
+    assert framework.manuscript == "paper.pdf"
+    assert framework.assessor == "test-model"
+    assert len(client.responses.calls) == 2
+    assert "temperature" not in client.responses.calls[0]
+    for domain in framework.domains:
+        assert domain.questions[0].response is not None
+        assert domain.questions[0].response.response == "Yes"
+        assert domain.questions[0].response.evidence == ["Quote"]
+
+
+def test_arun_frameworks_runs_concurrently_and_preserves_order(tmp_path, monkeypatch):
+    _patch_message_helpers(monkeypatch)
+    client = DummyAsyncClient()
+    monkeypatch.setattr(run_framework, "AsyncOpenAI", lambda api_key=None: client)
+
+    pdfs = []
+    for i in range(5):
+        pdf = tmp_path / f"paper{i}.pdf"
+        pdf.write_bytes(b"dummy")
+        pdfs.append(pdf)
+
+    frameworks = asyncio.run(
+        run_framework.arun_frameworks(
+            pdfs, framework_factory=_small_framework, max_concurrency=3
+        )
+    )
+
+    assert [fw.manuscript for fw in frameworks] == [p.name for p in pdfs]
+    assert len(client.responses.calls) == 10
+    assert 1 < client.responses.max_in_flight <= 3
+
+
+def test_run_framework_uploads_files_once(tmp_path, monkeypatch):
+    manuscript = tmp_path / "paper.pdf"
+    manuscript.write_bytes(b"manuscript")
+    guidance = tmp_path / "guidance.pdf"
+    guidance.write_bytes(b"guidance")
+
+    inputs = []
+
+    class DummyFiles:
+        def __init__(self):
+            self.created = []
+            self.deleted = []
+
+        def create(self, file, purpose):
+            self.created.append((file.name, purpose))
+            return SimpleNamespace(id=f"file-{len(self.created)}")
+
+        def delete(self, file_id):
+            self.deleted.append(file_id)
+
+    class DummyResponses:
+        def parse(self, **kwargs):
+            inputs.append(list(kwargs["input"]))
+            return _parsed_response(kwargs["text_format"])
+
+    class DummyClient:
+        def __init__(self, *args, **kwargs):
+            self.files = DummyFiles()
+            self.responses = DummyResponses()
+
+    client = DummyClient()
+    monkeypatch.setattr(run_framework, "OpenAI", lambda api_key=None: client)
+
+    def fail_base64(path):
+        raise AssertionError("PDFs should not be embedded when uploading")
+
+    monkeypatch.setattr(conversation, "pdf_to_base64", fail_base64)
+
+    run_framework.run_framework(
+        manuscript=manuscript,
+        framework=_small_framework(),
+        guidance_document=guidance,
+        upload_files=True,
+    )
+
+    assert client.files.created == [
+        (str(guidance), "user_data"),
+        (str(manuscript), "user_data"),
+    ]
+    assert sorted(client.files.deleted) == ["file-1", "file-2"]
+    assert len(inputs) == 2
+    file_parts = [
+        part
+        for message in inputs[-1]
+        if isinstance(message["content"], list)
+        for part in message["content"]
+        if part["type"] == "input_file"
+    ]
+    assert file_parts == [
+        {"type": "input_file", "file_id": "file-1"},
+        {"type": "input_file", "file_id": "file-2"},
+    ]
+
+
+def test_run_framework_cache_only_requests_changed_domains(tmp_path, monkeypatch):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"manuscript")
+    _patch_message_helpers(monkeypatch)
+
+    calls = []
+
+    class DummyResponses:
+        def parse(self, **kwargs):
+            calls.append(kwargs)
+            return _parsed_response(kwargs["text_format"])
+
+    class DummyClient:
+        def __init__(self, *args, **kwargs):
+            self.responses = DummyResponses()
+
+    monkeypatch.setattr(run_framework, "OpenAI", lambda api_key=None: DummyClient())
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+
+    run_framework.run_framework(
+        manuscript=pdf, framework=_small_framework(), cache=cache
+    )
+    assert len(calls) == 2
+
+    cached = run_framework.run_framework(
+        manuscript=pdf, framework=_small_framework(), cache=cache
+    )
+    assert len(calls) == 2
+    for domain in cached.domains:
+        assert domain.questions[0].response is not None
+        assert domain.questions[0].response.response == "Yes"
+        assert domain.questions[0].response.raw_data is None
+
+    changed = _small_framework()
+    changed.domains[1].questions[0].question = "A reworded question"
+    run_framework.run_framework(manuscript=pdf, framework=changed, cache=cache)
+    assert len(calls) == 3
+
+    pdf.write_bytes(b"a revised manuscript")
+    run_framework.run_framework(
+        manuscript=pdf, framework=_small_framework(), cache=cache
+    )
+    assert len(calls) == 5
+
+
+def test_run_framework_cache_requests_domains_depending_on_changed_answers(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"manuscript")
+    cache = ResponseCache(tmp_path / "responses.sqlite")
+
+    def framework(first_question="Q1"):
+        return Framework(
+            name="Test Framework",
+            domains=[
+                Domain(
+                    name="D1",
+                    index=1,
+                    questions=[Question(question=first_question, index=1.1)],
+                ),
+                Domain(
+                    name="D2",
+                    index=2,
+                    questions=[Question(question="Q2", index=2.1)],
+                    depends_on=[],
+                ),
+                Domain(
+                    name="D3",
+                    index=3,
+                    questions=[Question(question="Q3", index=3.1)],
+                    depends_on=[1],
+                ),
+            ],
+        )
+
+    backend = FakeBackend()
+    run_framework.run_framework(
+        manuscript=pdf, framework=framework(), cache=cache, backend=backend
+    )
+    assert len(backend.requests) == 3
+
+    backend = FakeBackend()
+    run_framework.run_framework(
+        manuscript=pdf, framework=framework(), cache=cache, backend=backend
+    )
+    assert backend.requests == []
+
+    # D3 is shown D1's answer, so it is asked again when D1's question changes
+    backend = FakeBackend()
+    run_framework.run_framework(
+        manuscript=pdf,
+        framework=framework("A reworded question"),
+        cache=cache,
+        backend=backend,
+    )
+    asked = [request["text_format"].__name__ for request in backend.requests]
+    assert asked == ["DomainResponse_D1", "DomainResponse_D3"]
+
+
+def test_run_framework_waits_for_rate_limiter(tmp_path, monkeypatch):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"x" * 2000)
+
+    class DummyResponses:
+        def parse(self, **kwargs):
+            return _parsed_response(kwargs["text_format"])
+
+    class DummyClient:
+        def __init__(self, *args, **kwargs):
+            self.responses = DummyResponses()
+
+    class RecordingLimiter:
+        def __init__(self):
+            self.acquired = []
+            self.settled = []
+
+        def acquire(self, tokens):
+            self.acquired.append(tokens)
+
+        def settle(self, tokens, raw_response):
+            self.settled.append(tokens)
+
+    monkeypatch.setattr(run_framework, "OpenAI", lambda api_key=None: DummyClient())
+    limiter = RecordingLimiter()
+
+    run_framework.run_framework(
+        manuscript=pdf, framework=_small_framework(), rate_limiter=limiter
+    )
+
+    assert len(limiter.acquired) == 2
+    assert limiter.acquired == limiter.settled
+    # Later requests carry the earlier answers, so they are estimated larger
+    assert limiter.acquired[1] > limiter.acquired[0] > 0
+
+
+def test_run_framework_resumes_from_checkpoint(tmp_path, monkeypatch):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"manuscript")
+    checkpoint = tmp_path / "paper.pdf.checkpoint.json"
+    _patch_message_helpers(monkeypatch)
+
+    calls = []
+    fail_on_call = [2]
+
+    class DummyResponses:
+        def parse(self, **kwargs):
+            calls.append({**kwargs, "input": list(kwargs["input"])})
+            if len(calls) == fail_on_call[0]:
+                raise RuntimeError("connection lost")
+            return _parsed_response(kwargs["text_format"])
+
+    class DummyClient:
+        def __init__(self, *args, **kwargs):
+            self.responses = DummyResponses()
+
+    monkeypatch.setattr(run_framework, "OpenAI", lambda api_key=None: DummyClient())
+
+    try:
+        run_framework.run_framework(
+            manuscript=pdf, framework=_small_framework(), checkpoint=checkpoint
+        )
+    except RuntimeError:
+        pass
+    assert checkpoint.exists()
+    interrupted_input = len(calls[1]["input"])
+
+    fail_on_call[0] = 0
+    resumed = run_framework.run_framework(
+        manuscript=pdf, framework=_small_framework(), checkpoint=checkpoint
+    )
+
+    # Only the incomplete second domain is requested again, with the first
+    # domain's answer restored in the conversation.
+    assert len(calls) == 3
+    assert "question_21" in calls[2]["text_format"].model_fields
+    assert len(calls[2]["input"]) == interrupted_input
+    for domain in resumed.domains:
+        assert domain.questions[0].response is not None
+        assert domain.questions[0].response.response == "Yes"
+        # Usage of the request made before the interruption is restored too
+        assert domain.usage is not None
+        assert domain.usage.requests == 1
+
+    # A checkpoint written with another model is not reused.
+    run_framework.run_framework(
+        manuscript=pdf,
+        framework=_small_framework(),
+        model="another-model",
+        checkpoint=checkpoint,
+    )
+    assert len(calls) == 5
+
+
+def test_run_framework_streams_answers_as_they_complete(tmp_path, monkeypatch):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"manuscript")
+    _patch_message_helpers(monkeypatch)
+
+    finished = []
+
+    class DummyStream:
+        def __init__(self, kwargs):
+            self.final = _parsed_response(kwargs["text_format"])
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            return False
+
+        def __iter__(self):
+            text = self.final.output_text
+            for start in range(0, len(text), 7):
+                yield SimpleNamespace(
+                    type="response.output_text.delta", delta=text[start : start + 7]
+                )
+
+        def get_final_response(self):
+            finished.append(True)
+            return self.final
+
+    class DummyResponses:
+        def stream(self, **kwargs):
+            return DummyStream(kwargs)
+
+    class DummyClient:
+        def __init__(self, *args, **kwargs):
+            self.responses = DummyResponses()
+
+    monkeypatch.setattr(run_framework, "OpenAI", lambda api_key=None: DummyClient())
+
+    announced = []
+
+    def on_question(domain, question):
+        announced.append((domain.index, question.index, len(finished)))
+        assert question.response.response == "Yes"
+
+    framework = run_framework.run_framework(
+        manuscript=pdf,
+        framework=_small_framework(),
+        stream=True,
+        on_question=on_question,
+    )
+
+    # Each answer is announced once, before its domain's stream has finished
+    assert announced == [(1, 1.1, 0), (2, 2.1, 1)]
+    for domain in framework.domains:
+        assert domain.questions[0].response.raw_data is not None
+
+
+def _message_texts(conversation):
+    texts = []
+    for message in conversation:
+        content = message["content"]
+        if isinstance(content, str):
+            texts.append(content)
+        else:
+            texts.extend(part["text"] for part in content if "text" in part)
+    return texts
+
+
+def test_domain_waves_follow_declared_dependencies():
+    waves = run_framework._domain_waves(get_rob2_framework())
+    assert [[domain.index for domain in wave] for wave in waves] == [
+        [1, 2, 3, 4, 5],
+        [6],
+    ]
+
+    # Without declared dependencies every domain waits for the previous ones
+    waves = run_framework._domain_waves(_small_framework())
+    assert [[domain.index for domain in wave] for wave in waves] == [[1], [2]]
+
+    circular = _small_framework()
+    circular.domains[0].depends_on = [2]
+    try:
+        run_framework._domain_waves(circular)
+    except ValueError as e:
+        assert "Circular" in str(e)
+    else:
+        raise AssertionError("Circular dependencies should be rejected")
+
+
+def test_run_framework_only_shares_dependency_turns(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 manuscript")
+    framework = Framework(
+        name="Test Framework",
+        domains=[
+            Domain(
+                name="D1",
+                index=1,
+                depends_on=[],
+                questions=[Question(question="First question", index=1.1)],
+            ),
+            Domain(
+                name="D2",
+                index=2,
+                depends_on=[],
+                questions=[Question(question="Second question", index=2.1)],
+            ),
+            Domain(
+                name="D3",
+                index=3,
+                depends_on=[1],
+                questions=[Question(question="Third question", index=3.1)],
+            ),
+        ],
+    )
+    backend = FakeBackend()
+
+    run_framework.run_framework(manuscript=pdf, framework=framework, backend=backend)
+
+    inputs = {
+        request["text_format"].__name__: _message_texts(request["input"])
+        for request in backend.requests
+    }
+    assert "First question" not in inputs["DomainResponse_D2"]
+    assert "First question" in inputs["DomainResponse_D3"]
+    assert "Second question" not in inputs["DomainResponse_D3"]
+    assert all(domain.questions[0].response for domain in framework.domains)
+
+
+def test_arun_framework_answers_independent_domains_concurrently(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 manuscript")
+    latency = 0.2
+
+    started = time.perf_counter()
+    framework = asyncio.run(
+        run_framework.arun_framework(
+            manuscript=pdf,
+            framework=get_rob2_framework(),
+            backend=FakeBackend(latency=latency),
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    # Two waves of requests instead of six sequential round trips
+    assert elapsed < 4 * latency
+    assert framework.domains[-1].questions[0].response is not None
+
+
+def test_precondition_evaluate():
+    either = Precondition(questions=[1.1, 1.2], answers=["Yes"])
+    assert either.evaluate({1.1: "Yes", 1.2: None}) is True
+    assert either.evaluate({1.1: "No", 1.2: None}) is None
+    assert either.evaluate({1.1: "No", 1.2: "No"}) is False
+
+    both = Precondition(questions=[1.1, 1.2], answers=["No"], match="all")
+    assert both.evaluate({1.1: "Yes", 1.2: None}) is False
+    assert both.evaluate({1.1: "No", 1.2: None}) is None
+    assert both.evaluate({1.1: "No", 1.2: "No"}) is True
+
+    with pytest.raises(ValueError):
+        Question(
+            question="Conditional",
+            allowed_answers=["Yes", "No"],
+            precondition=either,
+        )
+
+
+def _conditional_framework():
+    return Framework(
+        name="Test Framework",
+        domains=[
+            Domain(
+                name="D1",
+                index=1,
+                questions=[
+                    Question(question="Gate A", index=1.1, allowed_answers=["No"]),
+                    Question(question="Gate B", index=1.2, allowed_answers=["Yes"]),
+                    Question(
+                        question="If Yes to A",
+                        index=1.3,
+                        precondition=Precondition(questions=[1.1], answers=["Yes"]),
+                    ),
+                    Question(
+                        question="If Yes to B",
+                        index=1.4,
+                        precondition=Precondition(questions=[1.2], answers=["Yes"]),
+                    ),
+                    Question(
+                        question="If Yes to 1.3",
+                        index=1.5,
+                        precondition=Precondition(questions=[1.3], answers=["Yes"]),
+                    ),
+                ],
+            )
+        ],
+    )
+
+
+def test_run_framework_skip_logic_only_asks_applicable_questions(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 manuscript")
+    checkpoint = tmp_path / "paper.pdf.checkpoint.json"
+    backend = FakeBackend()
+    announced = []
+
+    framework = run_framework.run_framework(
+        manuscript=pdf,
+        framework=_conditional_framework(),
+        backend=backend,
+        checkpoint=checkpoint,
+        on_question=lambda domain, question: announced.append(
+            (domain.name, question.index)
+        ),
+        skip_logic=True,
+    )
+
+    asked = [list(request["text_format"].model_fields) for request in backend.requests]
+    assert asked == [["question_11", "question_12"], ["question_14"]]
+
+    questions = framework.domains[0].questions
+    answers = [question.response.response for question in questions]
+    assert answers[:2] == ["No", "Yes"]
+    assert answers[2] == answers[4] == "Not Applicable"
+    assert questions[2].response.evidence == []
+    assert questions[3].response.raw_data is not None
+    assert sorted(announced) == [("D1", index) for index in (1.1, 1.2, 1.3, 1.4, 1.5)]
+    assert framework.domains[0].usage.requests == 2
+
+    resumed_backend = FakeBackend()
+    resumed = run_framework.run_framework(
+        manuscript=pdf,
+        framework=_conditional_framework(),
+        backend=resumed_backend,
+        checkpoint=checkpoint,
+        skip_logic=True,
+    )
+
+    assert resumed_backend.requests == []
+    assert [q.response.response for q in resumed.domains[0].questions] == answers
+    assert resumed.domains[0].usage.requests == 2
+
+    # Resumed and fresh assessments are saved identically
+    framework.save(tmp_path / "fresh.json")
+    resumed.save(tmp_path / "resumed.json")
+    assert (tmp_path / "resumed.json").read_text() == (
+        tmp_path / "fresh.json"
+    ).read_text()
+
+
+def test_run_framework_skip_logic_completes_rob2(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 manuscript")
+
+    framework = asyncio.run(
+        run_framework.arun_framework(
+            manuscript=pdf,
+            framework=get_rob2_framework(),
+            backend=FakeBackend(),
+            skip_logic=True,
+        )
+    )
+
+    for domain in framework.domains:
+        assert all(question.response for question in domain.questions)
+    assert all(domain.judgement for domain in framework.domains[:5])
+
+
+def test_domain_callbacks_report_progress(tmp_path):
+    pdf = tmp_path / "paper.pdf"
+    pdf.write_bytes(b"%PDF-1.4 manuscript")
+    events = []
+
+    framework = run_framework.run_framework(
+        manuscript=pdf,
+        framework=get_rob2_framework(),
+        backend=FakeBackend(),
+        on_domain_start=lambda domain: events.append(("start", domain.index)),
+        on_question=lambda domain, question: events.append(("question", domain.index)),
+        on_domain_complete=lambda domain: events.append(
+            ("complete", domain.index, domain.usage)
+        ),
+    )
+
+    for domain in framework.domains:
+        own = [event for event in events if event[1] == domain.index]
+        assert own[0] == ("start", domain.index)
+        assert [event[0] for event in own[1:-1]] == ["question"] * len(domain.questions)
+        assert own[-1][0] == "complete"
+        assert own[-1][2] is not None and own[-1][2].output_tokens > 0
+    # The Overall domain starts once the domains it depends on are complete
+    assert events.index(("start", 6)) > max(
+        i for i, event in enumerate(events) if event[0] == "complete" and event[1] < 6
+    )
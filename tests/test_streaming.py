@@ -0,0 +1,30 @@
+import json
+
+from risk_of_bias.streaming import StreamingObjectParser
+
+
+def test_parser_returns_members_as_they_complete():
+    document = {
+        "question_11": {"response": "Yes", "reasoning": 'A "quoted" {brace}'},
+        "question_12": {"response": "No", "evidence": ["a", "b"]},
+    }
+    text = json.dumps(document)
+    parser = StreamingObjectParser()
+
+    completed = []
+    completed_at = {}
+    for position, character in enumerate(text):
+        for key, value in parser.feed(character):
+            completed.append((key, value))
+            completed_at[key] = position
+
+    assert completed == list(document.items())
+    # The first member is available well before the stream ends
+    assert completed_at["question_11"] < text.index("question_12")
+
+
+def test_parser_ignores_incomplete_and_scalar_members():
+    parser = StreamingObjectParser()
+
+    assert parser.feed('{"name": "x", "question_11": {"response": "Ye') == []
+    assert parser.feed('s\\\\"}') == [("question_11", {"response": "Yes\\"})]
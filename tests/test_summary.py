@@ -4,9 +4,11 @@ from rich.console import Console
 
 from risk_of_bias.frameworks.rob2 import get_rob2_framework
 from risk_of_bias.summary import (
+    SummaryWriter,
     export_summary,
     load_frameworks_from_directory,
     print_summary,
+    summarise_framework,
     summarise_frameworks,
 )
 from risk_of_bias.types._domain_types import Domain
@@ -42,6 +44,20 @@ def test_summarise_frameworks(tmp_path: Path) -> None:
         assert assessments[domain.name] == "High"
 
 
+def test_summarise_framework_matches_summarise_frameworks() -> None:
+    framework = get_rob2_framework()
+    framework.manuscript = "paper1.pdf"
+    for domain in framework.domains:
+        domain.judgement_function = lambda _d: "Low"
+
+    row = summarise_framework(framework)
+    assert row == summarise_frameworks([framework])["paper1.pdf"]
+    assert list(row)[: len(framework.domains)] == [
+        domain.name for domain in framework.domains
+    ]
+    assert "Overall" in row
+
+
 def test_print_summary_outputs_table() -> None:
     framework = get_rob2_framework()
     framework.manuscript = "study1.pdf"
@@ -143,3 +159,48 @@ def test_summarise_multiple_frameworks_independent_results(tmp_path: Path) -> No
 
     # Ensure they are different (regression test for the bug)
     assert study1_results != study2_results
+
+
+def test_summary_writer_matches_export_summary(tmp_path: Path) -> None:
+    frameworks = []
+    for manuscript, judgement in [("a.pdf", "Low"), ("b.pdf", "High")]:
+        framework = get_rob2_framework()
+        framework.manuscript = manuscript
+        for domain in framework.domains:
+            domain.judgement_function = lambda _d, j=judgement: j
+        frameworks.append(framework)
+
+    writer = SummaryWriter(tmp_path / "incremental.csv")
+    writer.add(frameworks[0])
+    assert len(writer.path.read_text().splitlines()) == 2
+    writer.add(frameworks[1])
+
+    export_summary(summarise_frameworks(frameworks), tmp_path / "full.csv")
+    assert writer.summary == summarise_frameworks(frameworks)
+    assert writer.path.read_text() == (tmp_path / "full.csv").read_text()
+
+    # Updating an existing manuscript replaces its row rather than appending
+    for domain in frameworks[0].domains:
+        domain.judgement_function = lambda _d: "Some concerns"
+    writer.add(frameworks[0])
+    lines = writer.path.read_text().splitlines()
+    assert len(lines) == 3
+    assert lines[1].startswith("a.pdf,Some concerns")
+
+
+def test_summary_writer_reorders_rows(tmp_path: Path) -> None:
+    writer = SummaryWriter(tmp_path / "incremental.csv")
+    for manuscript in ["b.pdf", "a.pdf"]:
+        framework = get_rob2_framework()
+        framework.manuscript = manuscript
+        writer.add(framework)
+
+    writer.reorder(["a.pdf", "b.pdf"])
+    assert list(writer.summary) == ["a.pdf", "b.pdf"]
+    export_summary(writer.summary, tmp_path / "full.csv")
+    assert writer.path.read_text() == (tmp_path / "full.csv").read_text()
+
+    # Unchanged order leaves the file alone
+    modified = writer.path.stat().st_mtime_ns
+    writer.reorder(["a.pdf", "b.pdf"])
+    assert writer.path.stat().st_mtime_ns == modified
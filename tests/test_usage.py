@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+from rich.console import Console
+
+from risk_of_bias.types import Domain, Framework, Usage
+from risk_of_bias.usage import (
+    estimate_cost,
+    print_usage,
+    summarise_usage,
+    usage_from_response,
+)
+
+
+def _framework(manuscript, usages):
+    return Framework(
+        name="Test Framework",
+        manuscript=manuscript,
+        domains=[
+            Domain(name=f"D{i}", index=i, usage=usage)
+            for i, usage in enumerate(usages, start=1)
+        ],
+    )
+
+
+def test_estimate_cost_uses_prices_of_dated_snapshots():
+    cost = estimate_cost("gpt-4.1-mini-2025-04-14", 1_000_000, 500_000, 100_000)
+
+    assert cost == pytest.approx(0.5 * 0.40 + 0.5 * 0.10 + 0.1 * 1.60)
+    assert estimate_cost("unknown-model", 10, 0, 10) is None
+
+
+def test_usage_from_response_reads_reported_usage():
+    raw_response = SimpleNamespace(
+        id="resp_123",
+        model="gpt-4.1-nano-2025-04-14",
+        usage=SimpleNamespace(
+            input_tokens=2000,
+            output_tokens=300,
+            input_tokens_details=SimpleNamespace(cached_tokens=1000),
+        ),
+    )
+
+    usage = usage_from_response(raw_response, "gpt-4.1-nano", 1.5)
+
+    assert usage.request_id == "resp_123"
+    assert usage.model == "gpt-4.1-nano-2025-04-14"
+    assert usage.requests == 1
+    assert usage.total_tokens == 2300
+    assert usage.cached_input_tokens == 1000
+    assert usage.latency_seconds == 1.5
+    assert usage.cost == pytest.approx((1000 * 0.10 + 1000 * 0.025 + 300 * 0.40) / 1e6)
+
+
+def test_usage_is_saved_and_summarised(tmp_path):
+    cheap = Usage(model="m1", requests=1, input_tokens=10, cost=0.01)
+    expensive = Usage(model="m2", requests=1, input_tokens=20, cost=0.05)
+    first = _framework("a.pdf", [cheap, expensive])
+    second = _framework("b.pdf", [cheap, None])
+
+    path = tmp_path / "a.pdf.json"
+    first.save(path)
+    loaded = Framework.load(path)
+    assert loaded.domains[1].usage == expensive
+    assert loaded.usage.requests == 2
+    assert loaded.usage.cost == pytest.approx(0.06)
+    assert loaded.usage.model is None
+
+    by_domain = summarise_usage([first, second])
+    assert list(by_domain) == ["D2", "D1"]
+    assert by_domain["D1"].requests == 2
+    assert by_domain["D1"].model == "m1"
+
+    by_manuscript = summarise_usage([first, second], by="manuscript")
+    assert by_manuscript["a.pdf"].input_tokens == 30
+    assert by_manuscript["b.pdf"].input_tokens == 10
+
+    console = Console(record=True, width=120)
+    print_usage(summarise_usage([first, second], by="model"), console=console)
+    output = console.export_text()
+    assert "m2" in output
+    assert "Total" in output
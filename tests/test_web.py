@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+import json
 import os
 import re
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
+import pytest
 from fastapi.testclient import TestClient
 
 os.environ["OPENAI_API_KEY"] = "test"
 
 from risk_of_bias import web
+from risk_of_bias.summary import summarise_frameworks
 from risk_of_bias.types._framework_types import Framework
 
 
+@pytest.fixture(autouse=True)
+def isolated_web_state(tmp_path, monkeypatch):
+    """Give each test its own upload directory, results and job queue."""
+    from risk_of_bias.jobs import JobQueue
+    from risk_of_bias.manifest import AssessmentManifest
+
+    monkeypatch.setattr(web, "APP_TEMP_DIR", tmp_path / "web")
+    monkeypatch.setattr(
+        web, "results", AssessmentManifest(tmp_path / "web" / "manifest.jsonl")
+    )
+    monkeypatch.setattr(web, "jobs", JobQueue())
+    monkeypatch.setattr(web.janitor, "root", tmp_path / "web")
+    monkeypatch.setattr(web, "_file_cache", OrderedDict())
+
+
 def fake_run_framework(
     manuscript: Path,
     framework,
@@ -19,6 +39,7 @@ def fake_run_framework(
     verbose: bool = False,
     temperature: float = 0.2,
     api_key: str | None = None,
+    **kwargs,
 ) -> Framework:
     result = Framework(name="Test Framework")
     result.manuscript = Path(manuscript).name
@@ -39,23 +60,477 @@ def test_analyze_and_download(tmp_path, monkeypatch):
     client = TestClient(web.app)
 
     pdf = tmp_path / "manuscript.pdf"
-    pdf.write_bytes(b"dummy")
+    pdf.write_bytes(b"%PDF-1.4 dummy")
 
     with pdf.open("rb") as f:
         response = client.post(
             "/analyze",
             data={"model": "dummy-model"},
             files={"file": ("manuscript.pdf", f, "application/pdf")},
+            follow_redirects=False,
         )
 
-    assert response.status_code == 200
-    assert "Download Results" in response.text
-    assert "JSON" in response.text
-
-    match = re.search(r"/download/(\w+)/result.json", response.text)
+    assert response.status_code == 303
+    match = re.fullmatch(r"/jobs/(\w+)", response.headers["location"])
     assert match
     file_id = match.group(1)
 
+    job = web.jobs.wait(file_id, timeout=10)
+    assert job.status == "completed"
+
+    status = client.get(f"/jobs/{file_id}/status").json()
+    assert status["status"] == "completed"
+    assert status["model"] == "dummy-model"
+
+    response = client.get(f"/jobs/{file_id}")
+    assert response.status_code == 200
+    assert "Download Results" in response.text
+    assert f"/download/{file_id}/result.json" in response.text
+
     download_resp = client.get(f"/download/{file_id}/result.json")
     assert download_resp.status_code == 200
     assert download_resp.headers["content-type"] == "application/json"
+
+
+def test_analyze_returns_before_assessment_finishes(tmp_path, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_run_framework(manuscript, **kwargs) -> Framework:
+        started.set()
+        release.wait(10)
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(web, "run_framework", slow_run_framework)
+    client = TestClient(web.app)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+    )
+    assert response.status_code == 200
+    assert "Processing manuscript.pdf" in response.text
+    job_id = response.url.path.rsplit("/", 1)[-1]
+
+    assert started.wait(10)
+    assert client.get(f"/jobs/{job_id}/status").json()["status"] == "running"
+
+    release.set()
+    assert web.jobs.wait(job_id, timeout=10).status == "failed"
+    response = client.get(f"/jobs/{job_id}")
+    assert "model unavailable" in response.text
+
+
+def test_unknown_job_returns_404():
+    client = TestClient(web.app)
+    assert client.get("/jobs/missing").status_code == 404
+    assert client.get("/jobs/missing/status").status_code == 404
+
+
+def test_job_events_stream_progress(tmp_path, monkeypatch):
+    from risk_of_bias.frameworks.rob2 import get_rob2_framework
+    from risk_of_bias.types._response_types import (
+        ReasonedResponseWithEvidenceAndRawData,
+    )
+    from risk_of_bias.types._usage_types import Usage
+
+    def progressing_run_framework(
+        manuscript, on_domain_start, on_question, on_domain_complete, **kwargs
+    ) -> Framework:
+        framework = get_rob2_framework()
+        framework.manuscript = Path(manuscript).name
+        domain = framework.domains[0]
+        on_domain_start(domain)
+        question = domain.questions[0]
+        question.response = ReasonedResponseWithEvidenceAndRawData(
+            response="Yes", reasoning="Stated", evidence=[]
+        )
+        on_question(domain, question)
+        domain.usage = Usage(requests=1, input_tokens=10, output_tokens=5)
+        on_domain_complete(domain)
+        return framework
+
+    monkeypatch.setattr(web, "run_framework", progressing_run_framework)
+    client = TestClient(web.app)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+        follow_redirects=False,
+    )
+    job_id = response.headers["location"].rsplit("/", 1)[-1]
+    web.jobs.wait(job_id, timeout=10)
+
+    with client.stream("GET", f"/jobs/{job_id}/events") as events:
+        assert events.headers["content-type"].startswith("text/event-stream")
+        data = [
+            json.loads(line[len("data: ") :])
+            for line in events.iter_lines()
+            if line.startswith("data: ")
+        ]
+
+    assert [event["type"] for event in data] == [
+        "status",
+        "status",
+        "domain_started",
+        "question_answered",
+        "domain_completed",
+        "status",
+    ]
+    assert data[3]["response"] == "Yes"
+    assert data[4]["usage"]["output_tokens"] == 5
+    assert data[-1]["status"] == "completed"
+
+    # Reconnecting clients only receive the events they missed
+    with client.stream(
+        "GET", f"/jobs/{job_id}/events", headers={"Last-Event-ID": "4"}
+    ) as events:
+        ids = [line for line in events.iter_lines() if line.startswith("id: ")]
+    assert ids == ["id: 5"]
+
+
+def test_analyze_rejects_invalid_uploads(monkeypatch):
+    def unexpected_run_framework(**kwargs) -> Framework:
+        raise AssertionError("No assessment should be run")
+
+    monkeypatch.setattr(web, "run_framework", unexpected_run_framework)
+    monkeypatch.setattr(web.settings, "web_max_upload_bytes", 100)
+    client = TestClient(web.app)
+    submitted = len(web.jobs)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"<html>not a pdf</html>", "text/html")},
+    )
+    assert response.status_code == 415
+
+    # Too large for the streaming copy, though within the form overhead
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"%PDF-" + b"0" * 200, "application/pdf")},
+    )
+    assert response.status_code == 413
+
+    # Rejected from the Content-Length header before the body is read
+    response = client.post(
+        "/analyze",
+        files={
+            "file": ("manuscript.pdf", b"%PDF-" + b"0" * 100_000, "application/pdf")
+        },
+    )
+    assert response.status_code == 413
+    assert len(web.jobs) == submitted
+
+
+def test_analyze_records_upload_digest(tmp_path, monkeypatch):
+    import hashlib
+
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    client = TestClient(web.app)
+    content = b"%PDF-1.4 " + b"x" * (3 * web.UPLOAD_CHUNK_BYTES // 2)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", content, "application/pdf")},
+        follow_redirects=False,
+    )
+    job = web.jobs.wait(response.headers["location"].rsplit("/", 1)[-1], timeout=10)
+    assert job.sha256 == hashlib.sha256(content).hexdigest()
+    assert job.manuscript.read_bytes() == content
+
+
+def test_repeat_uploads_reuse_the_assessment(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def slow_run_framework(manuscript, **kwargs) -> Framework:
+        calls.append(manuscript)
+        release.wait(10)
+        return fake_run_framework(manuscript, framework=None, model="dummy-model")
+
+    monkeypatch.setattr(web, "run_framework", slow_run_framework)
+    client = TestClient(web.app)
+
+    def upload(content: bytes, model: str = "dummy-model") -> str:
+        response = client.post(
+            "/analyze",
+            data={"model": model},
+            files={"file": ("manuscript.pdf", content, "application/pdf")},
+            follow_redirects=False,
+        )
+        assert response.status_code == 303
+        return response.headers["location"].rsplit("/", 1)[-1]
+
+    # Concurrent identical uploads join the job already in progress
+    first = upload(b"%PDF-1.4 trial")
+    assert upload(b"%PDF-1.4 trial") == first
+    release.set()
+    web.jobs.wait(first, timeout=10)
+    assert len(calls) == 1
+
+    # Later identical uploads return the stored assessment
+    assert upload(b"%PDF-1.4 trial") == first
+    assert len(calls) == 1
+    assert len(list(web.APP_TEMP_DIR.glob("*/manuscript.pdf"))) == 1
+
+    # A different model or manuscript is assessed again
+    other = upload(b"%PDF-1.4 trial", model="other-model")
+    assert other != first
+    assert upload(b"%PDF-1.4 another trial") not in (first, other)
+
+
+def test_storage_reports_usage_and_downloads_refresh_jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    client = TestClient(web.app)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+        follow_redirects=False,
+    )
+    job_id = response.headers["location"].rsplit("/", 1)[-1]
+    web.jobs.wait(job_id, timeout=10)
+
+    usage = client.get("/storage").json()
+    assert usage["jobs"] == 1
+    assert usage["bytes"] > 0
+
+    work_dir = web.APP_TEMP_DIR / job_id
+    os.utime(work_dir, (0, 0))
+    assert client.get(f"/download/{job_id}/result.json").status_code == 200
+    assert work_dir.stat().st_mtime > 0
+
+    # Evicted jobs are forgotten along with their files
+    monkeypatch.setattr(web.janitor, "max_bytes", 0)
+    assert len(web.results) == 1
+    assert web.janitor.sweep() == [job_id]
+    assert web.jobs.get(job_id) is None
+    assert len(web.results) == 0
+    assert web.results.path.read_text() == ""
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+
+
+def test_exports_are_rendered_on_first_download(monkeypatch):
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    client = TestClient(web.app)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+        follow_redirects=False,
+    )
+    job_id = response.headers["location"].rsplit("/", 1)[-1]
+    web.jobs.wait(job_id, timeout=10)
+
+    work_dir = web.APP_TEMP_DIR / job_id
+    assert (work_dir / "result.json").is_file()
+    assert not (work_dir / "result.md").exists()
+    assert not (work_dir / "result.html").exists()
+
+    response = client.get(f"/download/{job_id}/result.md")
+    assert response.status_code == 200
+    assert "Test Framework" in response.text
+    assert (work_dir / "result.md").is_file()
+    assert client.get(f"/download/{job_id}/missing.txt").status_code == 404
+
+
+def test_downloads_support_conditional_requests_and_gzip(monkeypatch):
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    monkeypatch.setattr(web, "GZIP_MIN_BYTES", 0)
+    client = TestClient(web.app)
+
+    response = client.post(
+        "/analyze",
+        files={"file": ("manuscript.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+        follow_redirects=False,
+    )
+    job_id = response.headers["location"].rsplit("/", 1)[-1]
+    web.jobs.wait(job_id, timeout=10)
+    url = f"/download/{job_id}/result.html"
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert "Test Framework" in response.text
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    identity_etag = response.headers["etag"]
+    assert identity_etag != etag
+    assert etag == identity_etag[:-1] + '-gzip"'
+    response = client.get(
+        url,
+        headers={"Accept-Encoding": "identity", "If-None-Match": identity_etag},
+    )
+    assert response.status_code == 304
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    response = client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+    response = client.get(url, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+
+    # Served from memory until the file changes
+    assert (job_id, "result.html") in web._file_cache
+    path = web.APP_TEMP_DIR / job_id / "result.html"
+    path.write_text("<p>Updated</p>")
+    os.utime(path, ns=(0, 0))
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.text == "<p>Updated</p>"
+
+
+def test_api_submits_and_returns_results(monkeypatch):
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    client = TestClient(web.app)
+
+    response = client.post(
+        "/api/v1/jobs",
+        data={"model": "dummy-model"},
+        files={"file": ("trial.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+    )
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in ("queued", "running", "completed")
+    assert response.headers["location"] == job["links"]["self"]
+    assert job["links"]["events"].endswith(f"/jobs/{job['id']}/events")
+    assert "/api/v1/" not in job["links"]["events"]
+    web.jobs.wait(job["id"], timeout=10)
+
+    status = client.get(f"/api/v1/jobs/{job['id']}").json()
+    assert status["status"] == "completed"
+    assert status["model"] == "dummy-model"
+
+    result = client.get(job["links"]["result"])
+    assert result.status_code == 200
+    assert result.json()["manuscript"] == "trial.pdf"
+    assert (
+        client.get(
+            job["links"]["result"], headers={"If-None-Match": result.headers["etag"]}
+        ).status_code
+        == 304
+    )
+
+    raw = client.get(job["links"]["result"], params={"raw_data": True})
+    assert raw.status_code == 200
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.json()["name"] == "Test Framework"
+    raw = client.get(
+        job["links"]["result"],
+        params={"raw_data": True},
+        headers={"Accept-Encoding": "identity"},
+    )
+    assert "content-encoding" not in raw.headers
+    assert raw.json()["name"] == "Test Framework"
+
+    # Downloading the stored file declares its encoding
+    url = f"/download/{job['id']}/{web.RAW_RESULT_FILENAME}"
+    download = client.get(url)
+    assert download.headers["content-encoding"] == "gzip"
+    assert download.headers["etag"].endswith('-gzip"')
+    assert download.json()["name"] == "Test Framework"
+    download = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in download.headers
+    assert download.json()["name"] == "Test Framework"
+
+    # Submitting the same manuscript again returns the completed job
+    response = client.post(
+        "/api/v1/jobs",
+        data={"model": "dummy-model"},
+        files={"file": ("copy.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == job["id"]
+
+    assert client.get("/api/v1/jobs/missing").status_code == 404
+    response = client.post(
+        "/api/v1/jobs", files={"file": ("trial.pdf", b"text", "text/plain")}
+    )
+    assert response.status_code == 415
+
+
+def test_api_result_of_unfinished_job_conflicts(monkeypatch):
+    release = threading.Event()
+
+    def slow_run_framework(manuscript, **kwargs) -> Framework:
+        release.wait(10)
+        return fake_run_framework(manuscript, None, "model")
+
+    monkeypatch.setattr(web, "run_framework", slow_run_framework)
+    client = TestClient(web.app)
+
+    job = client.post(
+        "/api/v1/jobs",
+        files={"file": ("trial.pdf", b"%PDF-1.4 dummy", "application/pdf")},
+    ).json()
+    try:
+        assert client.get(job["links"]["result"]).status_code == 409
+    finally:
+        release.set()
+        web.jobs.wait(job["id"], timeout=10)
+    assert client.get(job["links"]["result"]).status_code == 200
+
+
+def test_api_lists_jobs_and_summary_in_pages(monkeypatch):
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    client = TestClient(web.app)
+
+    ids = []
+    for i in range(3):
+        job = client.post(
+            "/api/v1/jobs",
+            files={
+                "file": (f"trial{i}.pdf", b"%PDF-1.4 " + bytes([i]), "application/pdf")
+            },
+        ).json()
+        web.jobs.wait(job["id"], timeout=10)
+        ids.append(job["id"])
+
+    page = client.get("/api/v1/jobs", params={"limit": 2}).json()
+    assert page["total"] == 3
+    assert [job["id"] for job in page["items"]] == ids[::-1][:2]
+    page = client.get(page["next"]).json()
+    assert [job["id"] for job in page["items"]] == [ids[0]]
+    assert page["next"] is None
+    assert client.get("/api/v1/jobs", params={"status": "failed"}).json()["total"] == 0
+    assert client.get("/api/v1/jobs", params={"limit": 0}).status_code == 422
+
+    # Order the results by completion regardless of timestamp resolution
+    for i, job_id in enumerate(ids):
+        os.utime(web.APP_TEMP_DIR / job_id / "result.json", ns=(i, i))
+    page = client.get("/api/v1/summary", params={"limit": 2}).json()
+    assert page["total"] == 3
+    assert [item["manuscript"] for item in page["items"]] == [
+        "trial0.pdf",
+        "trial1.pdf",
+    ]
+    assert page["items"][0]["job_id"] == ids[0]
+    framework = Framework.load(web.APP_TEMP_DIR / ids[0] / "result.json")
+    expected = summarise_frameworks([framework])["trial0.pdf"]
+    assert page["items"][0]["judgements"] == expected
+    page = client.get(page["next"]).json()
+    assert [item["manuscript"] for item in page["items"]] == ["trial2.pdf"]
+
+
+def test_api_responses_are_compressed(monkeypatch):
+    monkeypatch.setattr(web, "run_framework", fake_run_framework)
+    client = TestClient(web.app)
+
+    for i in range(10):
+        job = client.post(
+            "/api/v1/jobs",
+            files={
+                "file": (f"trial{i}.pdf", b"%PDF-1.4 " + bytes([i]), "application/pdf")
+            },
+        ).json()
+        web.jobs.wait(job["id"], timeout=10)
+
+    response = client.get("/api/v1/jobs", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json()["total"] == 10